@@ -0,0 +1,94 @@
+"""
+Cold import time budget for the app.
+
+Imports the app module in a fresh interpreter under python -X importtime,
+the way every uvicorn worker does, and fails when the cumulative import
+time is over the budget or when a module that should load lazily was
+imported. The slowest imports are listed to show where the time went.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 800 --top 15
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from statistics import median
+from typing import Dict, List, Tuple
+
+APP_MODULE = "management_server.server.main"
+# email_validator is left out, fastapi.openapi.models imports it when installed
+LAZY_MODULES = ["passlib", "yaml"]
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Imports a module in a new interpreter and parses the -X importtime report.
+
+    Parameters:
+        module (str): The module to import.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: The self and cumulative time in microseconds
+        of every module imported.
+    """
+    env = {
+        **os.environ,
+        "DATABASE_NAME": os.environ.get("DATABASE_NAME", "benchmark"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(args) -> int:
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    total_ms = median(run[args.module][1] for run in runs) / 1000
+    slowest: List[Tuple[str, int]] = sorted(
+        ((name, cumulative) for name, (_, cumulative) in runs[-1].items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    for name, cumulative in slowest:
+        print(f"{cumulative / 1000:9.1f} ms  {name}")
+    print(f"{args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = [
+        module
+        for module in LAZY_MODULES
+        if any(name == module or name.startswith(f"{module}.") for name in runs[-1])
+    ]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: cold import is over the budget")
+        failed = True
+    return 1 if failed else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default=APP_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--runs", type=int, default=3, help="the median is compared")
+    parser.add_argument("--top", type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,49 @@
+"""
+Micro-benchmark for phone number validation.
+
+Compares the old path (read and scan mobile_prefixes.json on every call)
+with the prefix registry lookup.
+
+    python -m benchmarks.phone_validator
+"""
+
+import timeit
+
+from management_server.utils import get_mobile_prefix
+from management_server.utils.validators import phone_number_vaidator
+
+PHONE_NUMBERS = ["08031234567", "07025123456", "09011234567", "08091234567", "01234567890"]
+ITERATIONS = 2_000
+
+
+def legacy_phone_number_vaidator(phone_number: str) -> str | None:
+    first_four_digites = phone_number[:4]
+    first_five_digits = phone_number[:5]
+    for network in get_mobile_prefix():
+        if (
+            first_four_digites in network.prefixes
+            or first_five_digits in network.prefixes
+        ):
+            return network.network
+    return None
+
+
+def validations_per_second(validator) -> float:
+    elapsed = timeit.timeit(
+        lambda: [validator(number) for number in PHONE_NUMBERS], number=ITERATIONS
+    )
+    return (ITERATIONS * len(PHONE_NUMBERS)) / elapsed
+
+
+def main():
+    for number in PHONE_NUMBERS:
+        assert legacy_phone_number_vaidator(number) == phone_number_vaidator(number)
+    before = validations_per_second(legacy_phone_number_vaidator)
+    after = validations_per_second(phone_number_vaidator)
+    print(f"before: {before:,.0f} validations/s")
+    print(f"after:  {after:,.0f} validations/s")
+    print(f"speedup: {after / before:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
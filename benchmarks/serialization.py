@@ -0,0 +1,94 @@
+"""
+Serialization cost per staff record, default path against the fast path.
+
+The default path validates schemas from a __dict__ copy and renders them
+through jsonable_encoder and JSONResponse, the fast path validates from
+attributes and renders once with model_dump_json. Records are plain
+objects with the same attributes as the Tortoise models.
+
+    python -m benchmarks.serialization
+"""
+
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from management_server.schemas import StaffPage, StaffSchema, UserSchema
+from management_server.responses import SchemaResponse
+
+PAGE_SIZE = 100
+ITERATIONS = 50
+
+
+class Record:
+    def __init__(self, **attributes) -> None:
+        self.__dict__.update(attributes)
+
+
+def make_staff(number: int) -> Record:
+    now = datetime.now(timezone.utc)
+    user = Record(
+        user_id=uuid.uuid4(),
+        first_name=f"Bench{number}",
+        last_name="Staff",
+        email=f"bench.staff.{number}@example.com",
+        phone_number=f"0803{number:07d}",
+        mobile_network="MTN Nigeria",
+        state="Kaduna",
+        lga="Kaduna North",
+        ward="Ward A",
+        password_hash="x" * 60,
+        created_at=now,
+        modified_at=now,
+        _partial=False,
+        _saved_in_db=True,
+    )
+    return Record(
+        id=uuid.uuid4(),
+        staff_id=f"AFIT/BNA/{number:04d}",
+        department_id=uuid.uuid4(),
+        user=user,
+        created_at=now,
+        modified_at=now,
+    )
+
+
+def default_path(records) -> bytes:
+    page = StaffPage(
+        items=[
+            StaffSchema(
+                department_id=record.department_id,
+                staff_id=record.staff_id,
+                user=UserSchema.model_validate(record.user.__dict__),
+            )
+            for record in records
+        ]
+    )
+    return JSONResponse(jsonable_encoder(page, by_alias=True)).body
+
+
+def fast_path(records) -> bytes:
+    page = StaffPage(items=[StaffSchema.model_validate(record) for record in records])
+    return SchemaResponse(page).body
+
+
+def per_record_us(path, records) -> float:
+    elapsed = timeit.timeit(lambda: path(records), number=ITERATIONS)
+    return elapsed / (ITERATIONS * len(records)) * 1_000_000
+
+
+def main():
+    records = [make_staff(number) for number in range(PAGE_SIZE)]
+    before = per_record_us(default_path, records)
+    after = per_record_us(fast_path, records)
+    print(f"page of {PAGE_SIZE} staff")
+    print(f"before: {before:,.1f} us/record")
+    print(f"after:  {after:,.1f} us/record")
+    print(f"speedup: {before / after:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
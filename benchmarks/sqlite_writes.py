@@ -0,0 +1,190 @@
+"""
+Create-staff throughput on SQLite with several worker processes.
+
+Every worker process creates staff through UserController.create against
+the same database file, the way uvicorn workers would. Each scenario uses
+a fresh file:
+
+    baseline      plain sqlite:// URL, one transaction and commit per create
+    wal_profile   the DBSettings pragmas (WAL, synchronous, mmap, cache, busy_timeout)
+    group_commit  the pragmas plus the single-writer queue with group commit
+
+Password hashing is replaced with a constant so the numbers measure the
+database writes, not bcrypt. Results are written as JSON.
+
+    python -m benchmarks.sqlite_writes --workers 4 --creates 500 --concurrency 16
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.http_api import StaffFactory, git_commit
+
+SCENARIOS = ["baseline", "wal_profile", "group_commit"]
+
+
+def write_tortoise_config(scenario: str, directory: str) -> str:
+    from management_server.settings import DBSettings
+
+    file_path = os.path.join(directory, "benchmark.sqlite3")
+    if scenario == "baseline":
+        connections = {"master": f"sqlite://{file_path}"}
+    else:
+        settings = DBSettings(database_name="benchmark")
+        connections = {}
+        for name, read_only in [("master", False), ("reader", True)]:
+            connection = settings.sqlite_connection_config(read_only=read_only)
+            connection["credentials"]["file_path"] = file_path
+            connections[name] = connection
+    config = {
+        "connections": connections,
+        "apps": {
+            "models": {
+                "models": ["management_server.models"],
+                "default_connection": "master",
+            }
+        },
+    }
+    config_file = os.path.join(directory, "tortoise.json")
+    with open(config_file, "w", encoding="utf-8") as file:
+        json.dump(config, file)
+    return config_file
+
+
+def configure_env(scenario: str, config_file: str) -> None:
+    os.environ.setdefault("DATABASE_NAME", "benchmark")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ["TORTOISE_CONFIG"] = config_file
+    os.environ["SQLITE_GROUP_COMMIT"] = str(scenario == "group_commit")
+
+
+async def seed(config_file: str) -> None:
+    from tortoise import Tortoise
+    from management_server.models import DepartmentModel
+    from management_server.search import staff_search_index
+
+    await Tortoise.init(config_file=config_file)
+    await Tortoise.generate_schemas(safe=True)
+    await staff_search_index.ensure_index()
+    for short_name in ["BNA", "BNB", "BNC"]:
+        await DepartmentModel.create(
+            name=f"Benchmark Department {short_name}",
+            short_name=short_name,
+            description="Benchmark department",
+        )
+    await Tortoise.close_connections()
+
+
+async def create_staff(
+    config_file: str, worker: int, creates: int, concurrency: int
+) -> Dict:
+    from tortoise import Tortoise
+    from management_server.db import write_queue
+    from management_server.jobs import job_queue
+    from management_server.utils import password_hasher
+    from management_server.department_registry import department_registry
+    from management_server.controllers.UserControllers import UserController
+
+    async def constant_hash(password: str) -> str:
+        return "benchmark-hash"
+
+    password_hasher.hash = constant_hash
+
+    await Tortoise.init(config_file=config_file)
+    await department_registry.load()
+    await job_queue.start()
+    await write_queue.start()
+    department_ids = [str(entry.department_id) for entry in department_registry.all()]
+    factory = StaffFactory(seed=worker * 1_000_000)
+    remaining = iter(range(creates))
+    errors: Counter = Counter()
+
+    async def run() -> None:
+        for number in remaining:
+            form_data = {
+                **factory(),
+                "department_id": department_ids[number % len(department_ids)],
+            }
+            try:
+                await UserController.create(form_data)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await write_queue.stop()
+    await job_queue.stop()
+    await Tortoise.close_connections()
+    return {"elapsed": elapsed, "errors": dict(errors)}
+
+
+def run_worker(
+    scenario: str, config_file: str, worker: int, creates: int, concurrency: int
+) -> Dict:
+    configure_env(scenario, config_file)
+    return asyncio.run(create_staff(config_file, worker, creates, concurrency))
+
+
+def run_scenario(scenario: str, args) -> Dict:
+    config_file = write_tortoise_config(
+        scenario, tempfile.mkdtemp(prefix="bench-sqlite-")
+    )
+    configure_env(scenario, config_file)
+    asyncio.run(seed(config_file))
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(args.workers) as pool:
+        results: List[Dict] = pool.starmap(
+            run_worker,
+            [
+                (scenario, config_file, worker, args.creates, args.concurrency)
+                for worker in range(args.workers)
+            ],
+        )
+    elapsed = time.perf_counter() - start
+    errors = sum((Counter(result["errors"]) for result in results), Counter())
+    created = args.workers * args.creates - sum(errors.values())
+    return {
+        "created": created,
+        "errors": dict(errors),
+        "elapsed": round(elapsed, 3),
+        "creates_per_second": round(created / elapsed, 1),
+    }
+
+
+def main(args) -> None:
+    report = {
+        "commit": git_commit(),
+        "workers": args.workers,
+        "creates_per_worker": args.creates,
+        "concurrency": args.concurrency,
+        "scenarios": {
+            scenario: run_scenario(scenario, args) for scenario in args.scenarios
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(report["scenarios"], indent=2))
+    print(f"results written to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--creates", type=int, default=500, help="per worker")
+    parser.add_argument("--concurrency", type=int, default=16, help="per worker")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--output", default="benchmark_results.json")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -5,9 +5,12 @@ from pydantic import field_validator
 from tortoise.transactions import in_transaction
 
 from management_server.models import DepartmentModel, AdminModel
+from management_server.db import PRIMARY_CONNECTION
 from management_server.exceptions import InvalidRequestError
 from management_server.schemas import DepartmentSchema
 from management_server.controllers.base import BaseController
+from management_server.department_registry import department_registry, DepartmentEntry
+from management_server.outbox import outbox_departments_changed, outbox_relay
 
 
 class DepartmentController(BaseController):
@@ -16,24 +19,21 @@ class DepartmentController(BaseController):
     @classmethod
     @field_validator("department_id", mode="after")
     async def validate_department_id(cls, value):
-        if not await DepartmentModel.exists(department_id=value):
+        if await department_registry.resolve(value) is None:
             raise InvalidRequestError(
                 detail=f"Department with id {value} does not exist"
             )
         return value
 
-    async def get(self, using_db=None) -> DepartmentModel | None:
-        department = await DepartmentModel.get_or_none(
-            department_id=self.department_id, using_db=using_db
-        )
-        return department or None
+    async def get(self) -> DepartmentEntry | None:
+        return await department_registry.resolve(self.department_id)
 
     @classmethod
     async def _create(cls, form_data: Dict[str, str]):
         department_schema = DepartmentSchema.model_validate(form_data)
-        async with in_transaction() as connection:
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
             if department_schema.department_head_id is not None:
-                admin = AdminModel.exists(
+                admin = await AdminModel.exists(
                     staff_id=department_schema.department_head_id
                 )
                 if not admin:
@@ -46,11 +46,15 @@ class DepartmentController(BaseController):
                 **department_schema.model_dump(exclude_none=True, exclude_unset=True),
                 using_db=connection,
             )
+            await outbox_departments_changed(using_db=connection)
 
-            return DepartmentSchema.model_validate(created_department.__dict__)
+        # the relay broadcasts the change, this worker reloads right away
+        await department_registry.load()
+        outbox_relay.notify()
+        return DepartmentSchema.model_validate(created_department)
         
     async def exists(self) -> bool:
-        return await DepartmentModel.exists(department_id=self.department_id)
+        return await department_registry.resolve(self.department_id) is not None
     
     def __name__(self) -> str:
         return "Department"
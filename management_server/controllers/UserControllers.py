@@ -1,22 +1,84 @@
+import time
+import asyncio
+import base64
+import secrets
+import binascii
 from uuid import UUID
-from typing import Self, Dict
+from itertools import islice
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Any, ClassVar, Self, Dict, Iterator, List, Set, Tuple
 
 from fastapi import status
-from pydantic import BaseModel, EmailStr, Field, model_validator, ConfigDict
+from pydantic import BaseModel, Field, model_validator, ConfigDict
+from tortoise.expressions import Q
+from tortoise.exceptions import IntegrityError, OperationalError
+from tortoise import timezone
 from tortoise.transactions import in_transaction
+from tortoise.backends.base.client import BaseDBAsyncClient
 
-from management_server.schemas import UserSchema, StaffSchema, UserInCache
-from management_server.models import UserModel, StaffModel, AdminModel
+from management_server.schemas import (
+    UserSchema,
+    StaffSchema,
+    AdminSchema,
+    UserInCache,
+    ImportReport,
+    ImportRowError,
+    StaffPage,
+    StaffSearchPage,
+    Token,
+)
+from management_server.models import UserModel, StaffModel, AdminModel, DepartmentModel
 from management_server.controllers.DeparmentControllers import DepartmentController
-from management_server.utils import verify_password
-from management_server.exceptions import InvalidCredentialsError, InvalidRequestError
+from management_server.utils import (
+    EmailString,
+    password_hasher,
+    generate_random_password,
+    generate_staff_id,
+)
+from management_server.utils.validators import phone_number_vaidator
+from management_server.utils.tokens import (
+    ACCESS_TOKEN,
+    REFRESH_TOKEN,
+    create_token,
+    verify_token,
+    create_activation_token,
+    hash_activation_token,
+    settings as token_settings,
+)
+from management_server.exceptions import (
+    InvalidCredentialsError,
+    InvalidRequestError,
+    ServerFailureError,
+)
 from management_server.controllers.base import BaseController
+from management_server.logger import get_logger
+from management_server.db import PRIMARY_CONNECTION, read_connection, write_queue
 from management_server.redis_cache import Redis
+from management_server.jobs import enqueue_audit
+from management_server.invites import Invite, enqueue_invites, sender_configured
+from management_server.outbox import outbox_cache_set, outbox_cache_delete, outbox_relay
+from management_server.department_registry import department_registry
+from management_server.search import StaffSearchIndex, staff_search_index
+from management_server import lookups
+from management_server.lookups import negative_cache, single_flight
+
+logger = get_logger("controllers")
+
+
+def missing_keys(user: UserModel, staff: StaffModel) -> List[str]:
+    """
+    Returns the negative cache keys a new user and staff could have been
+    looked up by, so creating them clears earlier "not found" answers.
+    """
+    return negative_cache.keys(
+        UserModel, email=user.email, user_id=user.user_id
+    ) + negative_cache.keys(StaffModel, id=staff.id, staff_id=staff.staff_id)
 
 
 class UserController(BaseController):
     model_config = ConfigDict(extra="allow")
-    email: EmailStr | None = Field(default=None)
+    email: EmailString | None = Field(default=None)
     user_id: UUID | None = Field(default=None)
 
     @model_validator(mode="after")
@@ -35,10 +97,21 @@ class UserController(BaseController):
         }
 
     async def get(self, return_model: bool = False):
-        user = await UserModel.get_or_none(**self._get_search_key())
+        user = await UserModel.get_or_none(
+            **self._get_search_key(), using_db=read_connection()
+        )
         if return_model:
             return user if user else None
-        return UserSchema.model_validate(user.__dict__) if user else None
+        return UserSchema.model_validate(user) if user else None
+
+    @staticmethod
+    def _new_invite() -> Tuple[str, Dict[str, Any]]:
+        token, token_hash = create_activation_token()
+        return token, {
+            "activation_token_hash": token_hash,
+            "activation_expires_at": timezone.now()
+            + timedelta(seconds=token_settings.activation_token_ttl),
+        }
 
     @classmethod
     async def _create(cls, form_data: Dict[str, str]) -> StaffSchema:
@@ -46,7 +119,11 @@ class UserController(BaseController):
         staff_schema = StaffSchema(
             user=user_schema, department_id=form_data.get("department_id")
         )
-        async with in_transaction() as connection:
+        # invited staff skip the password hash until they activate
+        invite = cls._new_invite() if token_settings.invite_new_staff else None
+        created_keys: List[str] = []
+
+        async def write(connection: BaseDBAsyncClient) -> StaffSchema:
             if await UserModel.exists(email=user_schema.email, using_db=connection):
                 raise InvalidRequestError(
                     detail="A staff with this email already exists",
@@ -54,11 +131,13 @@ class UserController(BaseController):
                 )
             created_user = await UserModel.create(
                 **user_schema.model_dump(exclude_unset=True, exclude_none=True),
+                **(invite[1] if invite else {}),
+                invite=invite is not None,
                 using_db=connection,
             )
             department = await DepartmentController(
                 department_id=staff_schema.department_id
-            ).get(using_db=connection)
+            ).get()
             if department is None:
                 raise InvalidRequestError(
                     detail=f"Invalid Department with id {staff_schema.department_id}",
@@ -69,25 +148,372 @@ class UserController(BaseController):
                 department_id=department.department_id,
                 using_db=connection,
             )
+            await staff_search_index.index(
+                [(new_staff, created_user)], using_db=connection
+            )
 
             new_staff_schema = StaffSchema(
                 department_id=department.department_id,
                 staff_id=new_staff.staff_id,
-                user=UserSchema.model_validate(created_user.__dict__),
+                user=UserSchema.model_validate(created_user),
             )
             user_in_cahce = UserInCache(staff=new_staff_schema)
-            await Redis.create_key(key=new_staff.staff_id, data=user_in_cahce)
+            await outbox_cache_set(
+                {
+                    key: user_in_cahce
+                    for key in StaffController._cache_keys(new_staff)
+                },
+                using_db=connection,
+            )
+            created_keys[:] = missing_keys(created_user, new_staff)
+            await outbox_cache_delete(created_keys, using_db=connection)
+            return new_staff_schema
 
+        new_staff_schema = await write_queue.submit(write)
+        # the outbox also drops them, this only closes the window until it runs
+        await negative_cache.forget(created_keys)
+        # side effects run after the commit, outside the request's DB time
+        outbox_relay.notify()
+        await enqueue_audit("staff_created", staff_id=new_staff_schema.staff_id)
+        if invite is None:
             return new_staff_schema
+        token, fields = invite
+        await AuthController.cache_activations(
+            {fields["activation_token_hash"]: new_staff_schema.user.user_id}
+        )
+        await enqueue_invites(
+            [
+                Invite(
+                    email=new_staff_schema.user.email,
+                    staff_id=new_staff_schema.staff_id,
+                    activation_token=token,
+                )
+            ]
+        )
+        return new_staff_schema
+
+    @classmethod
+    async def _bulk_create(
+        cls,
+        rows: Iterator[Dict[str, str] | ValueError],
+        departments: Dict[UUID, str],
+        batch_size: int,
+    ) -> ImportReport:
+        report = ImportReport()
+        seen_emails, seen_phone_numbers = set(), set()
+        row_number = 0
+        while batch := list(islice(rows, batch_size)):
+            valid_rows: List[Tuple[int, UserSchema, UUID]] = []
+            for row in batch:
+                row_number += 1
+                try:
+                    if isinstance(row, ValueError):
+                        raise row
+                    data = {
+                        key.strip().replace("-", "_"): value
+                        for key, value in row.items()
+                        if key
+                    }
+                    user_schema = UserSchema.model_validate(data)
+                    department_id = UUID(str(data.get("department_id")))
+                except ValueError as e:
+                    report.errors.append(ImportRowError(row=row_number, error=str(e)))
+                    continue
+                if department_id not in departments:
+                    report.errors.append(
+                        ImportRowError(
+                            row=row_number,
+                            error=f"Invalid Department with id {department_id}",
+                        )
+                    )
+                    continue
+                if (
+                    user_schema.email in seen_emails
+                    or user_schema.phone_number in seen_phone_numbers
+                ):
+                    report.errors.append(
+                        ImportRowError(
+                            row=row_number,
+                            error="Duplicate email or phone number in upload",
+                        )
+                    )
+                    continue
+                seen_emails.add(user_schema.email)
+                seen_phone_numbers.add(user_schema.phone_number)
+                valid_rows.append((row_number, user_schema, department_id))
+
+            if valid_rows:
+                await cls._create_batch(valid_rows, departments, report)
+        return report
+
+    @classmethod
+    async def _create_batch(
+        cls,
+        valid_rows: List[Tuple[int, UserSchema, UUID]],
+        departments: Dict[UUID, str],
+        report: ImportReport,
+    ) -> None:
+        existing = await UserModel.filter(
+            Q(email__in=[user.email for _, user, _ in valid_rows])
+            | Q(phone_number__in=[user.phone_number for _, user, _ in valid_rows])
+        ).values_list("email", "phone_number")
+        existing_emails = {email for email, _ in existing}
+        existing_phone_numbers = {phone_number for _, phone_number in existing}
+        new_rows = []
+        for row_number, user_schema, department_id in valid_rows:
+            if (
+                user_schema.email in existing_emails
+                or user_schema.phone_number in existing_phone_numbers
+            ):
+                report.errors.append(
+                    ImportRowError(
+                        row=row_number,
+                        error="A staff with this email or phone number already exists",
+                    )
+                )
+                continue
+            new_rows.append((row_number, user_schema, department_id))
+        if not new_rows:
+            return
+
+        if token_settings.invite_new_staff:
+            invites = [cls._new_invite() for _ in new_rows]
+            credentials = [fields for _, fields in invites]
+        else:
+            invites = []
+            credentials = [
+                {"password_hash": password_hash}
+                for password_hash in await asyncio.gather(
+                    *(
+                        password_hasher.hash(generate_random_password())
+                        for _ in new_rows
+                    )
+                )
+            ]
+        created_keys: List[str] = []
+
+        async def write(
+            connection: BaseDBAsyncClient,
+        ) -> Tuple[List[int], List[StaffModel]]:
+            staff_numbers = {}
+            for department_id, count in Counter(
+                department_id for _, _, department_id in new_rows
+            ).items():
+                allocated = await DepartmentModel.allocate_staff_numbers(
+                    department_id=department_id, count=count, using_db=connection
+                )
+                if allocated is None:
+                    # deleted after the import resolved the departments
+                    continue
+                _, last_number = allocated
+                staff_numbers[department_id] = iter(
+                    range(last_number - count + 1, last_number + 1)
+                )
+            written = [
+                index
+                for index, (_, _, department_id) in enumerate(new_rows)
+                if department_id in staff_numbers
+            ]
+            if not written:
+                return written, []
+
+            users, staff = [], []
+            cache_items: Dict[str, UserInCache] = {}
+            for index in written:
+                _, user_schema, department_id = new_rows[index]
+                user = UserModel(
+                    **user_schema.model_dump(exclude_unset=True, exclude_none=True),
+                    **credentials[index],
+                )
+                staff_id = generate_staff_id(
+                    short_name=departments[department_id],
+                    count=next(staff_numbers[department_id]),
+                )
+                member = StaffModel(
+                    user_id=user.user_id,
+                    department_id=department_id,
+                    staff_id=staff_id,
+                )
+                users.append(user)
+                staff.append(member)
+                user_in_cache = UserInCache(
+                    staff=StaffSchema(
+                        department_id=department_id,
+                        staff_id=staff_id,
+                        user=user_schema.model_copy(
+                            update={"user_id": user.user_id}
+                        ),
+                    )
+                )
+                for key in StaffController._cache_keys(member):
+                    cache_items[key] = user_in_cache
+            await UserModel.bulk_create(users, using_db=connection)
+            await StaffModel.bulk_create(staff, using_db=connection)
+            await staff_search_index.index(
+                list(zip(staff, users)), using_db=connection
+            )
+            await outbox_cache_set(cache_items, using_db=connection)
+            created_keys[:] = [
+                key
+                for user, member in zip(users, staff)
+                for key in missing_keys(user, member)
+            ]
+            await outbox_cache_delete(created_keys, using_db=connection)
+            return written, staff
+
+        try:
+            written, staff = await write_queue.submit(write)
+        except IntegrityError as e:
+            # bulk_create does not go through UserModel.create, a row created
+            # since the check above for existing emails fails the whole batch
+            report.errors.extend(
+                ImportRowError(row=row_number, error=f"Could not create staff: {e}")
+                for row_number, _, _ in new_rows
+            )
+            return
+
+        report.errors.extend(
+            ImportRowError(
+                row=row_number, error=f"Invalid Department with id {department_id}"
+            )
+            for index, (row_number, _, department_id) in enumerate(new_rows)
+            if index not in written
+        )
+        if not staff:
+            return
+        invites = [invites[index] for index in written] if invites else []
+        await negative_cache.forget(created_keys)
+        outbox_relay.notify()
+        report.created += len(staff)
+        report.staff_ids.extend(member.staff_id for member in staff)
+        if invites:
+            await AuthController.cache_activations(
+                {
+                    fields["activation_token_hash"]: member.user_id
+                    for member, (_, fields) in zip(staff, invites)
+                }
+            )
+            await enqueue_invites(
+                [
+                    Invite(
+                        email=new_rows[index][1].email,
+                        staff_id=member.staff_id,
+                        activation_token=token,
+                    )
+                    for index, member, (token, _) in zip(written, staff, invites)
+                ]
+            )
+
+    @classmethod
+    async def bulk_create(
+        cls, rows: Iterator[Dict[str, str] | ValueError], batch_size: int = 500
+    ) -> ImportReport:
+        """
+        Creates staff from an iterator of rows, one transaction per batch.
+
+        Departments are resolved once up front, staff IDs are reserved per
+        department for the whole batch and users and staff are written with
+        bulk inserts. Rows that fail validation are reported instead of
+        aborting the import.
+
+        Args:
+            rows (Iterator[Dict[str, str] | ValueError]): The rows to import.
+            batch_size (int): The number of rows written per transaction.
+
+        Returns:
+            ImportReport: The number of created staff, their IDs and the per-row errors.
+        """
+        await department_registry.load()
+        departments = {
+            department.department_id: department.short_name
+            for department in department_registry.all()
+        }
+        try:
+            return await cls._bulk_create(
+                rows=rows, departments=departments, batch_size=batch_size
+            )
+        except OperationalError as e:
+            raise ServerFailureError(detail="Could not import staff") from e
+
+    @classmethod
+    async def resend_invite(cls, staff_id: UUID) -> None:
+        """
+        Sends a staff member who has not activated a new activation token, the
+        token sent before stops working.
+
+        Args:
+            staff_id (UUID): The ID of the staff member.
+
+        Raises:
+            InvalidRequestError: If the staff member does not exist or has
+                already activated their account.
+            ServerFailureError: If no invite sender is configured.
+        """
+        if not sender_configured():
+            raise ServerFailureError(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Invites can not be sent, no invite sender is configured",
+            )
+        staff = await StaffModel.get_or_none(id=staff_id).select_related("user")
+        if staff is None:
+            raise InvalidRequestError(
+                detail="Staff with this ID does not exist",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        already_activated = InvalidRequestError(
+            detail="This staff member has already activated their account",
+            status_code=status.HTTP_409_CONFLICT,
+        )
+        user = staff.user
+        if user.password_hash is not None:
+            raise already_activated
+        token, fields = cls._new_invite()
+        # an activation that got in first keeps its password
+        if not await UserModel.filter(
+            user_id=user.user_id, password_hash__isnull=True
+        ).update(**fields):
+            raise already_activated
+        if user.activation_token_hash is not None:
+            try:
+                await Redis.delete_keys(
+                    AuthController.activation_key(user.activation_token_hash)
+                )
+            except Exception as e:  # harmless, the new digest rejects the old token
+                logger.warning("could not drop activation", extra={"error": str(e)})
+        await AuthController.cache_activations(
+            {fields["activation_token_hash"]: user.user_id}
+        )
+        await enqueue_invites(
+            [Invite(email=user.email, staff_id=staff.staff_id, activation_token=token)]
+        )
+        await enqueue_audit("invite_resent", staff_id=staff.staff_id)
 
     async def exists(self) -> bool:
-        return await UserModel.exists(**self._get_search_key())
+        return await lookups.exists(UserModel, self._get_search_key())
 
     def __str__(self) -> str:
         return "User"
 
 
 class BaseStaffController(BaseController):
+    model: ClassVar[type[StaffModel] | type[AdminModel]] = StaffModel
+    cache_prefix: ClassVar[str] = "staff"
+    search_index: ClassVar[StaffSearchIndex | None] = staff_search_index
+    search_index_fields: ClassVar[Set[str]] = {
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+    }
+    updatable_fields: ClassVar[List[str]] = [
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "state",
+        "lga",
+        "ward",
+    ]
     id: UUID | None = Field(default=None)
     staff_id: str | None = Field(default=None)
     fields: Dict[str, str] | None = Field(default=None)
@@ -107,67 +533,600 @@ class BaseStaffController(BaseController):
             if value is not None and key in ["id", "staff_id"]
         }
 
+    @classmethod
+    def cache_key(cls, value: UUID | str) -> str:
+        return f"{cls.cache_prefix}:{value}"
+
+    def _to_schema(self, staff: StaffModel) -> StaffSchema:
+        return StaffSchema(
+            department_id=staff.department_id,
+            staff_id=staff.staff_id,
+            user=UserSchema.model_validate(staff.user),
+        )
+
+    async def get(self, return_model: bool = False):
+        if return_model:
+            return (
+                await self.model.filter(**self._get_search_key())
+                .select_related("user")
+                .first()
+            )
+        cache_key = self.cache_key(self.staff_id or self.id)
+        try:
+            cached = await Redis.get_key(cache_key)
+        except Exception as e:
+            # a cache outage only costs the database read
+            logger.warning("staff cache unavailable", extra={"error": str(e)})
+            cached = None
+        if cached is not None:
+            return cached.staff
+        # concurrent misses for the same staff share one query
+        return await single_flight.do(cache_key, lambda: self._load(cache_key))
+
+    async def _load(self, cache_key: str) -> StaffSchema | None:
+        search_key = self._get_search_key()
+        if await negative_cache.is_missing(self.model, search_key):
+            return None
+        # filled from the primary, a lagging replica could cache a stale row
+        staff = await self.get(return_model=True)
+        if staff is None:
+            await negative_cache.remember(self.model, search_key)
+            return None
+        staff_schema = self._to_schema(staff)
+        try:
+            await Redis.create_key(
+                key=cache_key, data=UserInCache(staff=staff_schema)
+            )
+        except Exception as e:
+            logger.warning("staff cache unavailable", extra={"error": str(e)})
+        return staff_schema
+
+    async def exists(self) -> bool:
+        return await lookups.exists(self.model, self._get_search_key())
+
+    @classmethod
+    def _cache_keys(cls, staff: StaffModel | AdminModel) -> List[str]:
+        return [cls.cache_key(staff.id), cls.cache_key(staff.staff_id)]
+
+    async def _other_cache_keys(
+        self, user_id: UUID, connection: BaseDBAsyncClient
+    ) -> List[str]:
+        """
+        Returns the cache keys of the user's rows under the other prefix, the
+        admin entry of a staff member or the staff entry of an admin. They
+        embed the same user fields.
+        """
+        keys: List[str] = []
+        for controller in (StaffController, AdminController):
+            if controller.model is self.model:
+                continue
+            rows = (
+                await controller.model.filter(user_id=user_id)
+                .using_db(connection)
+                .only("id", "staff_id")
+            )
+            for row in rows:
+                keys.extend(controller._cache_keys(row))
+        return keys
+
+    async def invalidate_cache(self, *keys: str) -> None:
+        """
+        Drops cache entries right after a commit, the outbox drops them too
+        so a Redis error is only logged.
+        """
+        try:
+            await Redis.delete_keys(*keys)
+        except Exception as e:
+            logger.warning("staff cache unavailable", extra={"error": str(e)})
+
+    async def delete(self) -> bool:
+        staff = await self.get(return_model=True)
+        if staff is None:
+            raise InvalidRequestError(
+                detail="Staff with this ID does not exist", status_code=404
+            )
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            await staff.delete(using_db=connection)
+            if self.search_index is not None:
+                await self.search_index.remove([staff.id], using_db=connection)
+            await outbox_cache_delete(self._cache_keys(staff), using_db=connection)
+        # dropped right away too so the caller does not read the deleted staff
+        await self.invalidate_cache(*self._cache_keys(staff))
+        outbox_relay.notify()
+        return True
+
+    def _validate_fields(self) -> Dict[str, str]:
+        fields = {
+            key: value
+            for key, value in self.fields.items()
+            if key in self.updatable_fields
+        }
+        if "phone_number" in fields:
+            mobile_network = phone_number_vaidator(fields["phone_number"])
+            if mobile_network is None:
+                raise InvalidRequestError(
+                    detail=f"Invalid Phone number {fields['phone_number']}",
+                    status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                )
+            fields["mobile_network"] = mobile_network
+        return fields
+
     async def update(self):
         if self.fields is None:
             raise ValueError("Field cannnot be None")
-        if not await self.exists():
+        fields = self._validate_fields()
+        try:
+            async with in_transaction(PRIMARY_CONNECTION) as connection:
+                staff = (
+                    await self.model.filter(**self._get_search_key())
+                    .using_db(connection)
+                    .select_related("user")
+                    .first()
+                )
+                if staff is None:
+                    raise InvalidRequestError(
+                        detail="Staff with this ID does not exist", status_code=404
+                    )
+                user = staff.user
+                changed_fields = {
+                    key: value
+                    for key, value in fields.items()
+                    if getattr(user, key) != value
+                }
+                if changed_fields:
+                    changed_fields["modified_at"] = timezone.now()
+                    await UserModel.filter(user_id=user.user_id).using_db(
+                        connection
+                    ).update(**changed_fields)
+                    user.update_from_dict(changed_fields)
+                    if self.search_index is not None and (
+                        changed_fields.keys() & self.search_index_fields
+                    ):
+                        await self.search_index.index(
+                            [(staff, user)], using_db=connection
+                        )
+                    user_in_cache = UserInCache(staff=self._to_schema(staff))
+                    await outbox_cache_set(
+                        {key: user_in_cache for key in self._cache_keys(staff)},
+                        using_db=connection,
+                    )
+                    # refilled from the database on their next read
+                    stale_keys = await self._other_cache_keys(
+                        user.user_id, connection
+                    )
+                    # a "not found" remembered for the new email is wrong now
+                    found_keys = (
+                        negative_cache.keys(UserModel, email=user.email)
+                        if "email" in changed_fields
+                        else []
+                    )
+                    if stale_keys or found_keys:
+                        await outbox_cache_delete(
+                            [*stale_keys, *found_keys], using_db=connection
+                        )
+        except IntegrityError as e:
+            # raised by the queryset update, which UserModel.create does not cover
             raise InvalidRequestError(
-                detail="Staff with this ID does not exist", status_code=404
-            )
-        staff = await self.get(return_model=True)
-        user = await UserController(user_id=staff.user_id).get(return_model=True)
-        updated_user = user.update_from_dict(self.fields)
-        await updated_user.save()
-        return  UserSchema.model_validate(updated_user.__dict__)
+                detail="A staff with this email or phone number already exists",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            ) from e
+        if changed_fields:
+            # the relay writes the new entry, drop the old one now for read-your-writes
+            await self.invalidate_cache(*self._cache_keys(staff), *stale_keys)
+            if found_keys:
+                await negative_cache.forget(found_keys)
+            outbox_relay.notify()
+        return UserSchema.model_validate(user)
 
 
 
 class StaffController(BaseStaffController):
+    page_user_fields: ClassVar[List[str]] = [
+        "user_id",
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "mobile_network",
+        "state",
+        "lga",
+        "ward",
+        "created_at",
+        "modified_at",
+    ]
 
-    async def get(self, return_model: bool = False):
-        user = await StaffModel.get_or_none(**self._get_search_key())
-        if return_model:
-            return user if user else None
-        return StaffSchema.model_validate(user.__dict__) if user else None
+    @staticmethod
+    def encode_cursor(staff_id: str) -> str:
+        return base64.urlsafe_b64encode(staff_id.encode()).decode()
 
-    async def exists(self) -> bool:
-        return await StaffModel.exists(**self._get_search_key())
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        try:
+            return base64.urlsafe_b64decode(cursor.encode()).decode()
+        except (binascii.Error, UnicodeDecodeError) as e:
+            raise InvalidRequestError(detail="Invalid cursor", status_code=400) from e
+
+    @classmethod
+    def decode_location_cursor(cls, cursor: str) -> Tuple[datetime, UUID]:
+        created_at, _, user_id = cls.decode_cursor(cursor).partition(" ")
+        try:
+            return datetime.fromisoformat(created_at), UUID(user_id)
+        except ValueError as e:
+            raise InvalidRequestError(detail="Invalid cursor", status_code=400) from e
+
+    @classmethod
+    def _page_item(
+        cls, staff_id: str, department_id: UUID, user: Dict[str, Any]
+    ) -> StaffSchema:
+        return StaffSchema(
+            department_id=department_id,
+            staff_id=staff_id,
+            user=UserSchema.model_validate(
+                {field: user[field] for field in cls.page_user_fields}
+            ),
+        )
+
+    @classmethod
+    async def get_page(
+        cls,
+        limit: int = 50,
+        cursor: str | None = None,
+        department_id: UUID | None = None,
+        state: str | None = None,
+        lga: str | None = None,
+        ward: str | None = None,
+    ) -> StaffPage:
+        """
+        Returns a page of staff, keyset paginated so every page is a single
+        indexed range scan no matter how deep it is.
+
+        Staff are ordered by staff ID. Filtering by location orders them by
+        the creation of their user instead, the filtered columns are on the
+        user table and its (state, lga, ward, created_at, user_id) indexes
+        serve both the filter and the order.
+
+        Args:
+            limit (int): The maximum number of staff on the page.
+            cursor (str | None): The next-cursor of the previous page.
+            department_id (UUID | None): Only return staff of this department.
+            state (str | None): Only return staff from this state.
+            lga (str | None): Only return staff from this lga.
+            ward (str | None): Only return staff from this ward.
+
+        Returns:
+            StaffPage: The staff on the page and the cursor of the next page.
+        """
+        location = {
+            key: value
+            for key, value in {"state": state, "lga": lga, "ward": ward}.items()
+            if value is not None
+        }
+        if location:
+            return await cls._get_location_page(
+                limit, cursor, department_id, location
+            )
+        filters: Dict[str, Any] = {}
+        if department_id is not None:
+            filters["department_id"] = department_id
+        if cursor is not None:
+            filters["staff_id__gt"] = cls.decode_cursor(cursor)
+        rows = (
+            await StaffModel.filter(department_id__isnull=False, **filters)
+            .using_db(read_connection())
+            .order_by("staff_id")
+            .limit(limit + 1)
+            .values(
+                "staff_id",
+                "department_id",
+                *(f"user__{field}" for field in cls.page_user_fields),
+            )
+        )
+        items = [
+            cls._page_item(
+                row["staff_id"],
+                row["department_id"],
+                {field: row[f"user__{field}"] for field in cls.page_user_fields},
+            )
+            for row in rows[:limit]
+        ]
+        next_cursor = (
+            cls.encode_cursor(items[-1].staff_id) if len(rows) > limit else None
+        )
+        return StaffPage(items=items, next_cursor=next_cursor)
+
+    @classmethod
+    async def _get_location_page(
+        cls,
+        limit: int,
+        cursor: str | None,
+        department_id: UUID | None,
+        location: Dict[str, str],
+    ) -> StaffPage:
+        query = UserModel.filter(staffs__department_id__isnull=False, **location)
+        if department_id is not None:
+            query = query.filter(staffs__department_id=department_id)
+        if cursor is not None:
+            created_at, user_id = cls.decode_location_cursor(cursor)
+            # the range on created_at seeks the index, the OR only breaks ties
+            query = query.filter(created_at__gte=created_at).filter(
+                Q(created_at__gt=created_at) | Q(user_id__gt=user_id)
+            )
+        rows = (
+            await query.using_db(read_connection())
+            .order_by("created_at", "user_id")
+            .limit(limit + 1)
+            .values("staffs__staff_id", "staffs__department_id", *cls.page_user_fields)
+        )
+        items = [
+            cls._page_item(row["staffs__staff_id"], row["staffs__department_id"], row)
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1].user
+            next_cursor = cls.encode_cursor(
+                f"{last.created_at.isoformat()} {last.user_id}"
+            )
+        return StaffPage(items=items, next_cursor=next_cursor)
+
+    @classmethod
+    async def search(
+        cls, query: str, limit: int = 20, offset: int = 0
+    ) -> StaffSearchPage:
+        """
+        Searches staff by partial name, email, phone number or staff ID.
+
+        Args:
+            query (str): The text to search for.
+            limit (int): The maximum number of staff on the page.
+            offset (int): The number of results to skip.
+
+        Returns:
+            StaffSearchPage: The matching staff, best match first.
+        """
+        connection = read_connection()
+        staff_pks = await staff_search_index.search(
+            query=query, limit=limit + 1, offset=offset, using_db=connection
+        )
+        ranked_pks = staff_pks[:limit]
+        staff = {
+            str(member.id): member
+            # staff left without a department by a deleted one are not listed
+            for member in await StaffModel.filter(
+                id__in=ranked_pks, department_id__isnull=False
+            )
+            .using_db(connection)
+            .select_related("user")
+        }
+        items = [
+            StaffSchema.model_validate(staff[staff_pk])
+            for staff_pk in ranked_pks
+            if staff_pk in staff
+        ]
+        next_offset = offset + limit if len(staff_pks) > limit else None
+        return StaffSearchPage(items=items, next_offset=next_offset)
 
 
 class AdminController(BaseStaffController):
+    model: ClassVar[type[AdminModel]] = AdminModel
+    cache_prefix: ClassVar[str] = "admin"
+    search_index: ClassVar[StaffSearchIndex | None] = None
     id: UUID | None = Field(default=None)
     staff_id: str | None = Field(default=None)
 
-    async def get(self):
-        user = await AdminModel.get_or_none(**self._get_search_key())
-        return StaffSchema.model_validate(user.__dict__) if user else None
-
-    async def exists(self) -> bool:
-        print("pass")
-        return await AdminModel.exists(**self._get_search_key())
+    def _to_schema(self, staff: AdminModel) -> AdminSchema:
+        return AdminSchema(
+            staff_id=staff.staff_id, user=UserSchema.model_validate(staff.user)
+        )
 
     @classmethod
-    async def _create(cls, form_data: Dict[str, str]) -> StaffSchema:
-        async with in_transaction() as connection:
-            if await UserController(user_id=form_data["user_id"]).exists():
-                raise InvalidRequestError("A user with this ID already exists")
-            created_admin = await AdminModel.create(**form_data, usin_db=connection)
-            user = await UserController(user_id=form_data["user_id"]).get()
-            return StaffSchema(
-                department_id=form_data["department_id"],
-                staff_id=created_admin.staff_id,
-                user=UserSchema.model_validate(user.__dict__),
+    async def _create(cls, form_data: Dict[str, str]) -> AdminSchema:
+        """
+        Makes an existing staff member an admin under their staff ID.
+        """
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            staff = (
+                await StaffModel.filter(user_id=form_data["user_id"])
+                .using_db(connection)
+                .select_related("user")
+                .first()
             )
+            if staff is None:
+                raise InvalidRequestError(
+                    detail="Staff with this user ID does not exist",
+                    status_code=status.HTTP_404_NOT_FOUND,
+                )
+            if (
+                await AdminModel.filter(user_id=staff.user_id)
+                .using_db(connection)
+                .exists()
+            ):
+                raise InvalidRequestError(
+                    detail="This staff is already an admin",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+            created_admin = await AdminModel.create(
+                user_id=staff.user_id, staff_id=staff.staff_id, using_db=connection
+            )
+        await negative_cache.forget(
+            negative_cache.keys(
+                AdminModel, id=created_admin.id, staff_id=created_admin.staff_id
+            )
+        )
+        return AdminSchema(
+            staff_id=created_admin.staff_id, user=UserSchema.model_validate(staff.user)
+        )
+
+
+# background rehash tasks are kept referenced until they finish
+_rehash_tasks: Set[asyncio.Task] = set()
 
 
 class AuthController(BaseModel):
-    email: EmailStr
+    email: EmailString
     password: str
 
-    async def validate_password(self):
-        hash_user_password = await UserModel.get_or_none(email=self.email)
-        if not verify_password(hash_user_password, self.password):
+    @staticmethod
+    def session_key(user_id: UUID | str) -> str:
+        return f"session:{user_id}"
+
+    @staticmethod
+    def activation_key(token_hash: str) -> str:
+        return f"activation:{token_hash}"
+
+    @classmethod
+    async def cache_activations(cls, activations: Dict[str, UUID]) -> None:
+        """
+        Stores pending activations in Redis until their tokens expire.
+
+        The token digest column on the user is the durable copy, so a failed
+        write here only costs activation a database lookup.
+
+        Args:
+            activations (Dict[str, UUID]): The user ID for each token digest.
+        """
+        try:
+            await Redis.mset(
+                {
+                    cls.activation_key(token_hash): str(user_id)
+                    for token_hash, user_id in activations.items()
+                },
+                ex=token_settings.activation_token_ttl,
+            )
+        except Exception as e:
+            logger.warning("could not cache activations", extra={"error": str(e)})
+
+    @classmethod
+    async def activate(cls, activation_token: str, password: str) -> None:
+        """
+        Sets the first password of an invited user and uses up the token.
+
+        Args:
+            activation_token (str): The token sent to the staff when they were invited.
+            password (str): The new password.
+
+        Raises:
+            InvalidCredentialsError: If the token is unknown, expired or already used.
+        """
+        token_hash = hash_activation_token(activation_token)
+        activation_key = cls.activation_key(token_hash)
+        lookup = {"activation_token_hash": token_hash}
+        try:
+            (cached_user_id,) = await Redis.mget([activation_key])
+        except Exception as e:  # the digest column still finds the user
+            logger.warning("activation cache unavailable", extra={"error": str(e)})
+            cached_user_id = None
+        if cached_user_id is not None:
+            lookup["user_id"] = cached_user_id.decode()
+        user = await UserModel.get_or_none(**lookup)
+        if user is None or user.activation_expires_at < timezone.now():
+            raise InvalidCredentialsError(detail="Invalid or expired activation token")
+        password_hash = await password_hasher.hash(password)
+        # the token digest in the filter makes the token single use
+        activated = await UserModel.filter(**lookup).update(
+            password_hash=password_hash,
+            activation_token_hash=None,
+            activation_expires_at=None,
+        )
+        try:
+            await Redis.delete_keys(activation_key)
+        except Exception as e:  # harmless, the cleared column rejects the token
+            logger.warning("could not drop activation", extra={"error": str(e)})
+        if not activated:
+            raise InvalidCredentialsError(detail="Invalid or expired activation token")
+        await enqueue_audit("account_activated", user_id=str(user.user_id))
+
+    async def validate_password(self) -> UserModel:
+        user = await UserModel.get_or_none(email=self.email)
+        if user is None or user.password_hash is None:
+            # unknown and not yet activated accounts pay for a verify too
+            await password_hasher.verify(
+                await password_hasher.dummy_hash(), self.password
+            )
             raise InvalidCredentialsError(detail="Invalid email or password")
-        return True
+        if not await password_hasher.verify(user.password_hash, self.password):
+            raise InvalidCredentialsError(detail="Invalid email or password")
+        if password_hasher.settings.hashing_rehash_on_login and (
+            password_hasher.needs_update(user.password_hash)
+        ):
+            task = asyncio.create_task(self._rehash_password(user, self.password))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
+        return user
+
+    @staticmethod
+    async def _rehash_password(user: UserModel, plain_password: str) -> None:
+        """
+        Hashes the password again with the current profile, off the login path.
+        """
+        try:
+            new_hash = await password_hasher.hash(plain_password)
+            # a password changed since this login keeps its newer hash
+            await UserModel.filter(
+                user_id=user.user_id, password_hash=user.password_hash
+            ).update(password_hash=new_hash)
+        except Exception:
+            logger.exception(
+                "password rehash failed", extra={"user_id": str(user.user_id)}
+            )
+
+    async def login(self, device_name: str | None = None) -> Token:
+        """
+        Validates the password and starts a new session for the user.
 
-    # async def login(self):
+        The session is added to the user's session set and lives as long as the
+        refresh token, past `max_sessions` the oldest session is ended.
+
+        Args:
+            device_name (str | None): The device the user logged in from.
+
+        Returns:
+            Token: The access and refresh tokens of the session.
+        """
+        user = await self.validate_password()
+        session_id = secrets.token_urlsafe(16)
+        await Redis.add_session(
+            self.session_key(user.user_id),
+            session_id,
+            expires_at=time.time() + token_settings.refresh_token_ttl,
+            ttl=token_settings.refresh_token_ttl,
+            limit=token_settings.max_sessions,
+        )
+        await enqueue_audit(
+            "new_login",
+            user_id=str(user.user_id),
+            session_id=session_id,
+            device_name=device_name,
+        )
+        return Token(
+            access_token=create_token(
+                user_id=str(user.user_id), session_id=session_id, token_type=ACCESS_TOKEN
+            ),
+            refresh_token=create_token(
+                user_id=str(user.user_id),
+                session_id=session_id,
+                token_type=REFRESH_TOKEN,
+            ),
+            expires_in=token_settings.access_token_ttl,
+        )
+
+    @classmethod
+    async def refresh(cls, refresh_token: str) -> Token:
+        """
+        Issues a new access token for a session that is still active.
+
+        Args:
+            refresh_token (str): The refresh token of the session.
+
+        Returns:
+            Token: The new access token.
+        """
+        payload = verify_token(refresh_token, token_type=REFRESH_TOKEN)
+        if not await Redis.session_active(cls.session_key(payload.sub), payload.sid):
+            raise InvalidCredentialsError(detail="Session has ended")
+        return Token(
+            access_token=create_token(
+                user_id=payload.sub, session_id=payload.sid, token_type=ACCESS_TOKEN
+            ),
+            expires_in=token_settings.access_token_ttl,
+        )
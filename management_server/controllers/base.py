@@ -2,6 +2,9 @@ from typing import Dict, Self
 from tortoise.exceptions import OperationalError
 from pydantic import BaseModel
 from management_server.exceptions import ServerFailureError
+from management_server.logger import get_logger
+
+logger = get_logger("controllers")
 
 
 class BaseController(BaseModel):
@@ -14,7 +17,9 @@ class BaseController(BaseModel):
         try:
             return await cls._create(form_data=form_data)
         except OperationalError as e:
-            print(f"error {e}")
+            logger.error(
+                "create failed", extra={"controller": cls.__name__, "error": str(e)}
+            )
             raise ServerFailureError(detail=f"Could not create {cls.__name__}") from e
     
     
\ No newline at end of file
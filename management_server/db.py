@@ -0,0 +1,185 @@
+"""
+Connection routing and the single writer for the connections built by
+DBSettings.tortoise_orm_config.
+
+Writes and anything inside a transaction use the primary ("master")
+connection. Read-only controller paths call read_connection() and pass the
+result to using_db. It hands out the read connections round robin: the
+replicas on Postgres and MySQL, or the WAL reader on SQLite. It returns
+None, meaning the model's default connection, when there are none.
+Replicas can lag the primary, so reads that must see a write made in the
+same request should not be routed here.
+
+On SQLite, write transactions go through write_queue. One task runs them
+one after the other and commits the transactions that queued up meanwhile
+together, so many creates share one BEGIN/COMMIT instead of fighting for
+the database lock.
+"""
+
+import asyncio
+from itertools import count
+from functools import cache
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from tortoise import connections
+from tortoise.transactions import in_transaction
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from management_server.settings import DBSettings, get_settings
+from management_server.logger import get_logger
+
+logger = get_logger("db")
+
+PRIMARY_CONNECTION = "master"
+
+WriteWork = Callable[[BaseDBAsyncClient], Awaitable[Any]]
+
+_reads = count()
+
+
+@cache
+def read_connection_names() -> Tuple[str, ...]:
+    # a TORTOISE_CONFIG file may not define the read connections
+    return tuple(
+        name
+        for name in get_settings(DBSettings).read_connection_names
+        if name in connections.db_config
+    )
+
+
+def read_connection() -> Optional[BaseDBAsyncClient]:
+    names = read_connection_names()
+    if not names:
+        return None
+    return connections.get(names[next(_reads) % len(names)])
+
+
+@dataclass
+class WriteRequest:
+    work: WriteWork
+    future: asyncio.Future
+
+
+class WriteQueue:
+    """
+    Single writer with group commit.
+
+    Each queued write runs inside its own savepoint, so a write that raises
+    is rolled back alone and its caller gets the exception. Callers resume
+    only after the shared COMMIT, so a write is durable once submit returns.
+    The work must use the connection it is given and must not open its own
+    transaction.
+    """
+
+    def __init__(self, settings: DBSettings | None = None) -> None:
+        self._settings = settings
+        self.queue: asyncio.Queue[WriteRequest] | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def settings(self) -> DBSettings:
+        # resolved on first use, importing the models must not need DATABASE_NAME
+        return self._settings or get_settings(DBSettings)
+
+    @property
+    def enabled(self) -> bool:
+        primary = connections.get(PRIMARY_CONNECTION)
+        return (
+            primary.capabilities.dialect == "sqlite"
+            and self.settings.sqlite_group_commit
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def submit(self, work: WriteWork) -> Any:
+        """
+        Runs work in a write transaction on the primary connection.
+
+        Args:
+            work (WriteWork): Called with the transaction connection.
+
+        Returns:
+            Any: What work returned, once its transaction has committed.
+        """
+        if not self.running:
+            async with in_transaction(PRIMARY_CONNECTION) as connection:
+                return await work(connection)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(WriteRequest(work=work, future=future))
+        return await future
+
+    async def _next_group(self) -> List[WriteRequest]:
+        group = [await self.queue.get()]
+        if self.settings.sqlite_group_commit_window:
+            await asyncio.sleep(self.settings.sqlite_group_commit_window)
+        while len(group) < self.settings.sqlite_group_commit_max_batch:
+            try:
+                group.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return group
+
+    async def _commit_group(
+        self, group: List[WriteRequest]
+    ) -> List[Tuple[Any, BaseException | None]]:
+        results = []
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            for index, request in enumerate(group):
+                if request.future.cancelled():
+                    results.append((None, None))
+                    continue
+                savepoint = f"write_{index}"
+                await connection.execute_query(f"SAVEPOINT {savepoint}")
+                try:
+                    result = await request.work(connection)
+                except Exception as e:
+                    await connection.execute_query(f"ROLLBACK TO {savepoint}")
+                    results.append((None, e))
+                else:
+                    results.append((result, None))
+                await connection.execute_query(f"RELEASE {savepoint}")
+        return results
+
+    async def _run(self) -> None:
+        while True:
+            group = await self._next_group()
+            try:
+                results = await self._commit_group(group)
+            except Exception as e:
+                # BEGIN or COMMIT failed, nothing in the group was written
+                logger.exception("group commit failed", extra={"writes": len(group)})
+                results = [(None, e)] * len(group)
+            for request, (result, error) in zip(group, results):
+                if not request.future.done():
+                    if error is None:
+                        request.future.set_result(result)
+                    else:
+                        request.future.set_exception(error)
+                self.queue.task_done()
+
+    async def start(self) -> None:
+        """
+        Starts the writer, call it after Tortoise is initialised. Does nothing
+        unless the primary is SQLite and SQLITE_GROUP_COMMIT is on.
+        """
+        if self.running or not self.enabled:
+            return
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        await self.queue.join()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+write_queue = WriteQueue()
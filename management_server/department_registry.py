@@ -0,0 +1,154 @@
+"""
+In-process department directory.
+
+Departments rarely change, so every worker keeps them in memory keyed by
+department_id and short_name. A change reloads the local copy and is
+broadcast to the other workers over Redis pub/sub.
+"""
+
+import time
+import uuid
+import asyncio
+from uuid import UUID
+from typing import Dict, List
+from dataclasses import dataclass
+
+from management_server.models import DepartmentModel
+from management_server.redis_cache import get_redis_client
+from management_server.logger import get_logger
+
+logger = get_logger("department_registry")
+
+INVALIDATION_CHANNEL = "departments:invalidate"
+
+
+@dataclass(frozen=True)
+class DepartmentEntry:
+    department_id: UUID
+    name: str
+    short_name: str
+
+
+class DepartmentRegistry:
+    """
+    Department directory loaded at startup and invalidated on change.
+    """
+
+    def __init__(self, min_reload_interval: float = 1.0) -> None:
+        self.worker_id = uuid.uuid4().hex
+        self.min_reload_interval = min_reload_interval
+        self._by_id: Dict[UUID, DepartmentEntry] = {}
+        self._by_short_name: Dict[str, DepartmentEntry] = {}
+        self._loaded_at: float | None = None
+        self._listener: asyncio.Task | None = None
+
+    async def load(self) -> None:
+        rows = await DepartmentModel.all().values_list(
+            "department_id", "name", "short_name"
+        )
+        entries = [DepartmentEntry(*row) for row in rows]
+        self._by_id = {entry.department_id: entry for entry in entries}
+        self._by_short_name = {entry.short_name: entry for entry in entries}
+        self._loaded_at = time.monotonic()
+
+    def get(self, department_id: UUID | str) -> DepartmentEntry | None:
+        if not isinstance(department_id, UUID):
+            try:
+                department_id = UUID(str(department_id))
+            except ValueError:
+                return None
+        return self._by_id.get(department_id)
+
+    def get_by_short_name(self, short_name: str) -> DepartmentEntry | None:
+        return self._by_short_name.get(short_name)
+
+    def all(self) -> List[DepartmentEntry]:
+        return list(self._by_id.values())
+
+    async def resolve(self, department_id: UUID | str) -> DepartmentEntry | None:
+        """
+        Returns a department, reloading once if it is not known yet.
+
+        A miss can mean the department was created on a worker whose broadcast
+        has not arrived, reloads on a miss are limited to one per interval.
+
+        Parameters:
+            department_id (UUID | str): The ID of the department.
+
+        Returns:
+            DepartmentEntry | None: The department, or None if it does not exist.
+        """
+        entry = self.get(department_id)
+        if entry is not None:
+            return entry
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.min_reload_interval
+        ):
+            await self.load()
+            entry = self.get(department_id)
+        return entry
+
+    async def invalidate(self) -> None:
+        """
+        Reloads the directory and tells the other workers to do the same.
+        Call it after a department is created, updated or deleted.
+        """
+        await self.load()
+        try:
+            await get_redis_client().publish(INVALIDATION_CHANNEL, self.worker_id)
+        except Exception as e:  # the local copy is fresh, others reload on miss
+            logger.warning(
+                "department invalidation not broadcast", extra={"error": str(e)}
+            )
+
+    async def _listen(self) -> None:
+        pubsub = get_redis_client().pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        try:
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message is None:
+                    continue
+                sender = message["data"]
+                if isinstance(sender, bytes):
+                    sender = sender.decode()
+                if sender != self.worker_id:
+                    await self.load()
+        except asyncio.CancelledError:
+            await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+            raise
+
+    async def _run_listener(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "department listener restarting", extra={"error": str(e)}
+                )
+                await asyncio.sleep(1.0)
+
+    async def start(self) -> None:
+        """
+        Loads the directory and subscribes to invalidations, called from the app lifespan.
+        """
+        await self.load()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._run_listener())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+department_registry = DepartmentRegistry()
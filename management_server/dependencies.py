@@ -0,0 +1,53 @@
+"""
+FastAPI dependencies shared by the routers.
+"""
+
+from uuid import UUID
+from typing import Annotated
+
+from fastapi import Depends, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from management_server.models import AdminModel
+from management_server.schemas import TokenPayload
+from management_server.exceptions import InvalidCredentialsError, InvalidRequestError
+from management_server.utils.tokens import verify_token
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+) -> TokenPayload:
+    """
+    Returns the payload of the bearer access token sent with the request.
+
+    Raises:
+        InvalidCredentialsError: If no token was sent or it is invalid.
+    """
+    if credentials is None:
+        raise InvalidCredentialsError()
+    return verify_token(credentials.credentials)
+
+
+async def get_current_admin(
+    user: Annotated[TokenPayload, Depends(get_current_user)],
+) -> TokenPayload:
+    """
+    Returns the token payload of the request if it was sent by an admin.
+
+    Raises:
+        InvalidCredentialsError: If no token was sent or it is invalid.
+        InvalidRequestError: With status 403 if the user is not an admin.
+    """
+    try:
+        user_id = UUID(user.sub)
+    except ValueError:
+        is_admin = False
+    else:
+        is_admin = await AdminModel.filter(user_id=user_id).exists()
+    if not is_admin:
+        raise InvalidRequestError(
+            detail="Only admins can do this", status_code=status.HTTP_403_FORBIDDEN
+        )
+    return user
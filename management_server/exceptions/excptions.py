@@ -2,6 +2,7 @@
 Custom Errors used in the application.
 """
 
+from fastapi import status
 from starlette.exceptions import HTTPException
 
 
@@ -22,7 +23,9 @@ class InvalidCredentialsError(HTTPException):
     """
 
     def __init__(self, detail: str | None = None) -> None:
-        self.detail = detail
+        super().__init__(
+            status.HTTP_401_UNAUTHORIZED, detail, headers={"WWW-Authenticate": "Bearer"}
+        )
 
 
 class ServerFailureError(HTTPException):
@@ -7,12 +7,17 @@ from management_server.exceptions.excptions import (
     InvalidRequestError,
     ServerFailureError,
 )
+from management_server.logger import get_logger
 
+logger = get_logger("handlers")
 
-def _validation_error_handler(request: Request, exc: ValidationError) -> Response:
-    print(exc)
 
+def _validation_error_handler(request: Request, exc: ValidationError) -> Response:
     error = exc.errors()[0]
+    logger.info(
+        "validation error",
+        extra={"path": request.url.path, "location": error["loc"], "type": error["type"]},
+    )
     response = JSONResponse(
         {
             "message": "Invalid Type",
@@ -60,8 +65,8 @@ def _invalid_credentials_handler(
         {
             "error": f"Invalid or expired token {exc.detail if exc.detail is not None else ''} "
         },
-        status_code=401,
-        # headers={"WWW-Authenticate": "Bearer"},
+        status_code=exc.status_code,
+        headers=exc.headers,
     )
     return response
 
@@ -21,7 +21,6 @@ class StaffCreateForm:
 @dataclass
 class AdminCreateForm:
     user_id: UUID = Form(alias="user-id")
-    department_id: UUID = Form(alias="department-id")
 
 
 @dataclass
@@ -30,6 +29,17 @@ class LoginForm:
     password: str = Form()
 
 
+@dataclass
+class RefreshForm:
+    refresh_token: str = Form(alias="refresh-token")
+
+
+@dataclass
+class ActivationForm:
+    activation_token: str = Form(alias="activation-token")
+    password: str = Form(min_length=8, max_length=128)
+
+
 @dataclass
 class DepartmentCreateForm:
     name: str = Form(...)
@@ -0,0 +1,147 @@
+"""
+Readiness checks for the load balancer.
+
+A worker is ready when the primary database answers SELECT 1, Redis
+answers PING and neither the password hashing pool nor the database pool
+is saturated. The checks run concurrently with a timeout each, and the
+report is reused for HEALTH_CACHE_TTL seconds so frequent probes from
+several balancers cost one round of checks.
+"""
+
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Tuple
+
+from tortoise import connections
+
+from management_server.db import PRIMARY_CONNECTION
+from management_server.utils import password_hasher
+from management_server.redis_cache import get_redis_client
+from management_server.schemas import DependencyCheck, ReadinessReport
+from management_server.settings import HealthSettings, get_settings
+
+OK = "ok"
+FAIL = "fail"
+
+Check = Callable[[], Awaitable[str | None]]
+
+
+class DependencySaturatedError(Exception):
+    pass
+
+
+def _db_pool_usage(client) -> Tuple[int, int] | None:
+    """
+    Returns the connections in use and the pool size limit, None without a pool.
+    """
+    pool = getattr(client, "_pool", None)
+    if pool is None:
+        return None
+    # asyncpg
+    if hasattr(pool, "get_max_size"):
+        return pool.get_size() - pool.get_idle_size(), pool.get_max_size()
+    # aiomysql and asyncmy
+    if hasattr(pool, "maxsize"):
+        return pool.size - pool.freesize, pool.maxsize
+    return None
+
+
+class ReadinessProbe:
+    """
+    Runs the dependency checks and caches the report for a short interval.
+    """
+
+    def __init__(self, settings: HealthSettings | None = None) -> None:
+        self.settings = settings or get_settings(HealthSettings)
+        self._report: ReadinessReport | None = None
+        self._checked_at = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _fresh(self) -> bool:
+        return (
+            self._report is not None
+            and time.monotonic() - self._checked_at < self.settings.health_cache_ttl
+        )
+
+    async def _check_db(self) -> str | None:
+        await connections.get(PRIMARY_CONNECTION).execute_query("SELECT 1")
+        return None
+
+    async def _check_redis(self) -> str | None:
+        await get_redis_client().ping()
+        return None
+
+    async def _check_hashing_pool(self) -> str | None:
+        stats = password_hasher.stats
+        detail = f"{stats.queue_depth} waiting, {stats.in_flight} running"
+        if stats.queue_depth > self.settings.health_max_hashing_queue:
+            raise DependencySaturatedError(detail)
+        return detail
+
+    async def _check_db_pool(self) -> str | None:
+        usage = _db_pool_usage(connections.get(PRIMARY_CONNECTION))
+        if usage is None:
+            return "no pool"
+        in_use, max_size = usage
+        detail = f"{in_use}/{max_size} connections in use"
+        if in_use >= max_size * self.settings.health_max_db_pool_usage:
+            raise DependencySaturatedError(detail)
+        return detail
+
+    async def _run(self, check: Check) -> DependencyCheck:
+        started_at = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(
+                check(), timeout=self.settings.health_check_timeout
+            )
+            status = OK
+        except asyncio.TimeoutError:
+            status, detail = FAIL, "timed out"
+        except Exception as e:
+            status, detail = FAIL, str(e) or type(e).__name__
+        return DependencyCheck(
+            status=status,
+            latency_ms=round((time.perf_counter() - started_at) * 1000, 3),
+            detail=detail,
+        )
+
+    async def check(self) -> ReadinessReport:
+        """
+        Returns the readiness report, running the checks only when the cached
+        report is older than HEALTH_CACHE_TTL.
+
+        Returns:
+            ReadinessReport: The overall status and the result of every check.
+        """
+        if self._fresh():
+            return self._report
+        # concurrent probes wait for the one already running the checks
+        async with self.lock:
+            if self._fresh():
+                return self._report
+            checks: Dict[str, Check] = {
+                "database": self._check_db,
+                "redis": self._check_redis,
+                "hashing_pool": self._check_hashing_pool,
+                "database_pool": self._check_db_pool,
+            }
+            results = await asyncio.gather(
+                *(self._run(check) for check in checks.values())
+            )
+            report = ReadinessReport(
+                status=OK if all(result.status == OK for result in results) else FAIL,
+                checked_at=datetime.now(timezone.utc),
+                checks=dict(zip(checks, results)),
+            )
+            self._report, self._checked_at = report, time.monotonic()
+            return report
+
+
+readiness_probe = ReadinessProbe()
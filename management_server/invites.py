@@ -0,0 +1,101 @@
+"""
+Delivery of activation tokens to invited staff.
+
+Tokens are never returned by the API. Once the staff rows commit, the
+invites are queued as a job and handed to the invite sender, which sends the
+token to the staff's email. Deployments plug their mail provider in with
+INVITE_SENDER, or set_invite_sender before the server starts.
+"""
+
+import importlib
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List
+
+from management_server.settings import AuthSettings
+from management_server.jobs import job_queue
+from management_server.logger import get_logger
+
+logger = get_logger("invites")
+
+
+@dataclass
+class Invite:
+    email: str
+    staff_id: str
+    activation_token: str
+
+
+InviteSender = Callable[[Invite], Awaitable[None]]
+
+
+async def _no_sender(invite: Invite) -> None:
+    logger.warning(
+        "no invite sender configured, invite not delivered",
+        extra={"staff_id": invite.staff_id},
+    )
+
+
+_sender: InviteSender = _no_sender
+
+
+def set_invite_sender(sender: InviteSender) -> None:
+    """
+    Sets the function that delivers activation tokens, call it at startup.
+    """
+    global _sender
+    _sender = sender
+
+
+def sender_configured() -> bool:
+    return _sender is not _no_sender
+
+
+def configure_invite_sender(settings: AuthSettings) -> None:
+    """
+    Loads the INVITE_SENDER function and checks invites can be delivered, call
+    it at startup.
+
+    Args:
+        settings (AuthSettings): The invite settings.
+
+    Raises:
+        RuntimeError: If new staff are invited but no sender is configured,
+            their activation tokens would only be logged as undelivered.
+    """
+    if settings.invite_sender is not None:
+        module_name, _, name = settings.invite_sender.partition(":")
+        set_invite_sender(getattr(importlib.import_module(module_name), name))
+    if settings.invite_new_staff and not sender_configured():
+        raise RuntimeError(
+            "INVITE_NEW_STAFF is on but no invite sender is configured, "
+            "set INVITE_SENDER or turn INVITE_NEW_STAFF off"
+        )
+
+
+@job_queue.handler("deliver_invites")
+async def deliver_invites(payload: Dict[str, Any]) -> None:
+    for invite in payload["invites"]:
+        await _sender(Invite(**invite))
+
+
+async def enqueue_invites(invites: List[Invite]) -> None:
+    """
+    Queues the activation tokens of newly created staff for delivery.
+
+    Called after the staff rows commit, so a failure is logged with the staff
+    IDs instead of failing a create that is already saved.
+    """
+    if not invites:
+        return
+    try:
+        await job_queue.enqueue(
+            "deliver_invites", {"invites": [asdict(invite) for invite in invites]}
+        )
+    except Exception as e:
+        logger.error(
+            "invites not queued",
+            extra={
+                "staff_ids": [invite.staff_id for invite in invites],
+                "error": str(e),
+            },
+        )
@@ -0,0 +1,276 @@
+"""
+Background job queue.
+
+Side effects such as audit events are enqueued after the database
+transaction commits and run by worker tasks, so request latency
+only covers the database write. Failed jobs are queued again after an
+exponential backoff, the wait happens in a timer task so the worker moves on
+to the next job. Enqueueing blocks for a bounded time when the queue is full.
+
+The memory backend keeps jobs in an asyncio.Queue. The redis backend keeps
+them in a Redis stream read through a consumer group, so jobs that were
+queued or running when a worker stopped are picked up again after a restart.
+Finished entries are acknowledged and deleted together.
+"""
+
+import json
+import uuid
+import asyncio
+from dataclasses import dataclass, field, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from fastapi import status
+
+from management_server.settings import JobSettings, get_settings
+from management_server.redis_cache import get_redis_client
+from management_server.exceptions import ServerFailureError
+from management_server.logger import get_logger
+
+logger = get_logger("jobs")
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class Job:
+    name: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> "Job":
+        return cls(**json.loads(data))
+
+
+class JobQueue:
+    """
+    In-process job queue with a memory or Redis Streams backend.
+    """
+
+    def __init__(self, settings: JobSettings | None = None) -> None:
+        self.settings = settings or get_settings(JobSettings)
+        self.handlers: Dict[str, Handler] = {}
+        self.consumer = uuid.uuid4().hex
+        self._queue: asyncio.Queue | None = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    def handler(self, name: str) -> Callable[[Handler], Handler]:
+        def register(func: Handler) -> Handler:
+            self.handlers[name] = func
+            return func
+
+        return register
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.settings.job_queue_size)
+        return self._queue
+
+    @property
+    def use_redis(self) -> bool:
+        return self.settings.job_backend == "redis"
+
+    async def enqueue(self, name: str, payload: Dict[str, Any]) -> None:
+        """
+        Queues a job, call it after the transaction the job depends on commits.
+
+        Parameters:
+            name (str): The registered handler name.
+            payload (Dict[str, Any]): JSON serializable arguments for the handler.
+
+        Raises:
+            ServerFailureError: With status 503 if the queue stays full.
+        """
+        await self._put(Job(name=name, payload=payload))
+
+    async def _put(self, job: Job) -> None:
+        if self.use_redis:
+            client = get_redis_client()
+            # workers delete the entries they finish, the rest are the backlog
+            queued = await client.xlen(self.settings.job_stream)
+            if queued >= self.settings.job_queue_size:
+                raise ServerFailureError(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Job queue is full",
+                )
+            await client.xadd(self.settings.job_stream, {"job": job.dumps()})
+            return
+        try:
+            await asyncio.wait_for(
+                self.queue.put(job), timeout=self.settings.job_enqueue_timeout
+            )
+        except asyncio.TimeoutError as e:
+            raise ServerFailureError(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job queue is full",
+            ) from e
+
+    async def _run(self, job: Job) -> None:
+        handler = self.handlers.get(job.name)
+        if handler is None:
+            logger.error("no handler for job", extra={"job": job.name})
+            return
+        try:
+            await handler(job.payload)
+        except Exception as e:
+            job.attempts += 1
+            if job.attempts > self.settings.job_max_retries:
+                logger.error(
+                    "job failed",
+                    extra={"job": job.name, "job_id": job.job_id, "error": str(e)},
+                )
+                return
+            logger.warning(
+                "job retrying",
+                extra={"job": job.name, "attempts": job.attempts, "error": str(e)},
+            )
+            retry = asyncio.create_task(
+                self._retry(
+                    job, self.settings.job_retry_backoff * 2 ** (job.attempts - 1)
+                )
+            )
+            self._retries.add(retry)
+            retry.add_done_callback(self._retries.discard)
+
+    async def _retry(self, job: Job, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self._put(job)
+        except Exception as e:
+            logger.error(
+                "job dropped, could not queue the retry",
+                extra={"job": job.name, "job_id": job.job_id, "error": str(e)},
+            )
+
+    async def _memory_worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(
+                    "job worker error",
+                    extra={"job": job.name, "job_id": job.job_id, "error": str(e)},
+                )
+            finally:
+                self.queue.task_done()
+
+    async def _redis_worker(self) -> None:
+        client = get_redis_client()
+        stream, group = self.settings.job_stream, self.settings.job_group
+        while True:
+            try:
+                # jobs left pending by a stopped worker are claimed first
+                _, entries, *_ = await client.xautoclaim(
+                    stream,
+                    group,
+                    self.consumer,
+                    min_idle_time=self.settings.job_claim_idle_ms,
+                    start="0-0",
+                    count=10,
+                )
+                if not entries:
+                    response = await client.xreadgroup(
+                        group,
+                        self.consumer,
+                        streams={stream: ">"},
+                        count=10,
+                        block=1000,
+                    )
+                    entries = [
+                        entry for values in (response or {}).values() for entry in values
+                    ]
+                for entry in entries:
+                    try:
+                        data = (
+                            entry.field_values.get(b"job") or entry.field_values["job"]
+                        )
+                        await self._run(Job.loads(data))
+                    except Exception as e:
+                        logger.error(
+                            "job worker error",
+                            extra={"entry": str(entry.identifier), "error": str(e)},
+                        )
+                    # finished entries leave the stream, so its length is the
+                    # backlog and job payloads such as invite tokens are not kept
+                    async with await client.pipeline(transaction=True) as pipe:
+                        await pipe.xack(stream, group, [entry.identifier])
+                        await pipe.xdel(stream, [entry.identifier])
+                        await pipe.execute()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("job worker error", extra={"error": str(e)})
+                await asyncio.sleep(1)
+
+    async def start(self) -> None:
+        """
+        Starts the workers, called from the app lifespan.
+        """
+        if self._workers:
+            return
+        worker = self._memory_worker
+        if self.use_redis:
+            try:
+                await get_redis_client().xgroup_create(
+                    self.settings.job_stream,
+                    self.settings.job_group,
+                    identifier="$",
+                    mkstream=True,
+                )
+            except Exception:  # the group already exists
+                pass
+            worker = self._redis_worker
+        self._workers = [
+            asyncio.create_task(worker()) for _ in range(self.settings.job_workers)
+        ]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Waits for queued in-memory jobs to finish, then stops the workers.
+        """
+        if not self.use_redis and self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "jobs dropped on shutdown", extra={"pending": self._queue.qsize()}
+                )
+        if self._retries:
+            logger.warning(
+                "job retries dropped on shutdown", extra={"pending": len(self._retries)}
+            )
+        for task in [*self._workers, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+
+
+job_queue = JobQueue()
+
+
+@job_queue.handler("audit")
+async def audit(payload: Dict[str, Any]) -> None:
+    details = {key: value for key, value in payload.items() if key != "event"}
+    get_logger("audit").info(payload["event"], extra={"audit": details})
+
+
+async def enqueue_audit(event: str, **details: Any) -> None:
+    """
+    Queues an audit event, best effort.
+
+    Audits are enqueued after the change they record has committed, so a full
+    queue or an unavailable backend is logged instead of failing the request.
+    """
+    try:
+        await job_queue.enqueue("audit", {"event": event, **details})
+    except Exception as e:
+        logger.warning(
+            "audit event dropped", extra={"audit_event": event, "error": str(e)}
+        )
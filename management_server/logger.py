@@ -0,0 +1,93 @@
+"""
+Structured, sampled logging that does not block the event loop.
+
+Records are put on a queue by a QueueHandler and written by a
+QueueListener thread, so a slow stream never stalls a request.
+"""
+
+import json
+import queue
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+from management_server.settings import MetricsSettings, get_settings
+
+settings = get_settings(MetricsSettings)
+
+_listener: QueueListener | None = None
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+STANDARD_RECORD_FIELDS = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as a single line of JSON, extra fields are included.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(
+            {
+                key: value
+                for key, value in record.__dict__.items()
+                if key not in STANDARD_RECORD_FIELDS
+            }
+        )
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records below WARNING, warnings and errors are always kept.
+    """
+
+    def __init__(self, sample_rate: float) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1:
+            return True
+        return random.random() < self.sample_rate
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"management_server.{name}")
+
+
+def setup_logging() -> None:
+    """
+    Routes the app's loggers through the queue, called from the app lifespan.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JSONFormatter())
+    _listener = QueueListener(_log_queue, stream_handler)
+    _listener.start()
+
+    queue_handler = QueueHandler(_log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_rate))
+    app_logger = logging.getLogger("management_server")
+    app_logger.handlers = [queue_handler]
+    app_logger.setLevel(settings.log_level)
+    app_logger.propagate = False
+
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,143 @@
+"""
+Coalesced and negatively cached lookups.
+
+SingleFlight runs one query for concurrent identical lookups in this
+process, the other callers await its result. NegativeCache remembers in
+Redis, for a short TTL, that a lookup found nothing, so unknown staff IDs
+and free emails do not reach the database on every request. Entries are
+keyed by model and search key, and creating a row drops the entries it
+would have matched.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+from tortoise.models import Model
+
+from management_server.redis_cache import Redis, settings as redis_settings
+from management_server.logger import get_logger
+
+logger = get_logger("lookups")
+
+T = TypeVar("T")
+
+
+def lookup_key(model: type[Model], search_key: Dict[str, Any]) -> str:
+    fields = ",".join(f"{field}={value}" for field, value in sorted(search_key.items()))
+    return f"{model.__name__}:{fields}"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one call.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs func, or waits for the run already in flight for the same key.
+
+        Args:
+            key (str): Identifies the lookup, see lookup_key.
+            func (Callable): Performs the lookup.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # shielded so a caller that goes away does not cancel the others
+        return await asyncio.shield(task)
+
+
+class NegativeCache:
+    """
+    Short-lived "not found" entries in Redis.
+
+    Redis errors are logged and treated as a cache miss, the lookup then
+    goes to the database as it would without the cache.
+    """
+
+    prefix = "missing"
+
+    def __init__(self, ttl: int | None = None) -> None:
+        self.ttl = ttl or redis_settings.redis_negative_cache_ttl
+
+    def key(self, model: type[Model], search_key: Dict[str, Any]) -> str:
+        return f"{self.prefix}:{lookup_key(model, search_key)}"
+
+    def keys(self, model: type[Model], **fields: Any) -> List[str]:
+        """
+        Returns the keys of the single field lookups matching a row.
+
+        Args:
+            model (type[Model]): The model of the row.
+            **fields: The looked up fields of the row and their values.
+
+        Returns:
+            List[str]: One key per field.
+        """
+        return [self.key(model, {field: value}) for field, value in fields.items()]
+
+    async def is_missing(self, model: type[Model], search_key: Dict[str, Any]) -> bool:
+        try:
+            (missing,) = await Redis.mget([self.key(model, search_key)])
+        except Exception as e:
+            logger.warning("negative cache unavailable", extra={"error": str(e)})
+            return False
+        return missing is not None
+
+    async def remember(self, model: type[Model], search_key: Dict[str, Any]) -> None:
+        # creates only drop single field keys, see keys()
+        if len(search_key) != 1:
+            return
+        try:
+            await Redis.mset({self.key(model, search_key): "1"}, ex=self.ttl)
+        except Exception as e:
+            logger.warning("negative cache unavailable", extra={"error": str(e)})
+
+    async def forget(self, keys: List[str]) -> None:
+        try:
+            await Redis.delete_keys(*keys)
+        except Exception as e:
+            logger.warning("negative cache unavailable", extra={"error": str(e)})
+
+
+single_flight = SingleFlight()
+negative_cache = NegativeCache()
+
+
+async def exists(model: type[Model], search_key: Dict[str, Any]) -> bool:
+    """
+    Checks whether a row matches the search key, through the negative cache
+    and coalesced with identical checks in flight.
+
+    The query runs on the primary: a lagging replica could report a row that
+    was just created as missing and that answer would then be cached.
+
+    Args:
+        model (type[Model]): The model to look up.
+        search_key (Dict[str, Any]): The field filters.
+
+    Returns:
+        bool: True if a row matches.
+    """
+    if await negative_cache.is_missing(model, search_key):
+        return False
+
+    async def query() -> bool:
+        found = await model.exists(**search_key)
+        if not found:
+            await negative_cache.remember(model, search_key)
+        return found
+
+    return await single_flight.do(f"exists:{lookup_key(model, search_key)}", query)
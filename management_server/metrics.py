@@ -0,0 +1,307 @@
+"""
+Request level performance metrics exported in the Prometheus text format.
+
+Covers per-route latency, in-flight requests, database queries and time per
+request, Redis command timings and the password hashing pool.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from management_server.utils import password_hasher
+from management_server.redis_cache import cache_stats
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+DB_CLIENT_METHODS = [
+    "execute_query",
+    "execute_query_dict",
+    "execute_insert",
+    "execute_many",
+    "execute_script",
+]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self.values[tuple(sorted(labels.items()))] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class CollectedCounter(Counter):
+    """
+    A counter whose total is kept by another component and copied in when
+    the metrics are rendered.
+    """
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[tuple(sorted(labels.items()))] = value
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: str) -> None:
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+@dataclass
+class _HistogramValue:
+    buckets: List[int]
+    count: int = 0
+    total: float = 0.0
+
+
+class Histogram:
+    def __init__(
+        self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.bucket_bounds = buckets
+        self.values: Dict[Labels, _HistogramValue] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        histogram = self.values.get(key)
+        if histogram is None:
+            histogram = self.values[key] = _HistogramValue(
+                buckets=[0] * (len(self.bucket_bounds) + 1)
+            )
+        histogram.buckets[bisect_left(self.bucket_bounds, value)] += 1
+        histogram.count += 1
+        histogram.total += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, histogram in self.values.items():
+            cumulative = 0
+            for bound, count in zip(
+                (*self.bucket_bounds, "+Inf"), histogram.buckets
+            ):
+                cumulative += count
+                bucket_labels = (*labels, ("le", str(bound)))
+                yield f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+            yield f"{self.name}_count{_format_labels(labels)} {histogram.count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {histogram.total}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route"
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Database queries issued per request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Time spent in the database per request"
+)
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "Database query latency")
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Redis command latency by command"
+)
+PASSWORD_HASHER_QUEUE_DEPTH = Gauge(
+    "password_hasher_queue_depth", "Hashing calls waiting for a worker"
+)
+PASSWORD_HASHER_IN_FLIGHT = Gauge(
+    "password_hasher_in_flight", "Hashing calls running on the pool"
+)
+PASSWORD_HASHER_WAIT = CollectedCounter(
+    "password_hasher_wait_seconds_total", "Total time hashing calls waited for a worker"
+)
+PASSWORD_HASHER_COMPLETED = CollectedCounter(
+    "password_hasher_completed_total", "Hashing calls completed"
+)
+CACHE_LOOKUPS = CollectedCounter(
+    "cache_lookups_total", "Read-through cache lookups by result"
+)
+
+METRICS = [
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    DB_QUERY_LATENCY,
+    REDIS_COMMAND_LATENCY,
+    PASSWORD_HASHER_QUEUE_DEPTH,
+    PASSWORD_HASHER_IN_FLIGHT,
+    PASSWORD_HASHER_WAIT,
+    PASSWORD_HASHER_COMPLETED,
+    CACHE_LOOKUPS,
+]
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_time: float = 0.0
+    extra: Dict[str, float] = field(default_factory=dict)
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+_in_db_call: ContextVar[bool] = ContextVar("in_db_call", default=False)
+
+
+def _instrument_db_method(method: Callable) -> Callable:
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        if _in_db_call.get():
+            return await method(*args, **kwargs)
+        token = _in_db_call.set(True)
+        started_at = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            _in_db_call.reset(token)
+            DB_QUERY_LATENCY.observe(elapsed)
+            stats = request_stats.get()
+            if stats is not None:
+                stats.db_queries += 1
+                stats.db_time += elapsed
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _all_subclasses(cls: type) -> Iterable[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+def instrument_db_clients() -> None:
+    """
+    Wraps the query methods of every loaded Tortoise client class so queries
+    are counted and timed, transaction wrappers included. Call it after
+    Tortoise is initialised so the backend classes are imported.
+    """
+    for client_class in _all_subclasses(BaseDBAsyncClient):
+        for name in DB_CLIENT_METHODS:
+            method = client_class.__dict__.get(name)
+            if method is None or getattr(method, "__instrumented__", False):
+                continue
+            setattr(client_class, name, _instrument_db_method(method))
+
+
+def instrument_redis_client(client) -> None:
+    """
+    Wraps execute_command on a coredis client to time every command.
+    """
+    execute_command = client.execute_command
+    if getattr(execute_command, "__instrumented__", False):
+        return
+
+    @wraps(execute_command)
+    async def wrapper(command, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return await execute_command(command, *args, **kwargs)
+        finally:
+            name = command.decode() if isinstance(command, bytes) else str(command)
+            REDIS_COMMAND_LATENCY.observe(
+                time.perf_counter() - started_at, command=name.upper()
+            )
+
+    wrapper.__instrumented__ = True
+    client.execute_command = wrapper
+
+
+def _collect_runtime_stats() -> None:
+    stats = password_hasher.stats
+    PASSWORD_HASHER_QUEUE_DEPTH.set(stats.queue_depth)
+    PASSWORD_HASHER_IN_FLIGHT.set(stats.in_flight)
+    PASSWORD_HASHER_WAIT.set(stats.total_wait_time)
+    PASSWORD_HASHER_COMPLETED.set(stats.completed)
+    CACHE_LOOKUPS.set(cache_stats.hits, result="hit")
+    CACHE_LOOKUPS.set(cache_stats.misses, result="miss")
+
+
+def render_metrics() -> str:
+    _collect_runtime_stats()
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, in-flight requests and database usage per route.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            REQUESTS_IN_FLIGHT.dec()
+            request_stats.reset(token)
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", "unmatched"),
+                "status": str(status_code),
+            }
+            REQUEST_LATENCY.observe(elapsed, **labels)
+            DB_QUERIES_PER_REQUEST.observe(stats.db_queries, route=labels["route"])
+            DB_TIME_PER_REQUEST.observe(stats.db_time, route=labels["route"])
@@ -1 +1,7 @@
-from management_server.models.models import UserModel, StaffModel, AdminModel, DepartmentModel
+from management_server.models.models import (
+    UserModel,
+    StaffModel,
+    AdminModel,
+    DepartmentModel,
+    OutboxModel,
+)
@@ -1,20 +1,26 @@
 from __future__ import annotations
+from contextlib import nullcontext
 from typing import TypeVar
 
 from fastapi import status
 
 from tortoise import fields
 from tortoise.models import Model
+from tortoise.expressions import F
 from tortoise.transactions import in_transaction
 from tortoise.exceptions import IntegrityError, OperationalError
 
 
 from management_server.utils import (
-    hash_password,
+    password_hasher,
     generate_random_password,
     generate_staff_id,
 )
 from management_server.exceptions import InvalidRequestError, ServerFailureError
+from management_server.logger import get_logger
+from management_server.db import PRIMARY_CONNECTION
+
+logger = get_logger("models")
 
 
 MODEL = TypeVar("MODEL")
@@ -24,8 +30,12 @@ class BaseModel(Model):
 
     @classmethod
     async def _create(cls, instance: MODEL, using_db=None):
-        async with in_transaction() as connection:
-            db = using_db or connection
+        # only opens a transaction of its own when the caller is not in one
+        async with (
+            nullcontext(using_db)
+            if using_db is not None
+            else in_transaction(PRIMARY_CONNECTION)
+        ) as db:
             await instance.save(using_db=db, force_create=True)
             return None
 
@@ -43,7 +53,7 @@ class TimestampMixin:
 
 class BaseStaffModel(TimestampMixin, BaseModel):
     id = fields.UUIDField(primary_key=True)
-    staff_id = fields.CharField(max_length=13)
+    staff_id = fields.CharField(max_length=13, unique=True)
     user: fields.OneToOneRelation["UserModel"] = fields.OneToOneField(
         model_name="models.UserModel", on_delete=fields.CASCADE
     )
@@ -54,35 +64,22 @@ class BaseStaffModel(TimestampMixin, BaseModel):
         Create a new instance of the class with the given keyword arguments and save it to the database.
 
         Args:
-            **kwargs: Keyword arguments to initialize the instance.
-
-        Raises:
-            ValueError: If the "password" argument is not provided.
+            **kwargs: Keyword arguments to initialize the instance, staff_id included.
 
         Returns:
             The newly created instance.
         """
         try:
-            department_id: DepartmentModel = kwargs.get("department_id", None)
-            if department_id is None:
-                raise ValueError("Department must be set")
-            department = await DepartmentModel.get_or_none(
-                department_id=department_id
-            )
-            department_short_name = department.short_name
-            department_staff_count = (
-                await StaffModel.filter(department=department).all().count() + 1
-            )
-            generated_staff_id = generate_staff_id(
-                short_name=department_short_name, count=department_staff_count
-            )
-            kwargs.update({"staff_id":generated_staff_id})
             instance = cls(**kwargs)
             await cls._create(instance, using_db=using_db)
             return instance
-        except (AttributeError, OperationalError, IntegrityError) as e:
-            print(e)
-            raise ServerFailureError(detail="Could not create Staff") from e
+        except (AttributeError, TypeError, OperationalError, IntegrityError) as e:
+            logger.error(
+                "staff create failed", extra={"model": cls.__name__, "error": str(e)}
+            )
+            raise ServerFailureError(
+                detail=f"Could not create {cls.__name__.removesuffix('Model')}"
+            ) from e
 
 
 class UserModel(TimestampMixin, BaseModel):
@@ -101,11 +98,21 @@ class UserModel(TimestampMixin, BaseModel):
     state = fields.CharField(max_length=20, min_length=3, null=False)
     lga = fields.CharField(max_length=20, min_length=3, null=False)
     ward = fields.CharField(max_length=20, min_length=3, null=False)
-    password_hash = fields.CharField(max_length=500, null=False)
+    # unset for invited users until they activate their account
+    password_hash = fields.CharField(max_length=500, null=True)
+    activation_token_hash = fields.CharField(max_length=64, null=True, unique=True)
+    activation_expires_at = fields.DatetimeField(null=True)
 
     class Meta:
         table = "user"
         ordering = ["state", "lga", "ward", "created_at"]
+        # one per level of the location filter of the staff listing, whose
+        # filtered pages are keyset paginated on (created_at, user_id)
+        indexes = (
+            ("state", "created_at", "user_id"),
+            ("state", "lga", "created_at", "user_id"),
+            ("state", "lga", "ward", "created_at", "user_id"),
+        )
 
     @property
     def full_name(self):
@@ -118,11 +125,12 @@ class UserModel(TimestampMixin, BaseModel):
         return f"{self.first_name} {self.last_name}"
 
     @classmethod
-    async def create(cls, using_db=None, **kwargs) -> MODEL:
+    async def create(cls, using_db=None, invite: bool = False, **kwargs) -> MODEL:
         """
         Create a new instance of the class with the given keyword arguments and save it to the database.
 
         Args:
+            invite (bool): Leave the password unset, the user sets it on activation.
             **kwargs: Keyword arguments to initialize the instance.
 
         Raises:
@@ -132,9 +140,10 @@ class UserModel(TimestampMixin, BaseModel):
             The newly created instance.
         """
         password = kwargs.get("password_hash", None)
-        if password is None:
+        if password is None and not invite:
             password = generate_random_password()
-        kwargs.update({"password_hash": hash_password(password)})
+        if password is not None:
+            kwargs.update({"password_hash": await password_hasher.hash(password)})
         instance = cls(**kwargs)
         try:
             await cls._create(instance=instance, using_db=using_db)
@@ -156,11 +165,65 @@ class DepartmentModel(TimestampMixin, BaseModel):
             model_name="models.AdminModel", on_delete=fields.SET_NULL, null=True
         )
     )
+    staff_sequence = fields.IntField(default=0)
 
     class Meta:
         table = "department"
         ordering = ["name", "short_name"]
 
+    @classmethod
+    async def next_staff_number(
+        cls, department_id, using_db=None
+    ) -> tuple[str, int] | None:
+        """
+        Atomically allocates the next staff number for a department.
+
+        The counter is bumped with a single UPDATE, so the row stays locked until
+        the surrounding transaction commits and concurrent creates can not read
+        the same value.
+
+        Args:
+            department_id: The ID of the department.
+            using_db: The connection of the surrounding transaction.
+
+        Returns:
+            tuple[str, int] | None: The department short name and the allocated number,
+            or None if the department does not exist.
+        """
+        return await cls.allocate_staff_numbers(
+            department_id=department_id, count=1, using_db=using_db
+        )
+
+    @classmethod
+    async def allocate_staff_numbers(
+        cls, department_id, count: int, using_db=None
+    ) -> tuple[str, int] | None:
+        """
+        Atomically reserves `count` staff numbers for a department.
+
+        Args:
+            department_id: The ID of the department.
+            count (int): How many numbers to reserve.
+            using_db: The connection of the surrounding transaction.
+
+        Returns:
+            tuple[str, int] | None: The department short name and the last number
+            of the reserved range, or None if the department does not exist.
+        """
+        updated = (
+            await cls.filter(department_id=department_id)
+            .using_db(using_db)
+            .update(staff_sequence=F("staff_sequence") + count)
+        )
+        if not updated:
+            return None
+        return (
+            await cls.filter(department_id=department_id)
+            .using_db(using_db)
+            .first()
+            .values_list("short_name", "staff_sequence")
+        )
+
 
 class StaffModel(BaseStaffModel):
     department: fields.ForeignKeyRelation["DepartmentModel"] = fields.ForeignKeyField(
@@ -170,10 +233,76 @@ class StaffModel(BaseStaffModel):
     class Meta:
         table = "staff"
         ordering = ["staff_id"]
+        indexes = (("department_id", "staff_id"),)
+
+    @classmethod
+    async def create(cls, using_db=None, **kwargs) -> StaffModel:
+        """
+        Creates a staff member with the next staff ID of their department.
+
+        Args:
+            **kwargs: Keyword arguments to initialize the instance.
+
+        Raises:
+            ValueError: If the "department_id" argument is not provided.
+
+        Returns:
+            The newly created instance.
+        """
+        department_id = kwargs.get("department_id", None)
+        if department_id is None:
+            raise ValueError("Department must be set")
+        async with (
+            nullcontext(using_db)
+            if using_db is not None
+            else in_transaction(PRIMARY_CONNECTION)
+        ) as db:
+            try:
+                department_short_name, staff_number = (
+                    await DepartmentModel.next_staff_number(
+                        department_id=department_id, using_db=db
+                    )
+                )
+            except (TypeError, OperationalError) as e:
+                logger.error(
+                    "staff number allocation failed",
+                    extra={"department_id": str(department_id), "error": str(e)},
+                )
+                raise ServerFailureError(detail="Could not create Staff") from e
+            kwargs.update(
+                {
+                    "staff_id": generate_staff_id(
+                        short_name=department_short_name, count=staff_number
+                    )
+                }
+            )
+            return await super().create(using_db=db, **kwargs)
 
 
 class AdminModel(BaseStaffModel):
+    """
+    A staff member with admin rights, the admin row keeps the staff ID the
+    user was given as staff and belongs to no department.
+    """
 
     class Meta:
         table = "admin"
         ordering = ["id"]
+
+
+class OutboxModel(BaseModel):
+    """
+    Changes to derived stores, written in the same transaction as the rows
+    they derive from and drained by the outbox relay.
+    """
+
+    id = fields.BigIntField(primary_key=True)
+    topic = fields.CharField(max_length=50, null=False)
+    payload = fields.JSONField(null=False)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    # set while a relay applies the row, rows past it can be claimed again
+    claimed_until = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "outbox"
+        ordering = ["id"]
@@ -0,0 +1,214 @@
+"""
+Transactional outbox.
+
+Controllers record cache and directory changes as outbox rows inside the
+same transaction as the user, staff and department writes, so a change is
+only ever published if the write committed. The relay drains the outbox in
+id order and applies a whole batch to Redis in one pipeline round trip.
+Every event sets or deletes a key to a final value, so applying an event
+twice is harmless.
+
+A batch is claimed and deleted in two short transactions and applied to
+Redis between them with a timeout, so a slow Redis never holds a database
+transaction open.
+"""
+
+import asyncio
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from tortoise import timezone
+from tortoise.expressions import Q
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from management_server.models import OutboxModel
+from management_server.schemas import UserInCache
+from management_server.settings import OutboxSettings, get_settings
+from management_server.redis_cache import Redis, settings as redis_settings
+from management_server.department_registry import department_registry
+from management_server.logger import get_logger
+from management_server.db import PRIMARY_CONNECTION
+
+logger = get_logger("outbox")
+
+CACHE_SET = "cache.set"
+CACHE_DELETE = "cache.delete"
+DEPARTMENTS_CHANGED = "departments.changed"
+
+Applier = Callable[[List[OutboxModel]], Awaitable[None]]
+
+
+async def outbox_cache_set(
+    items: Dict[str, UserInCache], using_db: BaseDBAsyncClient
+) -> None:
+    await OutboxModel.create(
+        topic=CACHE_SET,
+        payload={"items": {key: data.model_dump_json() for key, data in items.items()}},
+        using_db=using_db,
+    )
+
+
+async def outbox_cache_delete(keys: List[str], using_db: BaseDBAsyncClient) -> None:
+    await OutboxModel.create(
+        topic=CACHE_DELETE, payload={"keys": keys}, using_db=using_db
+    )
+
+
+async def outbox_departments_changed(using_db: BaseDBAsyncClient) -> None:
+    await OutboxModel.create(topic=DEPARTMENTS_CHANGED, payload={}, using_db=using_db)
+
+
+class OutboxRelay:
+    """
+    Drains the outbox into Redis and the other derived stores.
+    """
+
+    def __init__(self, settings: OutboxSettings | None = None) -> None:
+        self.settings = settings or get_settings(OutboxSettings)
+        self.appliers: Dict[str, Applier] = {}
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def register(self, topic: str, applier: Applier) -> None:
+        """
+        Registers an applier for topics that are not Redis cache writes.
+        """
+        self.appliers[topic] = applier
+
+    @property
+    def wake(self) -> asyncio.Event:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    def notify(self) -> None:
+        """
+        Wakes the relay, call it after a transaction that wrote to the outbox commits.
+        """
+        self.wake.set()
+
+    async def _apply_cache(self, events: List[OutboxModel]) -> None:
+        cache_events = [
+            event for event in events if event.topic in [CACHE_SET, CACHE_DELETE]
+        ]
+        if not cache_events:
+            return
+        async with await Redis.pipeline() as pipe:
+            for event in cache_events:
+                if event.topic == CACHE_SET:
+                    for key, data in event.payload["items"].items():
+                        await pipe.set(key, data, ex=redis_settings.redis_cache_ttl)
+                elif event.payload["keys"]:
+                    await pipe.delete(event.payload["keys"])
+            await pipe.execute()
+
+    async def apply(self, events: List[OutboxModel]) -> None:
+        await self._apply_cache(events)
+        for topic, applier in self.appliers.items():
+            topic_events = [event for event in events if event.topic == topic]
+            if topic_events:
+                await applier(topic_events)
+
+    async def _claim(self) -> List[OutboxModel]:
+        """
+        Claims the oldest unclaimed rows for this relay.
+        """
+        now = timezone.now()
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            query = (
+                OutboxModel.filter(
+                    Q(claimed_until__isnull=True) | Q(claimed_until__lt=now)
+                )
+                .using_db(connection)
+                .order_by("id")
+                .limit(self.settings.outbox_batch_size)
+            )
+            if connection.capabilities.dialect == "postgres":
+                # lets relays on other workers take the next batch
+                query = query.select_for_update(skip_locked=True)
+            events = await query
+            if events:
+                await OutboxModel.filter(
+                    id__in=[event.id for event in events]
+                ).using_db(connection).update(
+                    claimed_until=now + timedelta(seconds=self.settings.outbox_claim_ttl)
+                )
+        return events
+
+    async def _release(self, event_ids: List[int]) -> None:
+        # the next drain retries the batch first, keeping changes in order
+        try:
+            async with in_transaction(PRIMARY_CONNECTION) as connection:
+                await OutboxModel.filter(id__in=event_ids).using_db(
+                    connection
+                ).update(claimed_until=None)
+        except Exception as e:  # the claim runs out on its own
+            logger.warning("could not release outbox rows", extra={"error": str(e)})
+
+    async def drain_once(self) -> int:
+        """
+        Applies one batch of outbox rows and removes them.
+
+        Raises:
+            asyncio.TimeoutError: If Redis does not take the batch in time, the
+                rows are released and applied again by the next drain.
+
+        Returns:
+            int: The number of rows applied.
+        """
+        events = await self._claim()
+        if not events:
+            return 0
+        event_ids = [event.id for event in events]
+        try:
+            await asyncio.wait_for(
+                self.apply(events), timeout=self.settings.outbox_apply_timeout
+            )
+        except Exception:
+            await self._release(event_ids)
+            raise
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            await OutboxModel.filter(id__in=event_ids).using_db(connection).delete()
+        return len(events)
+
+    async def _run(self) -> None:
+        while True:
+            # cleared before draining so a notify during the drain is not lost
+            self.wake.clear()
+            try:
+                applied = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("outbox relay error", extra={"error": str(e)})
+                applied = 0
+            if applied >= self.settings.outbox_batch_size:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self.wake.wait(), timeout=self.settings.outbox_poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def _departments_changed(events: List[OutboxModel]) -> None:
+    await department_registry.invalidate()
+
+
+outbox_relay = OutboxRelay()
+outbox_relay.register(DEPARTMENTS_CHANGED, _departments_changed)
@@ -0,0 +1,114 @@
+"""
+Redis token bucket rate limiter.
+
+The bucket is refilled and drawn from inside a Lua script, so concurrent
+requests across workers see a consistent count and a rejected request costs
+a single EVALSHA round trip.
+"""
+
+import time
+from typing import Dict, Tuple
+
+from fastapi import status
+
+from management_server.settings import RateLimitSettings, get_settings
+from management_server.redis_cache import get_redis_client
+from management_server.exceptions import InvalidRequestError
+from management_server.logger import get_logger
+
+logger = get_logger("rate_limit")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_per_ms)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / refill_per_ms)
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / refill_per_ms))
+return {allowed, retry_after}
+"""
+
+
+def parse_limit(limit: str) -> Tuple[int, int]:
+    """
+    Parses a limit such as "5/minute" into (requests, period in seconds).
+    """
+    requests, period = limit.split("/")
+    return int(requests), PERIODS[period.strip()]
+
+
+class RateLimiter:
+    """
+    Applies the per-route limits from RateLimitSettings.
+    """
+
+    def __init__(self, settings: RateLimitSettings | None = None) -> None:
+        self.settings = settings or get_settings(RateLimitSettings)
+        self.limits: Dict[str, Tuple[int, int]] = {
+            route: parse_limit(limit)
+            for route, limit in self.settings.rate_limits.items()
+        }
+        self._script = None
+        self._client = None
+
+    @property
+    def script(self):
+        client = get_redis_client()
+        if self._script is None or self._client is not client:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._client = client
+        return self._script
+
+    async def _take(self, key: str, capacity: int, period: int) -> int:
+        allowed, retry_after = await self.script(
+            keys=[key],
+            args=[capacity, capacity / (period * 1000), int(time.time() * 1000)],
+        )
+        return 0 if int(allowed) else int(retry_after)
+
+    async def hit(self, route: str, *identities: str) -> None:
+        """
+        Takes a token from the route's bucket for every identity.
+
+        Parameters:
+            route (str): The route name in RateLimitSettings.rate_limits.
+            identities (str): The identities to limit, e.g. the client IP and the email.
+
+        Raises:
+            InvalidRequestError: With status 429 if any bucket is empty.
+        """
+        if not self.settings.rate_limit_enabled or route not in self.limits:
+            return
+        capacity, period = self.limits[route]
+        retry_after = 0
+        try:
+            for identity in identities:
+                retry_after = max(
+                    retry_after,
+                    await self._take(f"ratelimit:{route}:{identity}", capacity, period),
+                )
+        except Exception as e:  # fail open, a Redis outage should not lock everyone out
+            logger.warning("rate limiter unavailable", extra={"error": str(e)})
+            return
+        if retry_after:
+            raise InvalidRequestError(
+                detail="Too many requests, try again later",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(1, -(-retry_after // 1000)))},
+            )
+
+
+rate_limiter = RateLimiter()
@@ -2,27 +2,90 @@
 Redis Module
 """
 
-from typing import Self
+import time
+from typing import Dict, List, Mapping, Self
+from dataclasses import dataclass
 import coredis
+from coredis.pipeline import Pipeline
 
 from management_server.schemas import UserInCache
-from management_server.settings import RedisSettings
+from management_server.settings import RedisSettings, get_settings
 from management_server.exceptions import InvalidRequestError
 
-settings = RedisSettings()
+settings = get_settings(RedisSettings)
+
+_redis_client: coredis.Redis | None = None
+
+
+def create_redis_client(redis_settings: RedisSettings | None = None) -> coredis.Redis:
+    """
+    Creates a Redis client backed by an explicit connection pool.
+
+    No connection is opened here, the pool connects on the first command.
+
+    :param redis_settings: The settings to build the pool from.
+    :type redis_settings: RedisSettings | None
+    :return: A coredis.Redis object representing the Redis client.
+    :rtype: coredis.Redis
+    """
+    redis_settings = redis_settings or settings
+    pool = coredis.ConnectionPool(
+        host=redis_settings.redis_host,
+        port=redis_settings.redis_port,
+        db=redis_settings.redis_db,
+        password=redis_settings.redis_password,
+        max_connections=redis_settings.redis_max_connections,
+        connect_timeout=redis_settings.redis_connect_timeout,
+        stream_timeout=redis_settings.redis_stream_timeout,
+    )
+    return coredis.Redis(connection_pool=pool)
+
+
+def init_redis_client(redis_settings: RedisSettings | None = None) -> coredis.Redis:
+    """
+    Creates the process wide Redis client, called from the app lifespan.
+    """
+    global _redis_client
+    _redis_client = create_redis_client(redis_settings)
+    return _redis_client
+
+
+def close_redis_client() -> None:
+    """
+    Disconnects the process wide Redis client pool.
+    """
+    global _redis_client
+    if _redis_client is not None:
+        _redis_client.connection_pool.disconnect()
+        _redis_client = None
 
 
 def get_redis_client() -> coredis.Redis:
     """
-    Returns a Redis client object.
+    Returns the process wide Redis client shared by the Redis helpers.
+
+    The client is created lazily if the app lifespan has not created it yet.
 
     :return: A coredis.Redis object representing the Redis client.
     :rtype: coredis.Redis
     """
-    return coredis.Redis(host=settings.redis_host, port=settings.redis_port)
+    if _redis_client is None:
+        return init_redis_client()
+    return _redis_client
 
 
-redis_client = get_redis_client()
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+cache_stats = CacheStats()
 
 
 class Redis:
@@ -49,29 +112,176 @@ class Redis:
         Raises:
             InvalidCredentialsError: If the secret is invalid.
         """
-        exists = await redis_client.exists([self.user_id])
+        exists = await get_redis_client().exists([self.user_id])
         if exists != 1:
             raise InvalidRequestError(detail="User not found in cache", status_code=404)
         return self
 
     @staticmethod
-    async def create_key(key: str, data: UserInCache) -> bool:
+    async def create_key(key: str, data: UserInCache, ex: int | None = None) -> bool:
         """
         Creates a key in Redis
 
         Parameters:
             secret (str): The secret used as the key in Redis.
             data: The data to store in Redis.
+            ex (int | None): The TTL in seconds, defaults to the cache TTL.
 
         Returns:
             bool: Returns True if the key was successfully created and set to expire after the specified TTL, otherwise returns False.
         """
-        created_hash = await redis_client.set(key, data.model_dump_json())
+        created_hash = await get_redis_client().set(
+            key, data.model_dump_json(), ex=ex or settings.redis_cache_ttl
+        )
 
         if created_hash == 0:
             return False
         return True
 
+    @staticmethod
+    async def create_keys(items: Dict[str, UserInCache]) -> bool:
+        """
+        Creates many keys in Redis in a single pipelined round trip.
+
+        Parameters:
+            items (Dict[str, UserInCache]): The data to store, keyed by the Redis key.
+
+        Returns:
+            bool: Returns True if the keys were set, otherwise returns False.
+        """
+        return await Redis.mset(
+            {key: data.model_dump_json() for key, data in items.items()},
+            ex=settings.redis_cache_ttl,
+        )
+
+    @staticmethod
+    async def pipeline(transaction: bool = False) -> Pipeline:
+        """
+        Returns a pipeline on the shared client, commands queued on it are sent
+        in a single round trip when it is executed.
+
+        Parameters:
+            transaction (bool): Wrap the queued commands in MULTI/EXEC.
+
+        Returns:
+            Pipeline: The pipeline, use it as an async context manager.
+        """
+        return await get_redis_client().pipeline(transaction=transaction)
+
+    @staticmethod
+    async def mset(values: Mapping[str, str | bytes], ex: int | None = None) -> bool:
+        """
+        Sets many keys at once.
+
+        Without a TTL this is a single MSET, with a TTL the SETs are pipelined
+        since MSET can not expire keys.
+
+        Parameters:
+            values (Mapping[str, str | bytes]): The values to set, keyed by the Redis key.
+            ex (int | None): The TTL in seconds.
+
+        Returns:
+            bool: Returns True if the keys were set.
+        """
+        if not values:
+            return True
+        if ex is None:
+            return await get_redis_client().mset(values)
+        async with await Redis.pipeline() as pipe:
+            for key, value in values.items():
+                await pipe.set(key, value, ex=ex)
+            await pipe.execute()
+        return True
+
+    @staticmethod
+    async def mget(keys: List[str]) -> List[bytes | None]:
+        """
+        Reads many keys in a single MGET.
+
+        Parameters:
+            keys (List[str]): The keys to read.
+
+        Returns:
+            List[bytes | None]: The values in the order of the keys, None for missing keys.
+        """
+        if not keys:
+            return []
+        return list(await get_redis_client().mget(keys))
+
+    @staticmethod
+    async def get_key(key: str) -> UserInCache | None:
+        """
+        Reads a cached user from Redis.
+
+        Parameters:
+            key (str): The key the user was cached under.
+
+        Returns:
+            UserInCache | None: The cached user, or None on a cache miss.
+        """
+        data = await get_redis_client().get(key)
+        if data is None:
+            cache_stats.misses += 1
+            return None
+        cache_stats.hits += 1
+        return UserInCache.model_validate_json(data)
+
+    @staticmethod
+    async def add_session(
+        key: str, session_id: str, expires_at: float, ttl: int, limit: int
+    ) -> None:
+        """
+        Records a session in the sorted set of a user's sessions.
+
+        The set is scored by expiry and updated in a single MULTI/EXEC, so
+        concurrent logins can not overwrite each other. Expired sessions are
+        dropped and only the newest `limit` sessions are kept.
+
+        Parameters:
+            key (str): The key of the user's sessions.
+            session_id (str): The ID of the new session.
+            expires_at (float): The unix time the session expires at.
+            ttl (int): The TTL of the whole set in seconds.
+            limit (int): The number of sessions a user may have.
+        """
+        async with await Redis.pipeline(transaction=True) as pipe:
+            await pipe.zremrangebyscore(key, 0, time.time())
+            await pipe.zadd(key, {session_id: expires_at})
+            await pipe.zremrangebyrank(key, 0, -(limit + 1))
+            await pipe.expire(key, ttl)
+            await pipe.execute()
+
+    @staticmethod
+    async def session_active(key: str, session_id: str) -> bool:
+        """
+        Checks that a session is recorded and has not expired.
+
+        Parameters:
+            key (str): The key of the user's sessions.
+            session_id (str): The ID of the session.
+
+        Returns:
+            bool: True if the session is still active.
+        """
+        expires_at = await get_redis_client().zscore(key, session_id)
+        return expires_at is not None and float(expires_at) > time.time()
+
+    @staticmethod
+    async def delete_keys(*keys: str) -> int:
+        """
+        Removes keys from Redis.
+
+        Parameters:
+            keys (str): The keys to remove.
+
+        Returns:
+            int: The number of keys removed.
+        """
+        keys = [key for key in keys if key is not None]
+        if not keys:
+            return 0
+        return await get_redis_client().delete(keys)
+
     # async def check_if_token_valid(self, token: str) -> bool:
     #     """
     #     Check if the given token is valid.
@@ -0,0 +1,39 @@
+"""
+Fast response path.
+
+With AppConfig.fast_responses on, routes return schemas wrapped in a
+SchemaResponse which serializes them to JSON once with pydantic-core,
+skipping FastAPI's response validation and jsonable_encoder pass.
+"""
+
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from management_server.settings import AppConfig, get_settings
+
+fast_responses = get_settings(AppConfig).fast_responses
+
+
+class SchemaResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json(by_alias=True).encode()
+
+
+def schema_response(schema: BaseModel | None) -> Any:
+    """
+    Wraps a schema in a SchemaResponse when fast responses are enabled.
+
+    Parameters:
+        schema (BaseModel | None): The schema the route returns.
+
+    Returns:
+        SchemaResponse | BaseModel | None: The response, or the schema itself
+        when fast responses are off.
+    """
+    if not fast_responses or schema is None:
+        return schema
+    return SchemaResponse(schema)
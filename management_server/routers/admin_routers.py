@@ -1,40 +1,66 @@
+from uuid import UUID
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, UploadFile
 from management_server.controllers import UserController, AdminController
-from management_server.schemas import StaffSchema
+from management_server.schemas import AdminSchema, StaffSchema, ImportReport
 from management_server.forms import StaffCreateForm, AdminCreateForm
+from management_server.utils.importers import iter_upload_rows
+from management_server.exceptions import InvalidRequestError
+from management_server.dependencies import get_current_admin
 
-router = APIRouter(prefix="/admin", tags=["staff"])
+router = APIRouter(
+    prefix="/admin", tags=["staff"], dependencies=[Depends(get_current_admin)]
+)
 
 
-@router.get(
-    "/{admin_id}",
-    response_model_by_alias=StaffSchema,
-    response_model_exclude=["updated_at"],
-)
+@router.get("/{admin_id}", response_model=AdminSchema)
 async def get_admin(admin_id):
     admin_controller = AdminController(id=admin_id)
-    return await admin_controller.get()
+    admin = await admin_controller.get()
+    if admin is None:
+        raise InvalidRequestError(
+            detail="Admin with this ID does not exist", status_code=404
+        )
+    return admin
 
 
-@router.post(
-    "/create-staff/",
-    response_model_by_alias=StaffSchema,
-    response_model_exclude=["created_at", "updated_at"],
-)
+@router.post("/create-staff/", response_model=StaffSchema)
 async def create_staff(
     form_data: Annotated[StaffCreateForm, Depends()],
 ):
+    """
+    Creates a staff member, their activation token is sent to them by email.
+    """
     new_staff = await UserController.create(form_data=form_data.__dict__)
     return new_staff
 
 
-@router.post(
-    "/create-admin/",
-    response_model_by_alias=StaffSchema,
-    response_model_exclude=["created_at", "updated_at"],
-)
+@router.post("/import-staff/", response_model=ImportReport)
+async def import_staff(file: UploadFile):
+    """
+    Bulk onboards staff from a CSV or NDJSON upload.
+
+    Each row takes the same fields as create-staff, rows that fail are listed
+    in the returned report with their row number. Activation tokens are sent
+    to the new staff, not returned.
+    """
+    return await UserController.bulk_create(rows=iter_upload_rows(file))
+
+
+@router.post("/resend-invite/{staff_id}", status_code=204)
+async def resend_invite(staff_id: UUID):
+    """
+    Sends a staff member who has not activated a new activation token, the
+    token sent before stops working.
+    """
+    await UserController.resend_invite(staff_id=staff_id)
+
+
+@router.post("/create-admin/", response_model=AdminSchema)
 async def create_admin(form_data: Annotated[AdminCreateForm, Depends()]):
+    """
+    Makes an existing staff member an admin, the admin keeps their staff ID.
+    """
     new_admin = await AdminController.create(form_data=form_data.__dict__)
     return new_admin
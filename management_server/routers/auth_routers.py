@@ -1,17 +1,22 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from management_server.controllers import AuthController
-from management_server.forms import LoginForm
+from management_server.forms import LoginForm, RefreshForm, ActivationForm
+from management_server.schemas import Token
+from management_server.rate_limit import rate_limiter
 
 router = APIRouter(prefix="/auth")
 
 
-@router.post("/login", response_model_exclude_none=True)
-# @limiter.limit("5/minute")
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+@router.post("/login", response_model=Token, response_model_exclude_none=True)
 async def login(
     form_data: Annotated[LoginForm, Depends()],
-    # background_tasks: BackgroundTasks, Add a background task to send an email to the user on new login
+    request: Request,
 ):
     """
     Login function for authentication.
@@ -20,12 +25,43 @@ async def login(
     :type form_data: Annotated[LoginForm, Depends()]
     :param request: The request object.
     :type request: Request
-    :param response: The response object.
-    :type response: Response
-    :param background_tasks: The background tasks object.
-    :type background_tasks: BackgroundTasks
-    :return: Token object containing the authentication token and its expiration time.
+    :return: Token object containing the access and refresh tokens and the access token lifetime.
     :rtype: Token
     """
+    await rate_limiter.hit(
+        "login", f"ip:{_client_ip(request)}", f"email:{form_data.email.lower()}"
+    )
     auth_controller = AuthController.model_validate(form_data.__dict__)
-    await auth_controller.validate_password()
+    return await auth_controller.login(device_name=request.headers.get("user-agent"))
+
+
+@router.post("/refresh", response_model=Token, response_model_exclude_none=True)
+async def refresh(form_data: Annotated[RefreshForm, Depends()], request: Request):
+    """
+    Issues a new access token from a refresh token.
+
+    :param form_data: Form data containing the refresh token.
+    :type form_data: Annotated[RefreshForm, Depends()]
+    :param request: The request object.
+    :type request: Request
+    :return: Token object containing the new access token.
+    :rtype: Token
+    """
+    await rate_limiter.hit("refresh", f"ip:{_client_ip(request)}")
+    return await AuthController.refresh(form_data.refresh_token)
+
+
+@router.post("/activate", status_code=204)
+async def activate(form_data: Annotated[ActivationForm, Depends()], request: Request):
+    """
+    Sets the first password of an invited staff member.
+
+    :param form_data: Form data containing the activation token and the new password.
+    :type form_data: Annotated[ActivationForm, Depends()]
+    :param request: The request object.
+    :type request: Request
+    """
+    await rate_limiter.hit("activate", f"ip:{_client_ip(request)}")
+    await AuthController.activate(
+        activation_token=form_data.activation_token, password=form_data.password
+    )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from management_server.health import OK, readiness_probe
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    """
+    Liveness, the process is up and its event loop is answering.
+    """
+    return {"status": OK}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz():
+    """
+    Readiness, 503 until the database and Redis answer and the worker pools have room.
+    """
+    report = await readiness_probe.check()
+    return JSONResponse(
+        content=report.model_dump(mode="json", by_alias=True),
+        status_code=(
+            status.HTTP_200_OK
+            if report.status == OK
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
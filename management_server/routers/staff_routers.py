@@ -1,21 +1,73 @@
-from fastapi import APIRouter
-from management_server.schemas import UserSchema
+from uuid import UUID
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from management_server.schemas import (
+    UserSchema,
+    StaffSchema,
+    StaffPage,
+    StaffSearchPage,
+)
 from management_server.controllers import StaffController
 from management_server.forms import StaffUpdateForm
+from management_server.dependencies import get_current_user, get_current_admin
+from management_server.exceptions import InvalidRequestError
+from management_server.responses import schema_response
+
+router = APIRouter(
+    prefix="/users", tags=["staff"], dependencies=[Depends(get_current_user)]
+)
+
 
-router = APIRouter(prefix="/users", tags=["staff"])
+@router.get("/staff", response_model=StaffPage)
+async def list_staff(
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: str | None = None,
+    department_id: Annotated[UUID | None, Query(alias="department-id")] = None,
+    state: str | None = None,
+    lga: str | None = None,
+    ward: str | None = None,
+):
+    page = await StaffController.get_page(
+        limit=limit,
+        cursor=cursor,
+        department_id=department_id,
+        state=state,
+        lga=lga,
+        ward=ward,
+    )
+    return schema_response(page)
+
+
+@router.get("/search", response_model=StaffSearchPage)
+async def search_staff(
+    q: Annotated[str, Query(min_length=3, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    page = await StaffController.search(query=q, limit=limit, offset=offset)
+    return schema_response(page)
 
 
 @router.get(
     "/staff/{staff_id}",
-    response_model=UserSchema,
+    response_model=StaffSchema,
 )
 async def get_staff(staff_id):
     staff_controller = StaffController(id=staff_id)
-    return await staff_controller.get()
+    staff = await staff_controller.get()
+    if staff is None:
+        raise InvalidRequestError(
+            detail="Staff with this ID does not exist", status_code=404
+        )
+    return schema_response(staff)
 
 
-@router.put("/staff/{staff_id}", response_model_by_alias=UserSchema)
+@router.put(
+    "/staff/{staff_id}",
+    response_model_by_alias=UserSchema,
+    dependencies=[Depends(get_current_admin)],
+)
 async def update_staff(staff_id, form_data: StaffUpdateForm):
     staff_controller = StaffController(
         id=staff_id,
@@ -27,6 +79,7 @@ async def update_staff(staff_id, form_data: StaffUpdateForm):
     return await staff_controller.update()
 
 
-@router.delete("/staff/{staff_id}")
+@router.delete("/staff/{staff_id}", dependencies=[Depends(get_current_admin)])
 async def delete_staff(staff_id):
-    pass
+    staff_controller = StaffController(id=staff_id)
+    return await staff_controller.delete()
@@ -15,12 +15,15 @@ from management_server.utils.validators import phone_number_vaidator
 
 
 class BaseSchema(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+    model_config = ConfigDict(extra="ignore", from_attributes=True)
     created_at: Optional[datetime] = Field(serilization_alias="created-at", default=None)
     modified_at: Optional[datetime] = Field(serilization_alias="updated-at", default=None)
 
     @model_validator(mode="before")
     def filter_extra_fields(cls, values):
+        if not isinstance(values, dict):
+            # built from attributes, only the declared fields are read
+            return values
         valid_fields = {field: values[field] for field in cls.model_fields if field in values and values }
         return valid_fields
 
@@ -72,23 +75,86 @@ class DepartmentSchema(BaseSchema):
 
 
 class StaffSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
     user:UserSchema
     department_id:UUID = Field(serialization_alias="department-id")
     staff_id: str | None = Field(serialization_alias="staff-id", default=None)
 
     @model_validator(mode="before")
     def filter_extra_fields(cls, values):
+        if not isinstance(values, dict):
+            return values
         valid_fields = {field: values[field] for field in cls.model_fields if field in values}
         return valid_fields
 
+class AdminSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    user:UserSchema
+    staff_id: str | None = Field(serialization_alias="staff-id", default=None)
+
+    @model_validator(mode="before")
+    def filter_extra_fields(cls, values):
+        if not isinstance(values, dict):
+            return values
+        valid_fields = {field: values[field] for field in cls.model_fields if field in values}
+        return valid_fields
+
+class StaffPage(BaseModel):
+    items: List[StaffSchema] = Field(default_factory=list)
+    next_cursor: str | None = Field(serialization_alias="next-cursor", default=None)
+
+
+class StaffSearchPage(BaseModel):
+    items: List[StaffSchema] = Field(default_factory=list)
+    next_offset: int | None = Field(serialization_alias="next-offset", default=None)
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    created: int = Field(default=0)
+    staff_ids: List[str] = Field(default_factory=list, serialization_alias="staff-ids")
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+
 class Sessions(BaseSchema):
+    session_id: str
     name: str
     device_name:str
 
 class UserInCache(BaseModel):
-    staff: StaffSchema| Dict[str, str]
+    staff: StaffSchema| AdminSchema| Dict[str, str]
     sessions: List[Sessions] | None = Field(default=None)
     
     @field_serializer("sessions", when_used="json")
-    def serialize_sessions_field(sessions:List[Sessions]):
-        return [session.model_dump_json() for session in sessions] if sessions else None
\ No newline at end of file
+    def serialize_sessions_field(self, sessions:List[Sessions] | None):
+        return [session.model_dump(mode="json") for session in sessions] if sessions else None
+
+
+class Token(BaseModel):
+    access_token: str = Field(serialization_alias="access-token")
+    refresh_token: str | None = Field(serialization_alias="refresh-token", default=None)
+    token_type: str = Field(serialization_alias="token-type", default="bearer")
+    expires_in: int = Field(serialization_alias="expires-in")
+
+
+class TokenPayload(BaseModel):
+    sub: str
+    sid: str
+    type: str
+    exp: int
+
+
+class DependencyCheck(BaseModel):
+    status: str
+    latency_ms: float = Field(serialization_alias="latency-ms")
+    detail: str | None = None
+
+
+class ReadinessReport(BaseModel):
+    status: str
+    checked_at: datetime = Field(serialization_alias="checked-at")
+    checks: Dict[str, DependencyCheck] = Field(default_factory=dict)
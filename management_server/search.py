@@ -0,0 +1,203 @@
+"""
+Staff search index.
+
+SQLite keeps a FTS5 table with the trigram tokenizer that is written next to
+the staff rows by the controllers. Postgres uses pg_trgm GIN indexes on the
+searched columns, which the database maintains itself, the extension is
+installed by the pg_trgm migration. Other databases fall back to an
+unindexed LIKE scan.
+"""
+
+from typing import List, Sequence, Tuple
+from uuid import UUID
+
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from management_server.helpers import DBType
+from management_server.db import PRIMARY_CONNECTION
+from management_server.logger import get_logger
+
+logger = get_logger("search")
+
+DIALECTS = {
+    "sqlite": DBType.SQLITE,
+    "postgres": DBType.POSTGRSQL,
+    "mysql": DBType.MYSQL,
+}
+
+SQLITE_TABLE = "staff_search"
+SQLITE_COLUMNS = [
+    "staff_pk",
+    "staff_id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+]
+
+# the query has to use the same expression as the index for the planner to pick it
+POSTGRES_USER_DOCUMENT = (
+    "({prefix}first_name || ' ' || {prefix}last_name || ' ' || "
+    "{prefix}email || ' ' || {prefix}phone_number)"
+)
+POSTGRES_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS staff_staff_id_trgm ON staff "
+    "USING GIN (staff_id gin_trgm_ops)",
+    'CREATE INDEX IF NOT EXISTS user_search_trgm ON "user" '
+    f"USING GIN ({POSTGRES_USER_DOCUMENT.format(prefix='')} gin_trgm_ops)",
+]
+
+
+class StaffSearchIndex:
+    """
+    Search over staff name, email, phone number and staff ID.
+    """
+
+    connection_name = PRIMARY_CONNECTION
+
+    def _connection(
+        self, using_db: BaseDBAsyncClient | None = None
+    ) -> BaseDBAsyncClient:
+        return using_db or connections.get(self.connection_name)
+
+    def db_type(self, using_db: BaseDBAsyncClient | None = None) -> DBType:
+        dialect = self._connection(using_db).capabilities.dialect
+        return DIALECTS.get(dialect, DBType.MYSQL)
+
+    async def ensure_index(self) -> None:
+        """
+        Creates the search index if it is missing, called from the app lifespan.
+        """
+        connection = self._connection()
+        db_type = self.db_type()
+        if db_type == DBType.SQLITE:
+            _, existing = await connection.execute_query(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+                [SQLITE_TABLE],
+            )
+            if existing:
+                return
+            await connection.execute_script(
+                f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5("
+                "staff_pk UNINDEXED, staff_id, first_name, last_name, email, "
+                "phone_number, tokenize = 'trigram')"
+            )
+            await connection.execute_query(
+                f"INSERT INTO {SQLITE_TABLE} ({', '.join(SQLITE_COLUMNS)}) "
+                "SELECT s.id, s.staff_id, u.first_name, u.last_name, u.email, "
+                "u.phone_number "
+                'FROM staff s JOIN "user" u ON u.user_id = s.user_id'
+            )
+        elif db_type == DBType.POSTGRSQL:
+            _, installed = await connection.execute_query(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            if not installed:
+                logger.warning(
+                    "pg_trgm is not installed, run the migrations to enable search"
+                )
+                return
+            # no-ops once the migration created them
+            for statement in POSTGRES_INDEXES:
+                await connection.execute_script(statement)
+        else:
+            logger.warning("no search index for this database, search will scan")
+
+    async def index(
+        self, entries: Sequence[Tuple], using_db: BaseDBAsyncClient | None = None
+    ) -> None:
+        """
+        Adds or replaces staff in the index.
+
+        Parameters:
+            entries (Sequence[Tuple[StaffModel, UserModel]]): The staff and their users.
+            using_db (BaseDBAsyncClient | None): The connection of the surrounding transaction.
+        """
+        if not entries or self.db_type(using_db) != DBType.SQLITE:
+            return
+        await self.remove([staff.id for staff, _ in entries], using_db=using_db)
+        await self._connection(using_db).execute_many(
+            f"INSERT INTO {SQLITE_TABLE} ({', '.join(SQLITE_COLUMNS)}) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                [
+                    str(staff.id),
+                    staff.staff_id,
+                    user.first_name,
+                    user.last_name,
+                    user.email,
+                    user.phone_number,
+                ]
+                for staff, user in entries
+            ],
+        )
+
+    async def remove(
+        self, staff_pks: Sequence[UUID], using_db: BaseDBAsyncClient | None = None
+    ) -> None:
+        if not staff_pks or self.db_type(using_db) != DBType.SQLITE:
+            return
+        placeholders = ", ".join("?" for _ in staff_pks)
+        await self._connection(using_db).execute_query(
+            f"DELETE FROM {SQLITE_TABLE} WHERE staff_pk IN ({placeholders})",
+            [str(staff_pk) for staff_pk in staff_pks],
+        )
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int,
+        using_db: BaseDBAsyncClient | None = None,
+    ) -> List[str]:
+        """
+        Returns the primary keys of the staff matching the query, best match first.
+
+        Parameters:
+            query (str): A partial name, email, phone number or staff ID.
+            limit (int): The maximum number of results.
+            offset (int): The number of results to skip.
+            using_db (BaseDBAsyncClient): The connection to read from, a replica for example.
+
+        Returns:
+            List[str]: The staff primary keys.
+        """
+        connection = self._connection(using_db)
+        db_type = self.db_type(connection)
+        if db_type == DBType.SQLITE:
+            phrase = '"' + query.replace('"', '""') + '"'
+            _, rows = await connection.execute_query(
+                f"SELECT staff_pk FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH ? "
+                f"ORDER BY bm25({SQLITE_TABLE}) LIMIT ? OFFSET ?",
+                [phrase, limit, offset],
+            )
+        elif db_type == DBType.POSTGRSQL:
+            document = POSTGRES_USER_DOCUMENT.format(prefix="u.")
+            _, rows = await connection.execute_query(
+                "SELECT s.id AS staff_pk FROM staff s "
+                'JOIN "user" u ON u.user_id = s.user_id '
+                f"WHERE s.staff_id ILIKE $2 OR {document} ILIKE $2 "
+                "ORDER BY GREATEST(similarity(s.staff_id, $1), "
+                f"similarity({document}, $1)) DESC, s.staff_id "
+                "LIMIT $3 OFFSET $4",
+                [query, f"%{self._escape_like(query)}%", limit, offset],
+            )
+        else:
+            pattern = f"%{self._escape_like(query)}%"
+            _, rows = await connection.execute_query(
+                "SELECT s.id AS staff_pk FROM staff s "
+                "JOIN `user` u ON u.user_id = s.user_id "
+                "WHERE s.staff_id LIKE %s OR u.first_name LIKE %s OR u.last_name LIKE %s "
+                "OR u.email LIKE %s OR u.phone_number LIKE %s "
+                "ORDER BY s.staff_id LIMIT %s OFFSET %s",
+                [pattern] * 5 + [limit, offset],
+            )
+        return [str(row["staff_pk"]) for row in rows]
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+staff_search_index = StaffSearchIndex()
@@ -2,15 +2,38 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
 from tortoise.contrib.fastapi import RegisterTortoise
 from pydantic_core import ValidationError
 
-from management_server.settings import AppConfig, DBSettings
+from management_server.settings import (
+    AppConfig,
+    AuthSettings,
+    DBSettings,
+    MetricsSettings,
+    get_settings,
+)
+from management_server.utils import mobile_prefix_registry, password_hasher
+from management_server.redis_cache import init_redis_client, close_redis_client
+from management_server.logger import setup_logging, shutdown_logging
+from management_server.department_registry import department_registry
+from management_server.search import staff_search_index
+from management_server.jobs import job_queue
+from management_server.outbox import outbox_relay
+from management_server.invites import configure_invite_sender
+from management_server.db import write_queue
+from management_server.metrics import (
+    MetricsMiddleware,
+    instrument_db_clients,
+    instrument_redis_client,
+)
 from management_server.routers import (
     staff_routers,
     admin_routers,
     auth_routers,
     department_routers,
+    metrics_routers,
+    health_routers,
 )
 from management_server.exceptions import (
     ServerFailureError,
@@ -25,28 +48,56 @@ from management_server.exceptions.handlers import (
 )
 
 
-db_settings = DBSettings()
-
-settings = AppConfig(
-    title="Staff Management Server",
-    summary="Staff Management Server",
-    contact={
+APP_METADATA = {
+    "title": "Staff Management Server",
+    "summary": "Staff Management Server",
+    "contact": {
         "name": "Staff Management Server",
         "url": "https://github.com/emperorsixpacks/afit_staff_management_server/",
     },
-)
+}
+
+settings = get_settings(AppConfig)
+metrics_settings = get_settings(MetricsSettings)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    # app startup
-    async with RegisterTortoise(app, config_file=db_settings.tortoise_config):
+    # app startup, clients and pools are created here rather than at import
+    db_settings = get_settings(DBSettings)
+    setup_logging()
+    configure_invite_sender(get_settings(AuthSettings))
+    mobile_prefix_registry.load()
+    app.state.redis = init_redis_client()
+    # a config file written by scripts/orm_config.py wins over the computed config
+    tortoise_config = (
+        {"config_file": db_settings.tortoise_config}
+        if db_settings.tortoise_config is not None
+        else {"config": db_settings.tortoise_orm_config}
+    )
+    async with RegisterTortoise(app, **tortoise_config):
+        if metrics_settings.metrics_enabled:
+            instrument_db_clients()
+            instrument_redis_client(app.state.redis)
+        await department_registry.start()
+        await staff_search_index.ensure_index()
+        await job_queue.start()
+        await write_queue.start()
+        await outbox_relay.start()
         yield
+        await write_queue.stop()
+        await outbox_relay.stop()
+        await job_queue.stop()
+        await department_registry.stop()
+    close_redis_client()
+    password_hasher.shutdown()
+    shutdown_logging()
 
 
 server = FastAPI(
-    **settings.model_dump(),
+    **{**settings.model_dump(exclude=AppConfig.server_fields), **APP_METADATA},
     openapi_url="/openapi.json" if settings.debug else None,
+    default_response_class=ORJSONResponse if settings.fast_responses else JSONResponse,
     lifespan=lifespan
 )
 
@@ -59,3 +110,8 @@ server.include_router(staff_routers.router)
 server.include_router(admin_routers.router)
 server.include_router(auth_routers.router)
 server.include_router(department_routers.router)
+server.include_router(health_routers.router)
+
+if metrics_settings.metrics_enabled:
+    server.add_middleware(MetricsMiddleware)
+    server.include_router(metrics_routers.router)
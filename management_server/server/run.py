@@ -1,10 +1,106 @@
+"""
+Server entry point.
+
+Runs a multi-worker production server configured through AppConfig, each
+worker imports the app and opens its own DB and Redis pools in the lifespan.
+Pass --reload (or set RELOAD=true) for the single worker development server.
+"""
+
+import argparse
+import importlib.util
+
 import uvicorn
 
-if __name__ == "__main__":
+from management_server.settings import AppConfig, get_settings
+
+APP = "management_server.server.main:server"
+
+
+def _available(implementation: str) -> str:
+    """
+    Falls back to uvicorn's auto detection when uvloop or httptools is missing.
+    """
+    if implementation in ["uvloop", "httptools"]:
+        if importlib.util.find_spec(implementation) is None:
+            return "auto"
+    return implementation
+
+
+def run_development(config: AppConfig) -> None:
     uvicorn.run(
-        "management_server.server.main:server",
-        host="0.0.0.0",
-        port=8000,
+        APP,
+        host=config.host,
+        port=config.port,
         reload=True,
-        use_colors=True
-    )
\ No newline at end of file
+        use_colors=True,
+    )
+
+
+def run_production(config: AppConfig) -> None:
+    uvicorn.run(
+        APP,
+        host=config.host,
+        port=config.port,
+        workers=config.worker_count,
+        loop=_available(config.loop),
+        http=_available(config.http),
+        timeout_keep_alive=config.timeout_keep_alive,
+        backlog=config.backlog,
+        limit_concurrency=config.limit_concurrency,
+        timeout_graceful_shutdown=config.timeout_graceful_shutdown,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+def run_gunicorn(config: AppConfig) -> None:
+    """
+    Runs the app under gunicorn's pre-fork master with uvicorn workers.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise RuntimeError(
+            "use_gunicorn is set but gunicorn is not installed, "
+            "run poetry install --with server"
+        ) from e
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{config.host}:{config.port}",
+                "workers": config.worker_count,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "keepalive": config.timeout_keep_alive,
+                "backlog": config.backlog,
+                "graceful_timeout": config.timeout_graceful_shutdown,
+                "preload_app": False,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # imported in each worker after the fork, preload_app is off
+            from management_server.server.main import server
+
+            return server
+
+    Application().run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the staff management server")
+    parser.add_argument("--reload", action="store_true", help="run the development server")
+    args = parser.parse_args()
+
+    config = get_settings(AppConfig)
+    if args.reload or config.reload:
+        run_development(config)
+    elif config.use_gunicorn:
+        run_gunicorn(config)
+    else:
+        run_production(config)
+
+
+if __name__ == "__main__":
+    main()
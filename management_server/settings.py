@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Optional, Union
+from functools import cache, cached_property
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Set, Type, TypeVar, Union
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import FilePath, field_validator
@@ -14,24 +15,84 @@ class BaseConfig(BaseSettings):
     )
 
 
+CONFIG = TypeVar("CONFIG", bound=BaseConfig)
+
+
+@cache
+def get_settings(settings_class: Type[CONFIG]) -> CONFIG:
+    """
+    Returns the settings of a class, read from the environment and .env the
+    first time they are asked for and shared by every module after that.
+
+    Call get_settings.cache_clear() after changing the environment.
+
+    Parameters:
+        settings_class (Type[BaseConfig]): The settings class to resolve.
+
+    Returns:
+        BaseConfig: The shared settings instance.
+    """
+    return settings_class()
+
+
 class AppConfig(BaseConfig):
     
-    title: str = None
-    summary: str = None
-    contact: Dict[str, str] = None
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    contact: Optional[Dict[str, str]] = None
     debug: bool = True
     version: str = "0.1.0"
     terms_of_service: Optional[str] = None
 
-class RedisSettings(BaseConfig):
+    # server launch settings, see management_server.server.run
+    host: str = "0.0.0.0"
+    port: int = 8000
+    reload: bool = False
+    workers: Optional[int] = None
+    loop: Literal["auto", "asyncio", "uvloop"] = "uvloop"
+    http: Literal["auto", "h11", "httptools"] = "httptools"
+    timeout_keep_alive: int = 5
+    backlog: int = 2048
+    limit_concurrency: Optional[int] = None
+    timeout_graceful_shutdown: int = 30
+    use_gunicorn: bool = False
+    fast_responses: bool = False
 
-    host: str = "localhost"
-    port: int = 6379
-    password: Optional[str] = None
+    server_fields: ClassVar[Set[str]] = {
+        "host",
+        "port",
+        "reload",
+        "workers",
+        "loop",
+        "http",
+        "timeout_keep_alive",
+        "backlog",
+        "limit_concurrency",
+        "timeout_graceful_shutdown",
+        "use_gunicorn",
+        "fast_responses",
+    }
+
+    @property
+    def worker_count(self) -> int:
+        return self.workers or os.cpu_count() or 1
+
+class HashingSettings(BaseConfig):
+
+    hashing_executor: Literal["thread", "process"] = "thread"
+    hashing_max_workers: Optional[int] = None
+    hashing_max_concurrency: int = 8
+
+    # cost profile for new hashes, older or weaker hashes are upgraded on login.
+    # argon2 needs the argon2-cffi package, poetry install --with argon2
+    hashing_scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    hashing_bcrypt_rounds: int = 12
+    hashing_argon2_time_cost: int = 3
+    # KiB
+    hashing_argon2_memory_cost: int = 65536
+    hashing_argon2_parallelism: int = 4
+    hashing_rehash_on_login: bool = True
 
-    def get_redis_uri(self) -> str:
-        return f"redis://{self.host}:{self.port}"
-    
 class DBSettings(BaseConfig):
     database_name: str
     database_hostname: Optional[str] = None
@@ -42,27 +103,235 @@ class DBSettings(BaseConfig):
     database_type: DBType = DBType.SQLITE
     tortoise_config: Optional[FilePath | None ] = None
 
+    # connection pool, applied to the primary and every replica
+    database_min_pool_size: int = 1
+    database_max_pool_size: int = 10
+    database_connect_timeout: float = 10.0
+    database_command_timeout: Optional[float] = None
+    # seconds before an idle pooled connection is closed (pool_recycle on MySQL)
+    database_max_inactive_connection_lifetime: float = 300.0
+    # prepared statements kept per Postgres connection, 0 disables the cache
+    database_statement_cache_size: int = 100
+    # read replicas as "host" or "host:port", read-only queries are spread over them
+    database_replica_hosts: List[str] = []
+
+    # SQLite profile, the pragmas are run when each connection opens
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # negative values are KiB, positive values are pages
+    sqlite_cache_size: int = -64000
+    sqlite_busy_timeout: int = 5000
+    # single writer: queued write transactions share one commit
+    sqlite_group_commit: bool = True
+    sqlite_group_commit_max_batch: int = 64
+    # seconds the writer waits for more writes before committing a group
+    sqlite_group_commit_window: float = 0.0
+
+    ENGINES: ClassVar[Dict[DBType, str]] = {
+        DBType.POSTGRSQL: "tortoise.backends.asyncpg",
+        DBType.MYSQL: "tortoise.backends.mysql",
+        DBType.SQLITE: "tortoise.backends.sqlite",
+    }
+
     def __post_init__(self):
         if self.database_type not in [i.value for i in DBType]:
             raise ValueError(
                 "Invalid database type, should be one of sqlite, postgresql, mysql"
             )
 
-    @property
+    @cached_property
+    def sqlite_path(self) -> str:
+        os.makedirs(f"{APP_BASE_URL}", exist_ok=True)
+        return f"{APP_BASE_URL}/{self.database_name}.sqlite3"
+
+    @cached_property
     def database_url(self):
-        if not os.path.exists(f"{APP_BASE_URL}/{self.database_name}.sqlite3"):
-            os.makedirs(f"{APP_BASE_URL}", exist_ok=True)
         if self.database_type == DBType.SQLITE:
-            return f"{self.database_type}:///{APP_BASE_URL}/{self.database_name}.sqlite3"
+            return f"{self.database_type}:///{self.sqlite_path}"
         return f"{self.database_type}://{self.database_username}:{self.database_password}@{self.database_hostname}:{self.database_port}/{self.database_name}"
-    
+
+    def connection_config(
+        self, host: Optional[str], port: Optional[Union[str, int]]
+    ) -> Dict[str, Any]:
+        """
+        Builds the Tortoise connection entry for one server, pool settings included.
+
+        Parameters:
+            host (str): The database host.
+            port (str | int): The database port.
+
+        Returns:
+            Dict[str, Any]: The engine and credentials for the connection.
+        """
+        credentials = {
+            "host": host,
+            "port": int(port) if port else None,
+            "user": self.database_username,
+            "password": self.database_password,
+            "database": self.database_name,
+            "minsize": self.database_min_pool_size,
+            "maxsize": self.database_max_pool_size,
+        }
+        if self.database_type == DBType.POSTGRSQL:
+            credentials.update(
+                timeout=self.database_connect_timeout,
+                command_timeout=self.database_command_timeout,
+                max_inactive_connection_lifetime=self.database_max_inactive_connection_lifetime,
+                statement_cache_size=self.database_statement_cache_size,
+            )
+        else:
+            credentials.update(
+                connect_timeout=self.database_connect_timeout,
+                pool_recycle=int(self.database_max_inactive_connection_lifetime),
+            )
+        return {"engine": self.ENGINES[self.database_type], "credentials": credentials}
+
+    def sqlite_connection_config(self, read_only: bool = False) -> Dict[str, Any]:
+        """
+        Builds the Tortoise connection entry for the SQLite file with the WAL profile.
+
+        Parameters:
+            read_only (bool): Opens the connection with query_only set, for the reader.
+
+        Returns:
+            Dict[str, Any]: The engine and the file path with the pragmas to run.
+        """
+        credentials = {
+            "file_path": self.sqlite_path,
+            "journal_mode": "WAL",
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "busy_timeout": self.sqlite_busy_timeout,
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        }
+        if read_only:
+            credentials["query_only"] = "ON"
+        return {"engine": self.ENGINES[DBType.SQLITE], "credentials": credentials}
+
+    @cached_property
+    def read_connection_names(self) -> List[str]:
+        # WAL lets a second SQLite connection read while the primary is writing
+        if self.database_type == DBType.SQLITE:
+            return ["reader"]
+        return [f"replica_{index}" for index in range(len(self.database_replica_hosts))]
+
+    @cached_property
+    def tortoise_orm_config(self) -> Dict[str, Any]:
+        """
+        The Tortoise config, computed once. SQLite gets a writer ("master") and a
+        read-only connection on the same file, Postgres and MySQL get pooled
+        connections for the primary ("master") and each replica.
+        """
+        if self.database_type == DBType.SQLITE:
+            connections = {
+                "master": self.sqlite_connection_config(),
+                "reader": self.sqlite_connection_config(read_only=True),
+            }
+        else:
+            connections = {
+                "master": self.connection_config(
+                    self.database_hostname, self.database_port
+                )
+            }
+            for name, replica in zip(
+                self.read_connection_names, self.database_replica_hosts
+            ):
+                host, _, port = replica.partition(":")
+                connections[name] = self.connection_config(
+                    host, port or self.database_port
+                )
+        return {
+            "connections": connections,
+            "apps": {
+                "models": {
+                    "models": ["management_server.models"],
+                    "default_connection": "master",
+                }
+            },
+        }
+
     @field_validator("tortoise_config", mode="before")
     @classmethod
     def check_if_none(cls, value):
-        if value == "NONE" or value == "" or not os.path.exists(value):
+        if value is None or value in ["NONE", ""] or not os.path.exists(value):
             return None
         return value
 
+
+class MetricsSettings(BaseConfig):
+    metrics_enabled: bool = True
+    log_level: str = "INFO"
+    log_sample_rate: float = 1.0
+
+
+class HealthSettings(BaseConfig):
+    # seconds a readiness result is reused, so probes do not add load
+    health_cache_ttl: float = 2.0
+    health_check_timeout: float = 1.0
+    # not ready above these, the worker could not take more work in time
+    health_max_hashing_queue: int = 32
+    health_max_db_pool_usage: float = 0.9
+
+
+class OutboxSettings(BaseConfig):
+    outbox_batch_size: int = 500
+    outbox_poll_interval: float = 0.5
+    # seconds a batch may take to reach Redis, and how long its rows stay
+    # claimed by the relay before another relay may take them
+    outbox_apply_timeout: float = 5.0
+    outbox_claim_ttl: int = 30
+
+
+class JobSettings(BaseConfig):
+    job_backend: Literal["memory", "redis"] = "memory"
+    job_workers: int = 4
+    job_queue_size: int = 10000
+    job_max_retries: int = 5
+    job_retry_backoff: float = 0.5
+    job_enqueue_timeout: float = 1.0
+    job_stream: str = "jobs"
+    job_group: str = "workers"
+    job_claim_idle_ms: int = 60000
+
+
+class RateLimitSettings(BaseConfig):
+    rate_limit_enabled: bool = True
+    # "<requests>/<second|minute|hour>" per route, applied per IP and per account
+    rate_limits: Dict[str, str] = {
+        "login": "5/minute",
+        "refresh": "30/minute",
+        "activate": "5/minute",
+    }
+
+
+class AuthSettings(BaseConfig):
+    secret_key: Optional[str] = None
+    access_token_ttl: int = 900
+    refresh_token_ttl: int = 60 * 60 * 24 * 7
+    # the oldest sessions of a user are ended past this many
+    max_sessions: int = 10
+    token_cache_size: int = 4096
+    # new staff get a single-use activation token instead of a hashed random password,
+    # the server does not start with it on unless an invite sender is configured
+    invite_new_staff: bool = False
+    # "package.module:function" that delivers an Invite, see management_server.invites
+    invite_sender: Optional[str] = None
+    activation_token_ttl: int = 60 * 60 * 24 * 3
+
+
 class RedisSettings(BaseConfig):
-    redis_port: str = "6379"
-    redis_host: str = "localhost"
\ No newline at end of file
+    redis_port: int = 6379
+    redis_host: str = "localhost"
+    redis_password: Optional[str] = None
+    redis_db: int = 0
+    redis_max_connections: int = 50
+    redis_connect_timeout: float = 2.0
+    redis_stream_timeout: float = 2.0
+    redis_cache_ttl: int = 3600
+    # seconds a "not found" lookup is remembered
+    redis_negative_cache_ttl: int = 30
+
+    def get_redis_uri(self) -> str:
+        return f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db}"
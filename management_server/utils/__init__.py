@@ -3,9 +3,17 @@ from management_server.utils.model_helpers import (
     generate_staff_id,
     EmailString,
     MobilePrefix,
+    MobilePrefixRegistry,
+    mobile_prefix_registry,
 )
 from management_server.utils.utils import (
     hash_password,
     verify_password,
+    password_needs_update,
     generate_random_password,
 )
+from management_server.utils.hashing import (
+    PasswordHasher,
+    HashingStats,
+    password_hasher,
+)
@@ -0,0 +1,142 @@
+"""
+Password hashing service.
+
+bcrypt and argon2 are CPU bound and take a few hundred milliseconds per call,
+so hashing and verification are run on a bounded worker pool instead of the
+event loop. The scheme and its cost come from HashingSettings.
+"""
+
+import time
+import asyncio
+import secrets
+from functools import partial
+from dataclasses import dataclass
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable
+
+from management_server.settings import HashingSettings, get_settings
+from management_server.utils.utils import (
+    hash_password,
+    verify_password,
+    password_needs_update,
+)
+
+
+@dataclass
+class HashingStats:
+    queue_depth: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    total_wait_time: float = 0.0
+
+    @property
+    def average_wait_time(self) -> float:
+        return self.total_wait_time / self.completed if self.completed else 0.0
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a thread or process pool with a concurrency limit.
+    """
+
+    def __init__(self, settings: HashingSettings | None = None) -> None:
+        self.settings = settings or get_settings(HashingSettings)
+        self.stats = HashingStats()
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._dummy_hash: str | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if self.settings.hashing_executor == "process"
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_class(
+                max_workers=self.settings.hashing_max_workers
+            )
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(
+                self.settings.hashing_max_concurrency
+            )
+        return self._semaphore
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        queued_at = time.perf_counter()
+        self.stats.queue_depth += 1
+        acquired = False
+        try:
+            async with self.semaphore:
+                acquired = True
+                self.stats.queue_depth -= 1
+                self.stats.total_wait_time += time.perf_counter() - queued_at
+                self.stats.in_flight += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(
+                        self.executor, partial(func, *args)
+                    )
+                finally:
+                    self.stats.in_flight -= 1
+                    self.stats.completed += 1
+        finally:
+            if not acquired:
+                self.stats.queue_depth -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        """
+        Hashes a plain password on the worker pool.
+
+        Args:
+            plain_password (str): The plain password to be hashed.
+
+        Returns:
+            str: The hashed password.
+        """
+        return await self._run(hash_password, plain_password)
+
+    async def verify(self, hash_pwd: str, plain_pwd: str) -> bool:
+        """
+        Verifies a plain password against a hash on the worker pool.
+
+        Args:
+            hash_pwd (str): The hashed password.
+            plain_pwd (str): The plain password to be compared with the hashed password.
+
+        Returns:
+            bool: True if the plain password matches the hashed password, False otherwise.
+        """
+        return await self._run(verify_password, hash_pwd, plain_pwd)
+
+    async def dummy_hash(self) -> str:
+        """
+        Returns the hash of a random password made with the current profile.
+
+        Logins for unknown accounts are verified against it, so they take as
+        long to reject as a wrong password and do not reveal which emails exist.
+
+        Returns:
+            str: The hash, made once per hasher.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(32))
+        return self._dummy_hash
+
+    def needs_update(self, hash_pwd: str) -> bool:
+        # parses the hash string only, cheap enough for the event loop
+        return password_needs_update(hash_pwd)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+password_hasher = PasswordHasher()
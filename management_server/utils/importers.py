@@ -0,0 +1,53 @@
+import io
+import csv
+import json
+from typing import Dict, Iterator
+
+from fastapi import UploadFile
+
+CSV_CONTENT_TYPES = ["text/csv", "application/csv", "application/vnd.ms-excel"]
+
+
+def _is_csv(upload: UploadFile) -> bool:
+    if upload.content_type in CSV_CONTENT_TYPES:
+        return True
+    return (upload.filename or "").lower().endswith(".csv")
+
+
+def _iter_csv_rows(stream: io.TextIOWrapper) -> Iterator[Dict[str, str]]:
+    yield from csv.DictReader(stream)
+
+
+def _iter_ndjson_rows(stream: io.TextIOWrapper) -> Iterator[Dict[str, str] | ValueError]:
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield ValueError("Invalid JSON: each line must be an object")
+            continue
+        yield row
+
+
+def iter_upload_rows(upload: UploadFile) -> Iterator[Dict[str, str] | ValueError]:
+    """
+    Lazily reads rows from an uploaded CSV or NDJSON file.
+
+    The file is read line by line, so only the rows of the current batch are held
+    in memory. Lines that can not be parsed are yielded as a ValueError so they
+    can be reported against their row number.
+
+    Parameters:
+        upload (UploadFile): The uploaded file.
+
+    Returns:
+        Iterator[Dict[str, str] | ValueError]: The parsed rows.
+    """
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if _is_csv(upload):
+        return _iter_csv_rows(stream)
+    return _iter_ndjson_rows(stream)
@@ -2,11 +2,13 @@ from __future__ import annotations
 import os
 import json
 from random import randint
-from typing import List, Dict, TYPE_CHECKING
+from threading import Lock
+from typing import Any, List, Dict, Self, TYPE_CHECKING
 from dataclasses import dataclass
 
-from email_validator import validate_email
-from pydantic import EmailStr
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.networks import validate_email as pydantic_validate_email
+from pydantic_core import core_schema
 from management_server.constants import APP_BASE_URL
 
 MOBILE_PRIFIX_JSON = os.path.join(APP_BASE_URL, "extras/mobile_prefixes.json")
@@ -26,6 +28,74 @@ def get_mobile_prefix() -> List[MobilePrefix]:
         ]
 
 
+class MobilePrefixRegistry:
+    """
+    In-memory lookup table of mobile prefixes.
+
+    The prefixes file is read once and flattened into a dict keyed by the
+    4 and 5 digit prefixes, so a phone number lookup is two dict hits instead
+    of a file read and a scan over every network.
+    """
+
+    def __init__(self, path: str = MOBILE_PRIFIX_JSON) -> None:
+        self.path = path
+        self._networks: Dict[str, str] | None = None
+        self._lock = Lock()
+
+    def load(self) -> Self:
+        """
+        Loads the prefixes file and builds the lookup table.
+
+        Returns:
+            MobilePrefixRegistry: The loaded registry.
+        """
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"File: mobile_prefixes.json not found in extras in {APP_BASE_URL}"
+            )
+        with open(self.path, "r", encoding="UTF-8") as file:
+            data: List[Dict[str, str]] = json.load(file)["mobile"]
+        networks = {
+            prefix: network["network"]
+            for network in data
+            for prefix in network["prefixes"]
+        }
+        with self._lock:
+            self._networks = networks
+        return self
+
+    def reload(self) -> Self:
+        """
+        Rebuilds the lookup table, call this after mobile_prefixes.json changes.
+
+        Returns:
+            MobilePrefixRegistry: The reloaded registry.
+        """
+        return self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._networks is not None
+
+    def lookup(self, phone_number: str) -> str | None:
+        """
+        Returns the network the phone number belongs to.
+
+        Parameters:
+            phone_number (str): The phone number to look up.
+
+        Returns:
+            str | None: The network name if the prefix is known, otherwise None.
+        """
+        if self._networks is None:
+            self.load()
+        networks = self._networks
+        return networks.get(phone_number[:5]) or networks.get(phone_number[:4])
+
+
+mobile_prefix_registry = MobilePrefixRegistry()
+
+
 def generate_staff_id(*, short_name: str, count: int):
     """
     Generate a unique staff ID by combining the department abbreviation and a randomly generated user number.
@@ -41,11 +111,32 @@ def generate_staff_id(*, short_name: str, count: int):
 
 
 
-class EmailString(EmailStr):
+class EmailString(str):
+    """
+    Email validated the way pydantic's EmailStr validates it. email_validator
+    is imported on the first validation instead of when the schemas using it
+    are defined.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            cls._validate, core_schema.str_schema()
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> Dict[str, Any]:
+        field_schema = handler(schema)
+        field_schema.update(type="string", format="email")
+        return field_schema
 
     @classmethod
     def _validate(cls, input_value: str, /) -> str:
-        return validate_email(input_value).email#, check_deliverability=True).email
+        return pydantic_validate_email(input_value)[1]
 
 
 @dataclass
@@ -0,0 +1,118 @@
+"""
+Signed access and refresh tokens, and activation tokens for invited staff.
+
+Tokens are a base64 encoded JSON payload followed by its HMAC-SHA256
+signature, so verifying one is a single HMAC instead of a password check.
+Activation tokens are random and only their SHA-256 digest is stored.
+"""
+
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+import binascii
+from functools import lru_cache
+from typing import Tuple
+
+from pydantic import ValidationError
+
+from management_server.schemas import TokenPayload
+from management_server.settings import AuthSettings, get_settings
+from management_server.exceptions import InvalidCredentialsError, ServerFailureError
+
+settings = get_settings(AuthSettings)
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    if settings.secret_key is None:
+        raise ServerFailureError(detail="SECRET_KEY is not configured")
+    digest = hmac.new(
+        settings.secret_key.encode(), payload.encode(), hashlib.sha256
+    ).digest()
+    return _b64encode(digest)
+
+
+def create_token(*, user_id: str, session_id: str, token_type: str) -> str:
+    """
+    Creates a signed token for a user session.
+
+    Parameters:
+        user_id (str): The ID of the user the token is issued to.
+        session_id (str): The ID of the session the token belongs to.
+        token_type (str): Either access or refresh.
+
+    Returns:
+        str: The signed token.
+    """
+    ttl = (
+        settings.access_token_ttl
+        if token_type == ACCESS_TOKEN
+        else settings.refresh_token_ttl
+    )
+    payload = TokenPayload(
+        sub=user_id, sid=session_id, type=token_type, exp=int(time.time()) + ttl
+    )
+    encoded_payload = _b64encode(payload.model_dump_json().encode())
+    return f"{encoded_payload}.{_sign(encoded_payload)}"
+
+
+@lru_cache(maxsize=settings.token_cache_size)
+def _verify_signature(token: str) -> TokenPayload:
+    try:
+        encoded_payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(encoded_payload)):
+            raise InvalidCredentialsError()
+        return TokenPayload.model_validate(json.loads(_b64decode(encoded_payload)))
+    except (ValueError, binascii.Error, ValidationError) as e:
+        raise InvalidCredentialsError() from e
+
+
+def verify_token(token: str, token_type: str = ACCESS_TOKEN) -> TokenPayload:
+    """
+    Verifies a token and returns its payload.
+
+    Tokens that passed the signature check are kept in an in-process LRU, so a
+    token seen before only has its expiry checked.
+
+    Parameters:
+        token (str): The token to verify.
+        token_type (str): The expected token type.
+
+    Returns:
+        TokenPayload: The payload of the token.
+
+    Raises:
+        InvalidCredentialsError: If the token is malformed, forged, expired or of the wrong type.
+    """
+    payload = _verify_signature(token)
+    if payload.type != token_type or payload.exp < time.time():
+        raise InvalidCredentialsError()
+    return payload
+
+
+def hash_activation_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_activation_token() -> Tuple[str, str]:
+    """
+    Creates a single-use activation token.
+
+    Returns:
+        Tuple[str, str]: The token to hand to the user and the digest to store.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_activation_token(token)
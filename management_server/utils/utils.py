@@ -1,7 +1,49 @@
+from __future__ import annotations
 import secrets
-from passlib.context import CryptContext
+from functools import cache
+from typing import TYPE_CHECKING
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from management_server.settings import HashingSettings, get_settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+def build_crypt_context(settings: HashingSettings) -> CryptContext:
+    """
+    Builds the passlib context for a hashing profile.
+
+    Both schemes are kept so hashes made under another profile still verify,
+    the one not configured is marked deprecated so those hashes need an update.
+    Hashes below the configured rounds need an update too.
+
+    Args:
+        settings (HashingSettings): The scheme and its cost parameters.
+
+    Returns:
+        CryptContext: The context used to hash and verify passwords.
+    """
+    from passlib.context import CryptContext
+
+    schemes = ["bcrypt", "argon2"]
+    schemes.sort(key=lambda scheme: scheme != settings.hashing_scheme)
+    return CryptContext(
+        schemes=schemes,
+        default=settings.hashing_scheme,
+        deprecated="auto",
+        bcrypt__rounds=settings.hashing_bcrypt_rounds,
+        bcrypt__min_rounds=settings.hashing_bcrypt_rounds,
+        argon2__rounds=settings.hashing_argon2_time_cost,
+        argon2__min_rounds=settings.hashing_argon2_time_cost,
+        argon2__memory_cost=settings.hashing_argon2_memory_cost,
+        argon2__parallelism=settings.hashing_argon2_parallelism,
+    )
+
+
+@cache
+def pwd_context() -> CryptContext:
+    # passlib is imported on the first hash, not at startup
+    return build_crypt_context(get_settings(HashingSettings))
 
 
 def generate_random_password():
@@ -16,7 +58,7 @@ def generate_random_password():
 
 def hash_password(plain_password: str):
     """
-    Hashes a plain password using the bcrypt algorithm.
+    Hashes a plain password with the scheme of the hashing profile.
 
     Args:
         plain_password (str): The plain password to be hashed.
@@ -25,7 +67,7 @@ def hash_password(plain_password: str):
         str: The hashed password.
 
     """
-    return pwd_context.hash(secret=plain_password)
+    return pwd_context().hash(secret=plain_password)
 
 
 def verify_password(hash_pwd, plain_pwd):
@@ -40,4 +82,18 @@ def verify_password(hash_pwd, plain_pwd):
         bool: True if the plain password matches the hashed password, False otherwise.
     """
 
-    return pwd_context.verify(plain_pwd, hash_pwd)
\ No newline at end of file
+    return pwd_context().verify(plain_pwd, hash_pwd)
+
+
+def password_needs_update(hash_pwd: str) -> bool:
+    """
+    Checks whether a hash was made with another scheme or a lower cost than
+    the current profile. Only the hash string is parsed, nothing is hashed.
+
+    Args:
+        hash_pwd (str): The hashed password.
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    return pwd_context().needs_update(hash_pwd)
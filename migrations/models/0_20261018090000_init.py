@@ -0,0 +1,18 @@
+"""
+Creates the tables of the models that do not exist yet.
+
+New databases get the whole schema here, existing databases are brought up
+to date by the migrations that follow.
+"""
+
+from tortoise import BaseDBAsyncClient, connections
+from tortoise.utils import get_schema_sql
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # the schema generator matches models by connection, not by transaction
+    return get_schema_sql(connections.get(db.connection_name), safe=True)
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return ""
@@ -0,0 +1,144 @@
+"""
+Adds the per-department staff number counter.
+
+Databases created before the counter existed get the staff_sequence column
+and unique staff IDs. The old count + 1 allocation could hand the same ID
+to concurrent creates, so before the unique indexes are added every
+duplicate but the oldest is renumbered after the highest number issued
+under its prefix. The counter is then seeded with the highest number
+already issued in each department, staff IDs are
+"AFIT/<short name>/<number>", so new IDs continue after the existing ones
+instead of starting again at 1.
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+
+from tortoise import BaseDBAsyncClient
+
+STAFF_ID_LENGTH = 13
+
+COLUMN_EXISTS = {
+    "sqlite": "SELECT COUNT(*) AS found FROM pragma_table_info('department') "
+    "WHERE name = 'staff_sequence'",
+    "postgres": "SELECT COUNT(*) AS found FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'department' "
+    "AND column_name = 'staff_sequence'",
+    "mysql": "SELECT COUNT(*) AS found FROM information_schema.columns "
+    "WHERE table_schema = DATABASE() AND table_name = 'department' "
+    "AND column_name = 'staff_sequence'",
+}
+
+ADD_COLUMN = {
+    "sqlite": [
+        'ALTER TABLE "department" ADD "staff_sequence" INT NOT NULL DEFAULT 0',
+        'CREATE UNIQUE INDEX "uid_staff_staff_id" ON "staff" ("staff_id")',
+        'CREATE UNIQUE INDEX "uid_admin_staff_id" ON "admin" ("staff_id")',
+    ],
+    "postgres": [
+        'ALTER TABLE "department" ADD "staff_sequence" INT NOT NULL DEFAULT 0',
+        'CREATE UNIQUE INDEX "uid_staff_staff_id" ON "staff" ("staff_id")',
+        'CREATE UNIQUE INDEX "uid_admin_staff_id" ON "admin" ("staff_id")',
+    ],
+    "mysql": [
+        "ALTER TABLE `department` ADD `staff_sequence` INT NOT NULL DEFAULT 0",
+        "ALTER TABLE `staff` ADD UNIQUE INDEX `uid_staff_staff_id` (`staff_id`)",
+        "ALTER TABLE `admin` ADD UNIQUE INDEX `uid_admin_staff_id` (`staff_id`)",
+    ],
+}
+
+ISSUED_IDS = {
+    "sqlite": "SELECT 'staff' AS source, \"id\", \"staff_id\", \"created_at\" FROM \"staff\" "
+    "UNION ALL SELECT 'admin', \"id\", \"staff_id\", \"created_at\" FROM \"admin\"",
+    "postgres": "SELECT 'staff' AS source, \"id\", \"staff_id\", \"created_at\" FROM \"staff\" "
+    "UNION ALL SELECT 'admin', \"id\", \"staff_id\", \"created_at\" FROM \"admin\"",
+    "mysql": "SELECT 'staff' AS source, `id`, `staff_id`, `created_at` FROM `staff` "
+    "UNION ALL SELECT 'admin', `id`, `staff_id`, `created_at` FROM `admin`",
+}
+
+RENUMBER = {
+    "sqlite": 'UPDATE "{table}" SET "staff_id" = \'{staff_id}\' WHERE "id" = \'{id}\'',
+    "postgres": 'UPDATE "{table}" SET "staff_id" = \'{staff_id}\' WHERE "id" = \'{id}\'',
+    "mysql": "UPDATE `{table}` SET `staff_id` = '{staff_id}' WHERE `id` = '{id}'",
+}
+
+# the number starts after "AFIT/" and the three letter short name
+SEED_SEQUENCE = {
+    "sqlite": 'UPDATE "department" SET "staff_sequence" = COALESCE(('
+    "SELECT MAX(CAST(SUBSTR(issued.staff_id, 10) AS INTEGER)) FROM ("
+    'SELECT "staff_id" FROM "staff" UNION ALL SELECT "staff_id" FROM "admin"'
+    ") issued WHERE issued.staff_id LIKE 'AFIT/' || \"department\".\"short_name\" || '/%'"
+    "), 0)",
+    "postgres": 'UPDATE "department" SET "staff_sequence" = COALESCE(('
+    "SELECT MAX(CAST(SUBSTR(issued.staff_id, 10) AS INTEGER)) FROM ("
+    'SELECT "staff_id" FROM "staff" UNION ALL SELECT "staff_id" FROM "admin"'
+    ") issued WHERE issued.staff_id LIKE 'AFIT/' || \"department\".\"short_name\" || '/%'"
+    "), 0)",
+    "mysql": "UPDATE `department` SET `staff_sequence` = COALESCE(("
+    "SELECT MAX(CAST(SUBSTRING(issued.staff_id, 10) AS UNSIGNED)) FROM ("
+    "SELECT `staff_id` FROM `staff` UNION ALL SELECT `staff_id` FROM `admin`"
+    ") issued WHERE issued.staff_id LIKE CONCAT('AFIT/', `department`.`short_name`, '/%')"
+    "), 0)",
+}
+
+
+async def renumber_duplicates(db: BaseDBAsyncClient) -> List[str]:
+    """
+    Returns the updates giving every duplicated staff ID but the oldest a new
+    number after the highest one issued under its prefix.
+
+    Raises:
+        ValueError: If a duplicate is not an "AFIT/<short name>/<number>" ID
+            or its new number does not fit the column, it has to be fixed by hand.
+    """
+    dialect = db.capabilities.dialect
+    _, rows = await db.execute_query(ISSUED_IDS[dialect])
+    rows = sorted(
+        rows,
+        key=lambda row: (
+            row["created_at"] is None,
+            str(row["created_at"]),
+            str(row["id"]),
+        ),
+    )
+    last_numbers: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        prefix, _, number = row["staff_id"].rpartition("/")
+        if number.isdigit():
+            last_numbers[prefix] = max(last_numbers[prefix], int(number))
+    seen = set()
+    statements = []
+    for row in rows:
+        key = (row["source"], row["staff_id"])
+        if key not in seen:
+            seen.add(key)
+            continue
+        prefix, _, number = row["staff_id"].rpartition("/")
+        last_numbers[prefix] += 1
+        staff_id = f"{prefix}/{str(last_numbers[prefix]).zfill(4)}"
+        if not prefix or not number.isdigit() or len(staff_id) > STAFF_ID_LENGTH:
+            raise ValueError(
+                f"duplicate staff ID {row['staff_id']} in {row['source']} can not be "
+                "renumbered, make it unique before running this migration"
+            )
+        statements.append(
+            RENUMBER[dialect].format(table=row["source"], staff_id=staff_id, id=row["id"])
+        )
+    return statements
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    dialect = db.capabilities.dialect
+    statements = []
+    # tables created by the init migration already have the column
+    _, rows = await db.execute_query(COLUMN_EXISTS[dialect])
+    if not rows[0]["found"]:
+        # the unique indexes can only be created once the IDs are unique
+        statements.extend(await renumber_duplicates(db))
+        statements.extend(ADD_COLUMN[dialect])
+    statements.append(SEED_SEQUENCE[dialect])
+    return ";\n".join(statements) + ";"
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return ""
@@ -0,0 +1,36 @@
+"""
+Adds the pg_trgm extension and the trigram indexes staff search uses on
+Postgres.
+
+CREATE EXTENSION needs a privileged role, so it runs here with the rest of
+the schema changes instead of at app startup. Other databases need nothing.
+"""
+
+from tortoise import BaseDBAsyncClient
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS staff_staff_id_trgm ON staff "
+    "USING GIN (staff_id gin_trgm_ops)",
+    'CREATE INDEX IF NOT EXISTS user_search_trgm ON "user" '
+    "USING GIN ((first_name || ' ' || last_name || ' ' || email || ' ' || "
+    "phone_number) gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS user_search_trgm",
+    "DROP INDEX IF EXISTS staff_staff_id_trgm",
+]
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    if db.capabilities.dialect != "postgres":
+        return ""
+    return ";\n".join(POSTGRES_UPGRADE) + ";"
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    if db.capabilities.dialect != "postgres":
+        return ""
+    # the extension is left installed, other schemas may use it
+    return ";\n".join(POSTGRES_DOWNGRADE) + ";"
@@ -0,0 +1,44 @@
+"""
+Adds the claim column to the outbox.
+
+The relay claims a batch in one short transaction and deletes it in another
+once Redis has it, the column marks the rows in between.
+"""
+
+from tortoise import BaseDBAsyncClient
+
+COLUMN_EXISTS = {
+    "sqlite": "SELECT COUNT(*) AS found FROM pragma_table_info('outbox') "
+    "WHERE name = 'claimed_until'",
+    "postgres": "SELECT COUNT(*) AS found FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'outbox' "
+    "AND column_name = 'claimed_until'",
+    "mysql": "SELECT COUNT(*) AS found FROM information_schema.columns "
+    "WHERE table_schema = DATABASE() AND table_name = 'outbox' "
+    "AND column_name = 'claimed_until'",
+}
+
+ADD_COLUMN = {
+    "sqlite": 'ALTER TABLE "outbox" ADD "claimed_until" TIMESTAMP',
+    "postgres": 'ALTER TABLE "outbox" ADD "claimed_until" TIMESTAMPTZ',
+    "mysql": "ALTER TABLE `outbox` ADD `claimed_until` DATETIME(6)",
+}
+
+DROP_COLUMN = {
+    "sqlite": 'ALTER TABLE "outbox" DROP COLUMN "claimed_until"',
+    "postgres": 'ALTER TABLE "outbox" DROP COLUMN "claimed_until"',
+    "mysql": "ALTER TABLE `outbox` DROP COLUMN `claimed_until`",
+}
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    dialect = db.capabilities.dialect
+    # tables created by the init migration already have the column
+    _, rows = await db.execute_query(COLUMN_EXISTS[dialect])
+    if rows[0]["found"]:
+        return ""
+    return ADD_COLUMN[dialect] + ";"
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return DROP_COLUMN[db.capabilities.dialect] + ";"
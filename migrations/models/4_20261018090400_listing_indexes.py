@@ -0,0 +1,92 @@
+"""
+Adds the indexes of the staff listing.
+
+Unfiltered pages are keyset paginated on staff_id within a department,
+pages filtered by location on the user's (created_at, user_id) under one
+index per level of the filter. The user index they replace ended at
+created_at, so it could not order ties. Databases created by the init
+migration before the listing existed get the staff index too.
+"""
+
+from typing import Dict, List, Tuple
+
+from tortoise import BaseDBAsyncClient
+
+INDEXES: Dict[str, Tuple[str, List[str]]] = {
+    "idx_staff_departm_68a7a8": ("staff", ["department_id", "staff_id"]),
+    "idx_user_state_7bc4e5": ("user", ["state", "created_at", "user_id"]),
+    "idx_user_state_0f703c": ("user", ["state", "lga", "created_at", "user_id"]),
+    "idx_user_state_1213f3": (
+        "user",
+        ["state", "lga", "ward", "created_at", "user_id"],
+    ),
+}
+
+REPLACED_INDEXES: Dict[str, Tuple[str, List[str]]] = {
+    "idx_user_state_02801e": ("user", ["state", "lga", "ward", "created_at"]),
+}
+
+INDEX_NAMES = {
+    "sqlite": "SELECT name FROM sqlite_master WHERE type = 'index' "
+    "AND tbl_name IN ('user', 'staff')",
+    "postgres": "SELECT indexname AS name FROM pg_indexes "
+    "WHERE schemaname = current_schema() AND tablename IN ('user', 'staff')",
+    "mysql": "SELECT DISTINCT index_name AS name FROM information_schema.statistics "
+    "WHERE table_schema = DATABASE() AND table_name IN ('user', 'staff')",
+}
+
+CREATE_INDEX = {
+    "sqlite": 'CREATE INDEX "{name}" ON "{table}" ({columns})',
+    "postgres": 'CREATE INDEX "{name}" ON "{table}" ({columns})',
+    "mysql": "CREATE INDEX `{name}` ON `{table}` ({columns})",
+}
+
+DROP_INDEX = {
+    "sqlite": 'DROP INDEX "{name}"',
+    "postgres": 'DROP INDEX "{name}"',
+    "mysql": "DROP INDEX `{name}` ON `{table}`",
+}
+
+
+def create_index(dialect: str, name: str, table: str, columns: List[str]) -> str:
+    quote = "`" if dialect == "mysql" else '"'
+    return CREATE_INDEX[dialect].format(
+        name=name,
+        table=table,
+        columns=", ".join(f"{quote}{column}{quote}" for column in columns),
+    )
+
+
+async def index_names(db: BaseDBAsyncClient) -> List[str]:
+    _, rows = await db.execute_query(INDEX_NAMES[db.capabilities.dialect])
+    return [row["name"] for row in rows]
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    dialect = db.capabilities.dialect
+    # tables created by the init migration may already have them
+    existing = await index_names(db)
+    statements = [
+        create_index(dialect, name, table, columns)
+        for name, (table, columns) in INDEXES.items()
+        if name not in existing
+    ] + [
+        DROP_INDEX[dialect].format(name=name, table=table)
+        for name, (table, _) in REPLACED_INDEXES.items()
+        if name in existing
+    ]
+    return ";\n".join(statements) + ";" if statements else ""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    dialect = db.capabilities.dialect
+    # the staff index is kept, the listing of the earlier schema used it too
+    statements = [
+        create_index(dialect, name, table, columns)
+        for name, (table, columns) in REPLACED_INDEXES.items()
+    ] + [
+        DROP_INDEX[dialect].format(name=name, table=table)
+        for name, (table, _) in INDEXES.items()
+        if table == "user"
+    ]
+    return ";\n".join(statements) + ";"
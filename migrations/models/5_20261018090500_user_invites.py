@@ -0,0 +1,192 @@
+"""
+Adds the activation columns to the user table for invited staff.
+
+Invited staff have no password until they activate, so password_hash
+becomes nullable, and the user row keeps the digest and expiry of the
+activation token. SQLite can not drop a NOT NULL constraint in place, so
+the table is rebuilt there, following SQLite's steps for other schema
+changes: with foreign keys off, so dropping the old table neither cascades
+to staff and admin nor leaves them pointing at a renamed table, the rows
+are copied into a new table that takes the old one's name, and the user's
+indexes are created again. Foreign keys can not be turned off inside a
+transaction, so the script runs its own, executescript has already
+committed the one aerich opened.
+
+A downgrade needs every user to have a password, invited staff who have
+not activated yet have to activate or be deleted first.
+"""
+
+from typing import Dict, List
+
+from tortoise import BaseDBAsyncClient
+
+NEW_COLUMNS = ["activation_token_hash", "activation_expires_at"]
+
+COLUMNS = {
+    "sqlite": "SELECT name, \"notnull\" AS not_null FROM pragma_table_info('user')",
+    "postgres": "SELECT column_name AS name, is_nullable = 'NO' AS not_null "
+    "FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'user'",
+    "mysql": "SELECT column_name AS name, is_nullable = 'NO' AS not_null "
+    "FROM information_schema.columns "
+    "WHERE table_schema = DATABASE() AND table_name = 'user'",
+}
+
+ADD_COLUMN = {
+    "postgres": {
+        "activation_token_hash": 'ALTER TABLE "user" ADD "activation_token_hash" '
+        "VARCHAR(64) UNIQUE",
+        "activation_expires_at": 'ALTER TABLE "user" ADD "activation_expires_at" '
+        "TIMESTAMPTZ",
+    },
+    "mysql": {
+        "activation_token_hash": "ALTER TABLE `user` ADD `activation_token_hash` "
+        "VARCHAR(64) UNIQUE",
+        "activation_expires_at": "ALTER TABLE `user` ADD `activation_expires_at` "
+        "DATETIME(6)",
+    },
+}
+
+DROP_COLUMN = {
+    "postgres": 'ALTER TABLE "user" DROP COLUMN "{column}"',
+    "mysql": "ALTER TABLE `user` DROP COLUMN `{column}`",
+}
+
+PASSWORD_NULLABLE = {
+    "postgres": 'ALTER TABLE "user" ALTER COLUMN "password_hash" DROP NOT NULL',
+    "mysql": "ALTER TABLE `user` MODIFY `password_hash` VARCHAR(500) NULL",
+}
+
+PASSWORD_NOT_NULL = {
+    "postgres": 'ALTER TABLE "user" ALTER COLUMN "password_hash" SET NOT NULL',
+    "mysql": "ALTER TABLE `user` MODIFY `password_hash` VARCHAR(500) NOT NULL",
+}
+
+NOT_ACTIVATED = {
+    "sqlite": 'SELECT COUNT(*) AS found FROM "user" WHERE "password_hash" IS NULL',
+    "postgres": 'SELECT COUNT(*) AS found FROM "user" WHERE "password_hash" IS NULL',
+    "mysql": "SELECT COUNT(*) AS found FROM `user` WHERE `password_hash` IS NULL",
+}
+
+SQLITE_USER_COLUMNS = """
+    "created_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "modified_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "user_id" CHAR(36) NOT NULL  PRIMARY KEY,
+    "first_name" VARCHAR(20) NOT NULL,
+    "last_name" VARCHAR(20) NOT NULL,
+    "email" VARCHAR(100) NOT NULL UNIQUE,
+    "phone_number" VARCHAR(11) NOT NULL UNIQUE,
+    "mobile_network" VARCHAR(15) NOT NULL,
+    "state" VARCHAR(20) NOT NULL,
+    "lga" VARCHAR(20) NOT NULL,
+    "ward" VARCHAR(20) NOT NULL,"""
+
+SQLITE_USER_TABLE = (
+    'CREATE TABLE "_user_new" ('
+    + SQLITE_USER_COLUMNS
+    + """
+    "password_hash" VARCHAR(500),
+    "activation_token_hash" VARCHAR(64)  UNIQUE,
+    "activation_expires_at" TIMESTAMP
+)"""
+)
+
+SQLITE_PRE_INVITE_USER_TABLE = (
+    'CREATE TABLE "_user_new" ('
+    + SQLITE_USER_COLUMNS
+    + """
+    "password_hash" VARCHAR(500) NOT NULL
+)"""
+)
+
+SQLITE_USER_INDEXES = (
+    "SELECT sql FROM sqlite_master WHERE type = 'index' "
+    "AND tbl_name = 'user' AND sql IS NOT NULL"
+)
+
+
+async def user_columns(db: BaseDBAsyncClient) -> Dict[str, bool]:
+    """
+    Returns whether each column of the user table is NOT NULL.
+    """
+    _, rows = await db.execute_query(COLUMNS[db.capabilities.dialect])
+    return {row["name"]: bool(row["not_null"]) for row in rows}
+
+
+async def rebuild_sqlite_user_table(
+    db: BaseDBAsyncClient, create_table: str, columns: List[str]
+) -> List[str]:
+    """
+    Returns the statements that move the user rows into the "_user_new"
+    table made by create_table, which then replaces the user table.
+
+    Parameters:
+        db (BaseDBAsyncClient): The SQLite connection.
+        create_table (str): The CREATE TABLE statement of the new table.
+        columns (List[str]): The columns copied over from the old table.
+
+    Returns:
+        List[str]: The statements, with their own transaction.
+    """
+    _, rows = await db.execute_query("PRAGMA foreign_keys")
+    foreign_keys = rows[0][0]
+    # the indexes are dropped with the old table, they are created again after
+    _, rows = await db.execute_query(SQLITE_USER_INDEXES)
+    copied = ", ".join(f'"{column}"' for column in columns)
+    return [
+        "PRAGMA foreign_keys = OFF",
+        "BEGIN",
+        create_table,
+        f'INSERT INTO "_user_new" ({copied}) SELECT {copied} FROM "user"',
+        'DROP TABLE "user"',
+        'ALTER TABLE "_user_new" RENAME TO "user"',
+        *(row["sql"] for row in rows),
+        "COMMIT",
+        f"PRAGMA foreign_keys = {foreign_keys}",
+    ]
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    dialect = db.capabilities.dialect
+    columns = await user_columns(db)
+    # tables created by the init migration already have the columns
+    missing = [column for column in NEW_COLUMNS if column not in columns]
+    if not missing and not columns["password_hash"]:
+        return ""
+    if dialect == "sqlite":
+        statements = await rebuild_sqlite_user_table(
+            db, SQLITE_USER_TABLE, list(columns)
+        )
+    else:
+        statements = [ADD_COLUMN[dialect][column] for column in missing]
+        if columns["password_hash"]:
+            statements.append(PASSWORD_NULLABLE[dialect])
+    return ";\n".join(statements) + ";"
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    """
+    Raises:
+        ValueError: If invited staff have not activated, their users have no
+            password to keep under NOT NULL.
+    """
+    dialect = db.capabilities.dialect
+    _, rows = await db.execute_query(NOT_ACTIVATED[dialect])
+    if rows[0]["found"]:
+        raise ValueError(
+            f"{rows[0]['found']} invited staff have not activated their accounts, "
+            "they need a password or have to be deleted before the downgrade"
+        )
+    if dialect == "sqlite":
+        columns = await user_columns(db)
+        statements = await rebuild_sqlite_user_table(
+            db,
+            SQLITE_PRE_INVITE_USER_TABLE,
+            [column for column in columns if column not in NEW_COLUMNS],
+        )
+    else:
+        statements = [
+            DROP_COLUMN[dialect].format(column=column) for column in NEW_COLUMNS
+        ]
+        statements.append(PASSWORD_NOT_NULL[dialect])
+    return ";\n".join(statements) + ";"
@@ -0,0 +1,112 @@
+"""
+Picks the password hashing cost for a target hash time on this host.
+
+bcrypt rounds, or argon2 time_cost at the configured memory cost, are
+raised one step at a time until a hash takes longer than the target, and
+the last cost under the target is kept. Existing hashes are upgraded to
+the new cost the next time their users log in.
+
+    python -m scripts.calibrate_hashing --target-ms 250
+    python -m scripts.calibrate_hashing --scheme argon2 --target-ms 150 --write
+"""
+
+import os
+import time
+import argparse
+from statistics import median
+from typing import Callable, Dict, Tuple
+
+import dotenv
+from passlib.hash import argon2, bcrypt
+
+from management_server.settings import HashingSettings
+from management_server.constants import APP_BASE_URL
+
+ENV_LOCATION = os.path.join(APP_BASE_URL, ".env")
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def time_hash(handler, samples: int) -> float:
+    handler.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash(SAMPLE_PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return median(timings)
+
+
+def calibrate(
+    make_handler: Callable[[int], object],
+    min_cost: int,
+    max_cost: int,
+    target: float,
+    samples: int,
+) -> Tuple[int, Dict[int, float]]:
+    """
+    Measures each cost from min_cost up and stops at the first one over the target.
+
+    Parameters:
+        make_handler (Callable): Returns the passlib handler for a cost.
+        min_cost (int): The lowest cost that is accepted, even if it is over the target.
+        max_cost (int): The highest cost that is tried.
+        target (float): The target hash time in seconds.
+        samples (int): The hashes timed per cost.
+
+    Returns:
+        Tuple[int, Dict[int, float]]: The chosen cost and the median time per cost measured.
+    """
+    chosen, timings = min_cost, {}
+    for cost in range(min_cost, max_cost + 1):
+        timings[cost] = time_hash(make_handler(cost), samples)
+        if timings[cost] > target:
+            break
+        chosen = cost
+    return chosen, timings
+
+
+def main(args) -> None:
+    settings = HashingSettings()
+    target = args.target_ms / 1000
+    if args.scheme == "bcrypt":
+        cost, timings = calibrate(
+            lambda rounds: bcrypt.using(rounds=rounds), 10, 16, target, args.samples
+        )
+        values = {"HASHING_SCHEME": "bcrypt", "HASHING_BCRYPT_ROUNDS": str(cost)}
+    else:
+        cost, timings = calibrate(
+            lambda time_cost: argon2.using(
+                rounds=time_cost,
+                memory_cost=settings.hashing_argon2_memory_cost,
+                parallelism=settings.hashing_argon2_parallelism,
+            ),
+            2,
+            20,
+            target,
+            args.samples,
+        )
+        values = {"HASHING_SCHEME": "argon2", "HASHING_ARGON2_TIME_COST": str(cost)}
+
+    for measured_cost, elapsed in timings.items():
+        print(f"{args.scheme} cost {measured_cost}: {elapsed * 1000:.1f} ms")
+    if timings[cost] > target:
+        print(f"warning: the minimum cost {cost} is already over the target")
+    for key, value in values.items():
+        print(f"{key}={value}")
+        if args.write:
+            dotenv.set_key(ENV_LOCATION, key, value)
+    if args.write:
+        print("Updated", ENV_LOCATION)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--write", action="store_true", help=f"save to {ENV_LOCATION}")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
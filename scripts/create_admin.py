@@ -0,0 +1,60 @@
+"""
+Creates the first admin of a new installation.
+
+The admin routes only accept admin tokens, so the first admin is created
+from the command line. The staff member is created as usual and made an
+admin, their activation token is printed here instead of being sent.
+
+    python -m scripts.create_admin --first-name Ada --last-name Lovelace \
+        --email ada@example.com --phone-number 08030000001 --state Kaduna \
+        --lga Igabi --ward Rigachikun --department-id <department id>
+"""
+
+import asyncio
+import argparse
+
+from tortoise import Tortoise
+
+from management_server.settings import DBSettings, get_settings
+from management_server.redis_cache import close_redis_client
+from management_server.department_registry import department_registry
+from management_server.controllers import AdminController, UserController
+from management_server.invites import Invite, set_invite_sender
+from management_server.utils.tokens import settings as token_settings
+from management_server.jobs import job_queue
+
+FIELDS = ["first_name", "last_name", "email", "phone_number", "state", "lga", "ward"]
+
+
+async def print_invite(invite: Invite) -> None:
+    print("Activation token for", invite.staff_id, invite.activation_token)
+
+
+async def create_admin(form_data: dict) -> None:
+    await Tortoise.init(config=get_settings(DBSettings).tortoise_orm_config)
+    # the invite is delivered by this process, not queued for the server's workers
+    job_queue.settings = job_queue.settings.model_copy(update={"job_backend": "memory"})
+    set_invite_sender(print_invite)
+    # the first admin activates with the printed token whatever INVITE_NEW_STAFF says
+    token_settings.invite_new_staff = True
+    await job_queue.start()
+    try:
+        await department_registry.load()
+        staff = await UserController.create(form_data=form_data)
+        await AdminController.create(form_data={"user_id": staff.user.user_id})
+        print("Created admin", staff.staff_id)
+    finally:
+        await job_queue.stop()
+        close_redis_client()
+        await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    for name in [*FIELDS, "department_id"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", required=True)
+    asyncio.run(create_admin(vars(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,37 @@
 import os
-import yaml
+import copy
+from functools import cache
+from typing import Any, Dict
+
 import dotenv
 
-from management_server.settings import DBSettings
+from management_server.settings import DBSettings, get_settings
 from management_server.constants import APP_BASE_URL
 
-db_settings = DBSettings()
-
 ENV_LOCATION = os.path.join(APP_BASE_URL, ".env")
 
-if db_settings.tortoise_config is None:
-    CONFIG_FILE = os.path.join(APP_BASE_URL, "tortoise.yml")
-else:
-    CONFIG_FILE = db_settings.tortoise_config
+
+def config_file_path() -> str:
+    db_settings = get_settings(DBSettings)
+    if db_settings.tortoise_config is None:
+        return os.path.join(APP_BASE_URL, "tortoise.yml")
+    return str(db_settings.tortoise_config)
 
 
-DEFAULT_CONFIG = {
-    "connections": {
-        "master": db_settings.database_url
-    },
-    "apps": {
-        "models": {
-            "models": ["management_server.models",  "aerich.models"],
-            "default_connection": "master",
-        }
-    },
-}
+@cache
+def default_config() -> Dict[str, Any]:
+    config = copy.deepcopy(get_settings(DBSettings).tortoise_orm_config)
+    config["apps"]["models"]["models"].append("aerich.models")
+    return config
+
+
+def __getattr__(name: str) -> Any:
+    # aerich reads DEFAULT_CONFIG, it is built on that first access, not at import
+    if name == "DEFAULT_CONFIG":
+        return default_config()
+    if name == "CONFIG_FILE":
+        return config_file_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def write_config_file(path):
@@ -39,8 +45,10 @@ def write_config_file(path):
     Returns:
         TextIOWrapper: The opened file object.
     """
+    import yaml
+
     with open(path, mode="w", encoding="utf-8") as f:
-        yaml.dump(DEFAULT_CONFIG, f)
+        yaml.dump(default_config(), f)
 
 
 def create_config_file():
@@ -57,15 +65,16 @@ def create_config_file():
     Returns:
         None
     """
-    if os.path.exists(CONFIG_FILE):
+    config_file = config_file_path()
+    if os.path.exists(config_file):
         return
-    write_config_file(CONFIG_FILE)
-    print("Created new config file at", CONFIG_FILE)
+    write_config_file(config_file)
+    print("Created new config file at", config_file)
 
 
 if __name__ == "__main__":
     create_config_file()
-    dotenv.set_key(ENV_LOCATION, "TORTOISE_CONFIG", CONFIG_FILE)
+    dotenv.set_key(ENV_LOCATION, "TORTOISE_CONFIG", config_file_path())
     
 
 #TODO add update
\ No newline at end of file
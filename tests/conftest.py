@@ -0,0 +1,219 @@
+"""
+Shared fixtures.
+
+Every test gets its own SQLite file opened with the app's writer and
+reader connections, and a fakeredis server behind the Redis client the app
+uses. Settings are read from the environment set below.
+"""
+
+import os
+import copy
+import asyncio
+import uuid
+import itertools
+
+os.environ.setdefault("DATABASE_NAME", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("HASHING_BCRYPT_ROUNDS", "4")
+# invites are delivered through the sent_invites fixture
+os.environ.setdefault("INVITE_NEW_STAFF", "true")
+
+import httpx
+import pytest
+import fakeredis
+from coredis.response.types import StreamEntry
+from tortoise import Tortoise
+
+from management_server import invites, redis_cache
+from management_server.jobs import job_queue
+from management_server.db import read_connection_names
+from management_server.models import DepartmentModel
+from management_server.search import staff_search_index
+from management_server.settings import DBSettings, get_settings
+from management_server.department_registry import department_registry
+from management_server.utils.tokens import ACCESS_TOKEN, create_token
+from management_server.server.main import server
+
+_phone_numbers = itertools.count(1)
+
+
+class FakePipeline:
+    """
+    Queues commands on a fakeredis pipeline with the awaitable coredis calls.
+    """
+
+    def __init__(self, pipe) -> None:
+        self._pipe = pipe
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._pipe.reset()
+
+    async def execute(self):
+        return await self._pipe.execute()
+
+    async def delete(self, keys):
+        self._pipe.delete(*keys)
+
+    async def xack(self, key, group, identifiers):
+        self._pipe.xack(key, group, *identifiers)
+
+    async def xdel(self, key, identifiers):
+        self._pipe.xdel(key, *identifiers)
+
+    def __getattr__(self, name):
+        command = getattr(self._pipe, name)
+
+        async def queue(*args, **kwargs):
+            command(*args, **kwargs)
+
+        return queue
+
+
+class FakeCoredis:
+    """
+    fakeredis with the coredis call signatures the app uses, commands that
+    take the same arguments in both clients are passed through.
+    """
+
+    def __init__(self) -> None:
+        self.redis = fakeredis.FakeAsyncRedis()
+
+    async def delete(self, keys):
+        return await self.redis.delete(*keys)
+
+    async def exists(self, keys):
+        return await self.redis.exists(*keys)
+
+    async def pipeline(self, transaction: bool = False) -> FakePipeline:
+        return FakePipeline(self.redis.pipeline(transaction=transaction))
+
+    async def xgroup_create(self, key, group, identifier="$", mkstream=False):
+        return await self.redis.xgroup_create(
+            key, group, id=identifier, mkstream=mkstream
+        )
+
+    async def xautoclaim(self, key, group, consumer, min_idle_time, start, count=None):
+        next_start, entries, deleted = await self.redis.xautoclaim(
+            key, group, consumer, min_idle_time, start_id=start, count=count
+        )
+        return next_start, tuple(StreamEntry(*entry) for entry in entries), deleted
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        # a blocking read in fakeredis would block the event loop, poll instead
+        response = await self.redis.xreadgroup(group, consumer, streams, count=count)
+        if not response and block:
+            await asyncio.sleep(0.01)
+        return {
+            stream: tuple(StreamEntry(*entry) for entry in entries)
+            for stream, entries in response or []
+        } or None
+
+    async def xack(self, key, group, identifiers):
+        return await self.redis.xack(key, group, *identifiers)
+
+    async def xdel(self, key, identifiers):
+        return await self.redis.xdel(key, *identifiers)
+
+    def __getattr__(self, name):
+        return getattr(self.redis, name)
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> FakeCoredis:
+    client = FakeCoredis()
+    monkeypatch.setattr(redis_cache, "_redis_client", client)
+    return client
+
+
+@pytest.fixture
+def tortoise_config(tmp_path) -> dict:
+    config = copy.deepcopy(get_settings(DBSettings).tortoise_orm_config)
+    for connection in config["connections"].values():
+        connection["credentials"]["file_path"] = str(tmp_path / "test.sqlite3")
+    return config
+
+
+@pytest.fixture
+async def db(tortoise_config):
+    await Tortoise.init(config=tortoise_config)
+    await Tortoise.generate_schemas(safe=True)
+    await staff_search_index.ensure_index()
+    read_connection_names.cache_clear()
+    yield
+    await Tortoise.close_connections()
+    read_connection_names.cache_clear()
+
+
+@pytest.fixture
+async def client(db):
+    # the fixtures above stand in for the lifespan, it is not run here
+    transport = httpx.ASGITransport(app=server)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def auth_headers() -> dict:
+    token = create_token(
+        user_id=str(uuid.uuid4()), session_id="test", token_type=ACCESS_TOKEN
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def sent_invites(monkeypatch):
+    """
+    Runs the job workers and collects the invites they deliver, await
+    job_queue.queue.join() before reading them.
+    """
+    sent = []
+
+    async def capture(invite) -> None:
+        sent.append(invite)
+
+    monkeypatch.setattr(invites, "_sender", capture)
+    # a queue bound to another test's event loop can not be reused
+    monkeypatch.setattr(job_queue, "_queue", None)
+    await job_queue.start()
+    yield sent
+    await job_queue.stop()
+
+
+@pytest.fixture
+async def department(db) -> DepartmentModel:
+    created = await DepartmentModel.create(
+        name="Computer Science", short_name="CSC", description="Computing"
+    )
+    await department_registry.load()
+    return created
+
+
+def user_data(number: int | None = None) -> dict:
+    """
+    Returns the fields of a user with a unique email and phone number.
+    """
+    number = next(_phone_numbers) if number is None else number
+    return {
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "email": f"staff{number}@example.com",
+        "phone_number": f"0803{number:07d}",
+        "mobile_network": "MTN Nigeria",
+        "state": "Kaduna",
+        "lga": "Igabi",
+        "ward": "Rigachikun",
+    }
+
+
+def staff_form(department_id, number: int | None = None) -> dict:
+    """
+    Returns create-staff form data for a new user in the department.
+    """
+    form = user_data(number)
+    form.pop("mobile_network")
+    return {**form, "department_id": str(department_id)}
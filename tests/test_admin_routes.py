@@ -0,0 +1,166 @@
+import io
+import csv
+import uuid
+
+import pytest
+
+from management_server.controllers import AdminController, AuthController
+from management_server.exceptions import InvalidCredentialsError
+from management_server.jobs import job_queue
+from management_server.models import StaffModel, UserModel
+from management_server.routers import admin_routers
+from management_server.utils.tokens import ACCESS_TOKEN, create_token
+
+from tests.conftest import staff_form
+from tests.test_staff_cache import create_staff
+
+ADMIN_ROUTES = [
+    (
+        method,
+        route.path.replace("{admin_id}", str(uuid.uuid4())).replace(
+            "{staff_id}", str(uuid.uuid4())
+        ),
+    )
+    for route in admin_routers.router.routes
+    for method in route.methods
+]
+
+
+@pytest.fixture
+async def admin_headers(department) -> dict:
+    staff = await create_staff(department)
+    await AdminController.create(form_data={"user_id": staff.user_id})
+    token = create_token(
+        user_id=str(staff.user_id), session_id="admin", token_type=ACCESS_TOKEN
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ROUTES)
+async def test_admin_routes_need_a_token(client, method, path):
+    response = await client.request(method, path)
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ROUTES)
+async def test_admin_routes_reject_staff_who_are_not_admins(
+    client, department, method, path
+):
+    staff = await create_staff(department)
+    token = create_token(
+        user_id=str(staff.user_id), session_id="staff", token_type=ACCESS_TOKEN
+    )
+
+    response = await client.request(
+        method, path, headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 403
+
+
+async def test_created_staff_get_their_token_out_of_band(
+    client, admin_headers, department, sent_invites
+):
+    form = {
+        key.replace("_", "-"): value
+        for key, value in staff_form(department.department_id).items()
+    }
+
+    response = await client.post("/admin/create-staff/", data=form, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert "activation-token" not in response.json()
+    await job_queue.queue.join()
+    (invite,) = sent_invites
+    assert invite.email == form["email"]
+    assert invite.staff_id == response.json()["staff-id"]
+    await AuthController.activate(invite.activation_token, "a new password")
+    user = await UserModel.get(email=form["email"])
+    assert user.password_hash is not None
+
+
+async def test_imported_staff_get_their_tokens_out_of_band(
+    client, admin_headers, department, sent_invites
+):
+    rows = [staff_form(department.department_id) for _ in range(2)]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+    response = await client.post(
+        "/admin/import-staff/",
+        files={"file": ("staff.csv", buffer.getvalue(), "text/csv")},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert "activation-tokens" not in report
+    await job_queue.queue.join()
+    assert sorted(invite.staff_id for invite in sent_invites) == sorted(
+        report["staff-ids"]
+    )
+
+
+async def invite_staff(client, admin_headers, department) -> StaffModel:
+    form = {
+        key.replace("_", "-"): value
+        for key, value in staff_form(department.department_id).items()
+    }
+    response = await client.post("/admin/create-staff/", data=form, headers=admin_headers)
+    await job_queue.queue.join()
+    return await StaffModel.get(staff_id=response.json()["staff-id"])
+
+
+async def test_a_resent_invite_replaces_the_old_token(
+    client, admin_headers, department, sent_invites
+):
+    staff = await invite_staff(client, admin_headers, department)
+
+    response = await client.post(
+        f"/admin/resend-invite/{staff.id}", headers=admin_headers
+    )
+
+    assert response.status_code == 204
+    await job_queue.queue.join()
+    first, second = sent_invites
+    assert second.staff_id == first.staff_id == staff.staff_id
+    assert second.activation_token != first.activation_token
+    with pytest.raises(InvalidCredentialsError):
+        await AuthController.activate(first.activation_token, "a new password")
+    await AuthController.activate(second.activation_token, "a new password")
+
+
+async def test_invites_are_not_resent_once_activated(
+    client, admin_headers, department, sent_invites
+):
+    staff = await invite_staff(client, admin_headers, department)
+    (invite,) = sent_invites
+    await AuthController.activate(invite.activation_token, "a new password")
+
+    response = await client.post(
+        f"/admin/resend-invite/{staff.id}", headers=admin_headers
+    )
+
+    assert response.status_code == 409
+    assert len(sent_invites) == 1
+
+
+async def test_invites_are_not_resent_to_unknown_staff(
+    client, admin_headers, sent_invites
+):
+    response = await client.post(
+        f"/admin/resend-invite/{uuid.uuid4()}", headers=admin_headers
+    )
+
+    assert response.status_code == 404
+
+
+async def test_invites_are_not_resent_without_a_sender(client, admin_headers):
+    response = await client.post(
+        f"/admin/resend-invite/{uuid.uuid4()}", headers=admin_headers
+    )
+
+    assert response.status_code == 503
@@ -0,0 +1,70 @@
+import pytest
+
+from management_server.models import AdminModel, DepartmentModel, UserModel
+from management_server.schemas import AdminSchema
+from management_server.controllers import AdminController
+from management_server.exceptions import InvalidRequestError
+
+from tests.conftest import user_data
+from tests.test_staff_cache import create_staff
+
+
+async def test_staff_member_becomes_an_admin_under_their_staff_id(department):
+    staff = await create_staff(department)
+
+    admin = await AdminController.create(form_data={"user_id": staff.user_id})
+
+    assert isinstance(admin, AdminSchema)
+    assert admin.staff_id == staff.staff_id
+    assert admin.user.email == staff.user.email
+
+
+async def test_making_an_admin_does_not_take_a_staff_number(department):
+    staff = await create_staff(department)
+
+    await AdminController.create(form_data={"user_id": staff.user_id})
+
+    await department.refresh_from_db()
+    assert department.staff_sequence == 1
+
+
+async def test_admin_is_read_through_the_cache(department, redis):
+    staff = await create_staff(department)
+    await AdminController.create(form_data={"user_id": staff.user_id})
+    admin = await AdminModel.get(user_id=staff.user_id)
+
+    found = await AdminController(id=admin.id).get()
+    cached = await AdminController(id=admin.id).get()
+
+    assert await redis.get(AdminController.cache_key(admin.id)) is not None
+    assert isinstance(found, AdminSchema)
+    assert isinstance(cached, AdminSchema)
+    assert cached.staff_id == staff.staff_id
+
+
+async def test_user_who_is_not_staff_can_not_be_an_admin(db):
+    user = await UserModel.create(**user_data())
+
+    with pytest.raises(InvalidRequestError) as error:
+        await AdminController.create(form_data={"user_id": user.user_id})
+
+    assert error.value.status_code == 404
+
+
+async def test_staff_can_only_be_made_an_admin_once(department):
+    staff = await create_staff(department)
+    await AdminController.create(form_data={"user_id": staff.user_id})
+
+    with pytest.raises(InvalidRequestError) as error:
+        await AdminController.create(form_data={"user_id": staff.user_id})
+
+    assert error.value.status_code == 400
+
+
+async def test_admin_model_needs_no_department(db):
+    user = await UserModel.create(**user_data())
+
+    admin = await AdminModel.create(user=user, staff_id="AFIT/ADM/0001")
+
+    assert admin.staff_id == "AFIT/ADM/0001"
+    assert await DepartmentModel.all().count() == 0
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from management_server.utils import tokens
+from management_server.utils.tokens import (
+    ACCESS_TOKEN,
+    REFRESH_TOKEN,
+    create_token,
+    _b64decode,
+    _b64encode,
+)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def access_token(user_id: str = "user") -> str:
+    return create_token(user_id=user_id, session_id="session", token_type=ACCESS_TOKEN)
+
+
+async def assert_unauthorized(client, headers: dict) -> None:
+    response = await client.get("/users/staff", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+async def test_missing_token_is_rejected(client):
+    await assert_unauthorized(client, {})
+
+
+async def test_expired_token_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(tokens.settings, "access_token_ttl", -60)
+    token = access_token()
+
+    await assert_unauthorized(client, bearer(token))
+
+
+async def test_tampered_payload_is_rejected(client):
+    encoded_payload, signature = access_token().split(".")
+    payload = _b64decode(encoded_payload).replace(b'"user"', b'"admin"')
+
+    await assert_unauthorized(client, bearer(f"{_b64encode(payload)}.{signature}"))
+
+
+@pytest.mark.parametrize("token", ["not-a-token", "a.b.c", "e30.e30"])
+async def test_malformed_token_is_rejected(client, token):
+    await assert_unauthorized(client, bearer(token))
+
+
+async def test_refresh_token_is_not_an_access_token(client):
+    token = create_token(user_id="user", session_id="session", token_type=REFRESH_TOKEN)
+
+    await assert_unauthorized(client, bearer(token))
+
+
+async def test_valid_token_is_accepted(client):
+    response = await client.get("/users/staff", headers=bearer(access_token()))
+
+    assert response.status_code == 200
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from benchmarks import http_api
+from management_server import invites
+from management_server.db import read_connection_names
+from management_server.server import main as server_main
+from management_server.settings import get_settings
+
+
+async def discard_invite(invite: invites.Invite) -> None:
+    pass
+
+
+@pytest.fixture
+def benchmark_env(monkeypatch, redis):
+    # the benchmark points the app at its own database through TORTOISE_CONFIG
+    monkeypatch.delenv("TORTOISE_CONFIG", raising=False)
+    monkeypatch.setattr(server_main, "init_redis_client", lambda: redis)
+    # the lifespan refuses to invite staff without a sender
+    monkeypatch.setattr(invites, "_sender", discard_invite)
+    get_settings.cache_clear()
+    read_connection_names.cache_clear()
+    yield
+    get_settings.cache_clear()
+    read_connection_names.cache_clear()
+
+
+async def test_http_benchmark_runs_every_operation_as_the_admin(
+    benchmark_env, tmp_path
+):
+    output = tmp_path / "results.json"
+    args = http_api.parse_args(
+        [
+            "--db-url",
+            f"sqlite://{tmp_path / 'benchmark.sqlite3'}",
+            "--staff",
+            "3",
+            "--requests",
+            "40",
+            "--concurrency",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+
+    await http_api.main(args)
+
+    report = json.loads(output.read_text())
+    assert report["total"]["requests"] == 40
+    assert report["total"]["errors"] == 0
+    assert set(report["operations"]) == set(http_api.DEFAULT_MIX)
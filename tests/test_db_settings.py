@@ -0,0 +1,89 @@
+from tortoise import connections
+
+from management_server import db as db_module
+from management_server.db import read_connection
+from management_server.helpers import DBType
+from management_server.settings import DBSettings
+
+
+def server_settings(database_type: DBType, **settings) -> DBSettings:
+    return DBSettings(
+        database_name="staff",
+        database_type=database_type,
+        database_hostname="primary",
+        database_port=5432,
+        database_username="app",
+        database_password="secret",
+        **settings,
+    )
+
+
+def test_postgres_pools_cover_the_primary_and_every_replica():
+    settings = server_settings(
+        DBType.POSTGRSQL,
+        database_replica_hosts=["replica-a", "replica-b:6543"],
+        database_min_pool_size=2,
+        database_max_pool_size=20,
+        database_command_timeout=3.0,
+        database_statement_cache_size=0,
+    )
+
+    connections_config = settings.tortoise_orm_config["connections"]
+
+    assert list(connections_config) == ["master", "replica_0", "replica_1"]
+    assert settings.read_connection_names == ["replica_0", "replica_1"]
+    hosts = [
+        (config["credentials"]["host"], config["credentials"]["port"])
+        for config in connections_config.values()
+    ]
+    # a replica without a port uses the primary's
+    assert hosts == [("primary", 5432), ("replica-a", 5432), ("replica-b", 6543)]
+    for config in connections_config.values():
+        assert config["engine"] == "tortoise.backends.asyncpg"
+        credentials = config["credentials"]
+        assert (credentials["minsize"], credentials["maxsize"]) == (2, 20)
+        assert credentials["command_timeout"] == 3.0
+        assert credentials["statement_cache_size"] == 0
+        assert credentials["max_inactive_connection_lifetime"] == 300.0
+
+
+def test_mysql_pools_recycle_idle_connections():
+    settings = server_settings(
+        DBType.MYSQL, database_max_inactive_connection_lifetime=120.5
+    )
+
+    (config,) = settings.tortoise_orm_config["connections"].values()
+
+    assert config["engine"] == "tortoise.backends.mysql"
+    assert config["credentials"]["pool_recycle"] == 120
+    assert config["credentials"]["connect_timeout"] == 10.0
+    assert settings.read_connection_names == []
+
+
+def test_sqlite_reads_go_to_a_query_only_connection_on_the_same_file():
+    settings = DBSettings(database_name="staff")
+
+    connections_config = settings.tortoise_orm_config["connections"]
+
+    writer, reader = connections_config["master"], connections_config["reader"]
+    assert writer["credentials"]["file_path"] == reader["credentials"]["file_path"]
+    assert reader["credentials"]["query_only"] == "ON"
+    assert "query_only" not in writer["credentials"]
+    assert settings.read_connection_names == ["reader"]
+
+
+async def test_reads_are_spread_over_the_read_connections(db, monkeypatch):
+    monkeypatch.setattr(db_module, "read_connection_names", lambda: ("reader", "master"))
+
+    used = [read_connection() for _ in range(4)]
+
+    reader, master = connections.get("reader"), connections.get("master")
+    assert used in ([reader, master] * 2, [master, reader] * 2)
+
+
+async def test_reads_use_the_default_connection_without_read_connections(
+    db, monkeypatch
+):
+    monkeypatch.setattr(db_module, "read_connection_names", lambda: ())
+
+    assert read_connection() is None
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import argparse
+
+import pytest
+
+from management_server.models import UserModel
+from management_server.controllers import UserControllers
+from management_server.controllers.UserControllers import AuthController
+from management_server.settings import HashingSettings, get_settings
+from management_server.utils import password_hasher
+from management_server.utils.hashing import PasswordHasher
+from management_server.utils.utils import pwd_context
+from scripts import calibrate_hashing
+
+from tests.test_sessions import PASSWORD, create_user
+
+
+def make_hasher(**settings) -> PasswordHasher:
+    return PasswordHasher(HashingSettings(hashing_bcrypt_rounds=4, **settings))
+
+
+async def test_hash_and_verify_round_trip():
+    hasher = make_hasher()
+    try:
+        password_hash = await hasher.hash("correct horse")
+
+        assert await hasher.verify(password_hash, "correct horse")
+        assert not await hasher.verify(password_hash, "wrong horse")
+    finally:
+        hasher.shutdown()
+
+
+async def test_hashing_does_not_block_the_event_loop():
+    hasher = make_hasher()
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        await hasher._run(time.sleep, 0.2)
+    finally:
+        ticker.cancel()
+        hasher.shutdown()
+
+    assert ticks >= 10
+
+
+async def test_concurrency_is_bounded_and_queue_depth_is_tracked():
+    hasher = make_hasher(hashing_max_concurrency=2, hashing_max_workers=4)
+    in_flight, queue_depth = [], []
+
+    async def sample():
+        while True:
+            in_flight.append(hasher.stats.in_flight)
+            queue_depth.append(hasher.stats.queue_depth)
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    try:
+        await asyncio.gather(*(hasher._run(time.sleep, 0.1) for _ in range(5)))
+    finally:
+        sampler.cancel()
+        hasher.shutdown()
+
+    assert max(in_flight) == 2
+    assert max(queue_depth) == 3
+    assert hasher.stats.completed == 5
+    assert hasher.stats.queue_depth == 0
+    assert hasher.stats.total_wait_time > 0
+
+
+@pytest.fixture
+async def weak_user(db, monkeypatch) -> UserModel:
+    user = await create_user()
+    # the user's hash, made at the test profile's 4 rounds, is now below it
+    monkeypatch.setenv("HASHING_BCRYPT_ROUNDS", "5")
+    get_settings.cache_clear()
+    pwd_context.cache_clear()
+    yield user
+    get_settings.cache_clear()
+    pwd_context.cache_clear()
+
+
+async def login_and_wait_for_rehash(user: UserModel) -> str:
+    await AuthController(email=user.email, password=PASSWORD).login()
+    await asyncio.gather(*UserControllers._rehash_tasks)
+    await user.refresh_from_db()
+    return user.password_hash
+
+
+async def test_weaker_hashes_are_upgraded_after_login(weak_user):
+    assert weak_user.password_hash.startswith("$2b$04$")
+
+    password_hash = await login_and_wait_for_rehash(weak_user)
+
+    assert password_hash.startswith("$2b$05$")
+    assert await password_hasher.verify(password_hash, PASSWORD)
+    assert not password_hasher.needs_update(password_hash)
+
+
+async def test_rehash_on_login_can_be_turned_off(weak_user, monkeypatch):
+    monkeypatch.setattr(password_hasher.settings, "hashing_rehash_on_login", False)
+    password_hash = weak_user.password_hash
+
+    assert await login_and_wait_for_rehash(weak_user) == password_hash
+
+
+async def test_a_rehash_does_not_overwrite_a_newer_password(weak_user):
+    stale = await UserModel.get(user_id=weak_user.user_id)
+    new_hash = await password_hasher.hash("a newer password")
+    await UserModel.filter(user_id=weak_user.user_id).update(password_hash=new_hash)
+
+    await AuthController._rehash_password(stale, PASSWORD)
+
+    await weak_user.refresh_from_db()
+    assert weak_user.password_hash == new_hash
+
+
+class FakeHandler:
+    """
+    Takes cost * 10 ms per hash on a fake clock.
+    """
+
+    clock = 0.0
+
+    def __init__(self, cost: int) -> None:
+        self.cost = cost
+
+    def hash(self, password: str) -> str:
+        FakeHandler.clock += self.cost * 0.01
+        return password
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    monkeypatch.setattr(
+        calibrate_hashing.time, "perf_counter", lambda: FakeHandler.clock
+    )
+
+
+def test_calibration_keeps_the_last_cost_under_the_target(fake_clock):
+    cost, timings = calibrate_hashing.calibrate(FakeHandler, 10, 16, 0.125, 3)
+
+    assert cost == 12
+    # the first cost over the target is measured, then the search stops
+    assert list(timings) == [10, 11, 12, 13]
+    assert timings[13] == pytest.approx(0.13)
+
+
+def test_calibration_keeps_the_minimum_cost_when_it_is_over_the_target(fake_clock):
+    cost, timings = calibrate_hashing.calibrate(FakeHandler, 10, 16, 0.05, 3)
+
+    assert cost == 10
+    assert list(timings) == [10]
+
+
+def test_calibration_writes_the_chosen_cost_to_the_env_file(
+    tmp_path, monkeypatch, capsys
+):
+    env_file = tmp_path / ".env"
+    env_file.write_text("SECRET_KEY=kept\n")
+    monkeypatch.setattr(calibrate_hashing, "ENV_LOCATION", str(env_file))
+    monkeypatch.setattr(
+        calibrate_hashing,
+        "calibrate",
+        lambda *args: (11, {10: 0.1, 11: 0.2, 12: 0.3}),
+    )
+
+    calibrate_hashing.main(
+        argparse.Namespace(scheme="bcrypt", target_ms=250.0, samples=1, write=True)
+    )
+
+    assert env_file.read_text().splitlines() == [
+        "SECRET_KEY=kept",
+        "HASHING_SCHEME='bcrypt'",
+        "HASHING_BCRYPT_ROUNDS='11'",
+    ]
+    assert "bcrypt cost 12: 300.0 ms" in capsys.readouterr().out
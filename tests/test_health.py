@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from management_server import health
+from management_server.health import ReadinessProbe, _db_pool_usage
+from management_server.routers import health_routers
+from management_server.settings import HealthSettings
+from management_server.utils import password_hasher
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(health.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def probe(monkeypatch) -> ReadinessProbe:
+    probe = ReadinessProbe(
+        HealthSettings(health_cache_ttl=2.0, health_check_timeout=0.05)
+    )
+    monkeypatch.setattr(health_routers, "readiness_probe", probe)
+    return probe
+
+
+@pytest.fixture
+def pings(redis, monkeypatch) -> list:
+    calls = []
+    ping = redis.ping
+
+    async def counted_ping():
+        calls.append(1)
+        return await ping()
+
+    monkeypatch.setattr(redis, "ping", counted_ping, raising=False)
+    return calls
+
+
+async def test_healthz_answers_without_checking_dependencies(client, probe, pings):
+    response = await client.get("/healthz")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    assert pings == []
+
+
+async def test_readyz_reports_every_check(client, probe):
+    response = await client.get("/readyz")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ok"
+    assert set(report["checks"]) == {
+        "database",
+        "redis",
+        "hashing_pool",
+        "database_pool",
+    }
+    assert all(check["status"] == "ok" for check in report["checks"].values())
+    assert report["checks"]["database_pool"]["detail"] == "no pool"
+    assert "latency-ms" in report["checks"]["database"]
+
+
+async def test_readyz_fails_when_redis_is_down(client, probe, redis, monkeypatch):
+    async def unavailable():
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(redis, "ping", unavailable, raising=False)
+
+    response = await client.get("/readyz")
+
+    assert response.status_code == 503
+    check = response.json()["checks"]["redis"]
+    assert (check["status"], check["detail"]) == ("fail", "redis is down")
+
+
+async def test_a_slow_check_times_out(client, probe, redis, monkeypatch):
+    async def hanging():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(redis, "ping", hanging, raising=False)
+
+    response = await client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["redis"]["detail"] == "timed out"
+
+
+async def test_a_saturated_hashing_pool_is_not_ready(client, probe, monkeypatch):
+    monkeypatch.setattr(password_hasher.stats, "queue_depth", 33)
+
+    response = await client.get("/readyz")
+
+    assert response.status_code == 503
+    check = response.json()["checks"]["hashing_pool"]
+    assert (check["status"], check["detail"]) == ("fail", "33 waiting, 0 running")
+
+
+def test_db_pool_usage_is_read_from_asyncpg_and_mysql_pools():
+    asyncpg_pool = SimpleNamespace(
+        get_size=lambda: 8, get_idle_size=lambda: 3, get_max_size=lambda: 10
+    )
+    mysql_pool = SimpleNamespace(size=6, freesize=1, maxsize=20)
+
+    assert _db_pool_usage(SimpleNamespace(_pool=asyncpg_pool)) == (5, 10)
+    assert _db_pool_usage(SimpleNamespace(_pool=mysql_pool)) == (5, 20)
+    assert _db_pool_usage(SimpleNamespace()) is None
+
+
+async def test_a_full_db_pool_is_not_ready(db, probe, monkeypatch):
+    monkeypatch.setattr(health, "_db_pool_usage", lambda client: (9, 10))
+
+    report = await probe.check()
+
+    assert report.status == "fail"
+    assert report.checks["database_pool"].detail == "9/10 connections in use"
+
+
+async def test_reports_are_reused_until_they_expire(client, probe, pings, clock):
+    for _ in range(3):
+        assert (await client.get("/readyz")).status_code == 200
+    assert len(pings) == 1
+
+    clock.now += 2.0
+    await client.get("/readyz")
+    assert len(pings) == 2
+
+
+async def test_concurrent_probes_share_one_round_of_checks(db, probe, pings, clock):
+    reports = await asyncio.gather(*(probe.check() for _ in range(10)))
+
+    assert len(pings) == 1
+    assert all(report is reports[0] for report in reports)
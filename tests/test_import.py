@@ -0,0 +1,102 @@
+import io
+import csv
+import json
+import uuid
+
+from fastapi import UploadFile
+
+from management_server.models import StaffModel, UserModel
+from management_server.controllers import UserController
+from management_server.utils.importers import iter_upload_rows
+from management_server.jobs import job_queue
+
+from tests.conftest import staff_form, user_data
+
+
+def csv_upload(rows) -> UploadFile:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return UploadFile(file=io.BytesIO(buffer.getvalue().encode()), filename="staff.csv")
+
+
+def ndjson_upload(lines) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO("\n".join(lines).encode()), filename="staff.ndjson"
+    )
+
+
+def errors_by_row(report):
+    return {error.row: error.error for error in report.errors}
+
+
+async def test_csv_import_reports_row_errors(department):
+    existing = user_data()
+    await UserModel.create(**existing, invite=True)
+    valid = [staff_form(department.department_id) for _ in range(3)]
+    rows = [
+        valid[0],
+        {**staff_form(department.department_id), "email": "not-an-email"},
+        valid[1],
+        {**staff_form(department.department_id), "department_id": str(uuid.uuid4())},
+        {**staff_form(department.department_id), "email": valid[0]["email"]},
+        {**staff_form(department.department_id), "email": existing["email"]},
+        valid[2],
+    ]
+
+    report = await UserController.bulk_create(
+        rows=iter_upload_rows(csv_upload(rows)), batch_size=4
+    )
+
+    assert report.created == 3
+    assert len(report.staff_ids) == 3
+    errors = errors_by_row(report)
+    assert sorted(errors) == [2, 4, 5, 6]
+    assert "Invalid Department" in errors[4]
+    assert "Duplicate" in errors[5]
+    assert "already exists" in errors[6]
+    assert await StaffModel.filter(department_id=department.department_id).count() == 3
+
+
+async def test_ndjson_import_reports_row_errors(department):
+    lines = [
+        json.dumps(staff_form(department.department_id)),
+        "{not json",
+        json.dumps(["a", "list"]),
+        "",
+        json.dumps({**staff_form(department.department_id), "phone_number": "01000000000"}),
+        json.dumps(staff_form(department.department_id)),
+    ]
+
+    report = await UserController.bulk_create(rows=iter_upload_rows(ndjson_upload(lines)))
+
+    assert report.created == 2
+    errors = errors_by_row(report)
+    assert sorted(errors) == [2, 3, 4]
+    assert errors[2].startswith("Invalid JSON")
+    assert "Invalid Phone number" in errors[4]
+
+
+async def test_import_reports_department_deleted_during_import(department, sent_invites):
+    deleted_department_id = uuid.uuid4()
+    departments = {
+        department.department_id: department.short_name,
+        deleted_department_id: "DEL",
+    }
+    rows = [
+        staff_form(department.department_id),
+        staff_form(deleted_department_id),
+        staff_form(department.department_id),
+    ]
+
+    report = await UserController._bulk_create(
+        rows=iter(rows), departments=departments, batch_size=10
+    )
+
+    assert report.created == 2
+    assert errors_by_row(report) == {
+        2: f"Invalid Department with id {deleted_department_id}"
+    }
+    await job_queue.queue.join()
+    assert sorted(invite.staff_id for invite in sent_invites) == sorted(report.staff_ids)
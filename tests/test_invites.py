@@ -0,0 +1,45 @@
+from dataclasses import asdict
+
+import pytest
+
+from management_server import invites
+from management_server.invites import Invite, configure_invite_sender
+from management_server.settings import AuthSettings
+
+delivered = []
+
+
+async def deliver(invite: Invite) -> None:
+    delivered.append(invite)
+
+
+@pytest.fixture(autouse=True)
+def no_sender(monkeypatch):
+    monkeypatch.setattr(invites, "_sender", invites._no_sender)
+
+
+def test_startup_fails_when_staff_are_invited_without_a_sender():
+    with pytest.raises(RuntimeError, match="INVITE_SENDER"):
+        configure_invite_sender(AuthSettings(invite_new_staff=True))
+
+
+def test_invites_are_off_until_they_are_turned_on(monkeypatch):
+    monkeypatch.delenv("INVITE_NEW_STAFF")
+
+    settings = AuthSettings()
+
+    assert not settings.invite_new_staff
+    configure_invite_sender(settings)
+    assert not invites.sender_configured()
+
+
+async def test_the_sender_is_loaded_from_its_import_path():
+    configure_invite_sender(
+        AuthSettings(invite_new_staff=True, invite_sender=f"{__name__}:deliver")
+    )
+
+    invite = Invite(
+        email="ada@example.com", staff_id="AFIT/CSC/0001", activation_token="token"
+    )
+    await invites.deliver_invites({"invites": [asdict(invite)]})
+    assert delivered[-1] == invite
@@ -0,0 +1,117 @@
+import asyncio
+
+from management_server import jobs
+from management_server.jobs import JobQueue, enqueue_audit
+from management_server.settings import JobSettings
+from management_server.exceptions import ServerFailureError
+from management_server.controllers import UserController
+
+from tests.conftest import staff_form
+
+
+def make_queue(**settings) -> JobQueue:
+    return JobQueue(JobSettings(job_backend="memory", job_workers=1, **settings))
+
+
+async def test_retry_backoff_does_not_block_the_worker():
+    queue = make_queue(job_retry_backoff=0.2)
+    done = []
+    flaky_calls = []
+
+    @queue.handler("flaky")
+    async def flaky(payload):
+        flaky_calls.append(payload)
+        if len(flaky_calls) == 1:
+            raise RuntimeError("first attempt fails")
+        done.append("flaky")
+
+    @queue.handler("fast")
+    async def fast(payload):
+        done.append("fast")
+
+    await queue.start()
+    try:
+        await queue.enqueue("flaky", {})
+        await asyncio.sleep(0.05)
+        await queue.enqueue("fast", {})
+        await asyncio.sleep(0.05)
+        # the fast job ran while the flaky one waited for its retry
+        assert done == ["fast"]
+        await asyncio.sleep(0.3)
+        assert done == ["fast", "flaky"]
+    finally:
+        await queue.stop()
+
+
+async def test_worker_survives_a_retry_that_can_not_be_queued(monkeypatch):
+    queue = make_queue(job_retry_backoff=0.01)
+    done = []
+
+    @queue.handler("broken")
+    async def broken(payload):
+        raise RuntimeError("always fails")
+
+    @queue.handler("fast")
+    async def fast(payload):
+        done.append("fast")
+
+    await queue.start()
+    try:
+        await queue.enqueue("broken", {})
+        put = queue._put
+
+        async def full(job):
+            raise ServerFailureError(status_code=503, detail="Job queue is full")
+
+        monkeypatch.setattr(queue, "_put", full)
+        await asyncio.sleep(0.05)
+        monkeypatch.setattr(queue, "_put", put)
+        await queue.enqueue("fast", {})
+        await asyncio.sleep(0.05)
+
+        assert done == ["fast"]
+        assert all(not worker.done() for worker in queue._workers)
+    finally:
+        await queue.stop()
+
+
+async def full_queue(name, payload):
+    raise ServerFailureError(status_code=503, detail="Job queue is full")
+
+
+async def test_audit_is_best_effort(monkeypatch):
+    monkeypatch.setattr(jobs.job_queue, "enqueue", full_queue)
+
+    await enqueue_audit("staff_created", staff_id="AFIT/CSC/0001")
+
+
+async def test_create_succeeds_when_the_audit_can_not_be_queued(department, monkeypatch):
+    monkeypatch.setattr(jobs.job_queue, "enqueue", full_queue)
+
+    created = await UserController.create(form_data=staff_form(department.department_id))
+
+    assert created.staff_id == "AFIT/CSC/0001"
+
+
+async def test_redis_stream_only_holds_the_backlog(redis):
+    queue = JobQueue(
+        JobSettings(job_backend="redis", job_workers=1, job_queue_size=5)
+    )
+    done = []
+
+    @queue.handler("invite")
+    async def invite(payload):
+        done.append(payload["token"])
+
+    await queue.start()
+    try:
+        for token in range(20):
+            await queue.enqueue("invite", {"token": token})
+            while len(done) <= token:
+                await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+    assert done == list(range(20))
+    # finished entries are deleted, no payloads are left behind
+    assert await redis.xlen("jobs") == 0
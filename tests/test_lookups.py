@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from management_server import lookups
+from management_server.controllers import StaffController, UserController
+from management_server.exceptions import InvalidRequestError
+from management_server.lookups import NegativeCache, SingleFlight, negative_cache
+from management_server.models import DepartmentModel, StaffModel, UserModel
+from management_server.schemas import ImportReport, UserSchema
+
+from tests.conftest import staff_form, user_data
+
+
+async def test_concurrent_calls_with_one_key_share_a_run():
+    single_flight = SingleFlight()
+    runs = []
+    release = asyncio.Event()
+
+    async def lookup(key):
+        runs.append(key)
+        await release.wait()
+        return key.upper()
+
+    calls = [
+        asyncio.ensure_future(single_flight.do(key, lambda key=key: lookup(key)))
+        for key in ["a", "a", "a", "b"]
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*calls) == ["A", "A", "A", "B"]
+    assert runs == ["a", "b"]
+    # finished runs are not reused
+    assert await single_flight.do("a", lambda: lookup("a")) == "A"
+    assert runs == ["a", "b", "a"]
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_shared_run():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def lookup():
+        await release.wait()
+        return "found"
+
+    first = asyncio.ensure_future(single_flight.do("key", lookup))
+    second = asyncio.ensure_future(single_flight.do("key", lookup))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "found"
+    assert first.cancelled()
+
+
+async def test_misses_are_remembered_until_they_expire(redis):
+    cache = NegativeCache(ttl=1)
+    search_key = {"staff_id": "AFIT/CSC/0001"}
+
+    await cache.remember(StaffModel, search_key)
+
+    assert await cache.is_missing(StaffModel, search_key)
+    assert await redis.ttl(cache.key(StaffModel, search_key)) == 1
+    await asyncio.sleep(1.1)
+    assert not await cache.is_missing(StaffModel, search_key)
+
+
+async def test_only_single_field_misses_are_remembered():
+    search_key = {"staff_id": "AFIT/CSC/0001", "id": "unknown"}
+
+    await negative_cache.remember(StaffModel, search_key)
+
+    assert not await negative_cache.is_missing(StaffModel, search_key)
+
+
+async def test_a_redis_outage_is_a_cache_miss(monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(lookups.Redis, "mget", unavailable)
+    monkeypatch.setattr(lookups.Redis, "mset", unavailable)
+
+    await negative_cache.remember(UserModel, {"email": "nobody@example.com"})
+    assert not await negative_cache.is_missing(
+        UserModel, {"email": "nobody@example.com"}
+    )
+
+
+async def test_a_remembered_miss_skips_the_database(db, monkeypatch):
+    queries = []
+    exists = UserModel.exists
+
+    def counted_exists(*args, **kwargs):
+        queries.append(kwargs)
+        return exists(*args, **kwargs)
+
+    monkeypatch.setattr(UserModel, "exists", counted_exists)
+
+    for _ in range(3):
+        assert not await UserController(email="nobody@example.com").exists()
+
+    assert len(queries) == 1
+
+
+async def test_creating_staff_forgets_the_misses_they_would_have_matched(department):
+    form = staff_form(department.department_id)
+    assert not await UserController(email=form["email"]).exists()
+    assert not await StaffController(staff_id="AFIT/CSC/0001").exists()
+
+    created = await UserController.create(form_data=form)
+
+    assert created.staff_id == "AFIT/CSC/0001"
+    assert await UserController(email=form["email"]).exists()
+    assert await StaffController(staff_id="AFIT/CSC/0001").exists()
+
+
+async def test_updating_an_email_forgets_the_miss_for_the_new_email(department):
+    created = await UserController.create(
+        form_data=staff_form(department.department_id)
+    )
+    new_email = "grace.hopper@example.com"
+    assert not await UserController(email=new_email).exists()
+
+    await StaffController(
+        staff_id=created.staff_id, fields={"email": new_email}
+    ).update()
+
+    assert not await negative_cache.is_missing(UserModel, {"email": new_email})
+    assert await UserController(email=new_email).exists()
+
+
+async def test_updating_to_a_taken_email_is_rejected(department):
+    first, second = [
+        await UserController.create(form_data=staff_form(department.department_id))
+        for _ in range(2)
+    ]
+
+    with pytest.raises(InvalidRequestError) as error:
+        await StaffController(
+            staff_id=second.staff_id, fields={"email": first.user.email}
+        ).update()
+
+    assert error.value.status_code == 400
+
+
+async def test_an_email_taken_during_an_import_fails_its_batch(
+    department, monkeypatch
+):
+    row = user_data()
+    allocate = DepartmentModel.allocate_staff_numbers
+
+    async def allocate_after_a_concurrent_create(*args, **kwargs):
+        await UserModel.create(**{**user_data(), "email": row["email"]}, invite=True)
+        return await allocate(*args, **kwargs)
+
+    monkeypatch.setattr(
+        DepartmentModel, "allocate_staff_numbers", allocate_after_a_concurrent_create
+    )
+    report = ImportReport()
+
+    await UserController._create_batch(
+        [(2, UserSchema.model_validate(row), department.department_id)],
+        {department.department_id: department.short_name},
+        report,
+    )
+
+    assert report.created == 0
+    assert [error.row for error in report.errors] == [2]
+    assert report.errors[0].error.startswith("Could not create staff")
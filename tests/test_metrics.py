@@ -0,0 +1,32 @@
+from management_server.metrics import render_metrics
+
+
+def metric_types() -> dict:
+    return {
+        line.split()[2]: line.split()[3]
+        for line in render_metrics().splitlines()
+        if line.startswith("# TYPE")
+    }
+
+
+def test_totals_are_exported_as_counters():
+    types = metric_types()
+
+    assert types["password_hasher_wait_seconds_total"] == "counter"
+    assert types["password_hasher_completed_total"] == "counter"
+    assert types["cache_lookups_total"] == "counter"
+
+
+def test_levels_are_exported_as_gauges():
+    types = metric_types()
+
+    assert types["password_hasher_queue_depth"] == "gauge"
+    assert types["password_hasher_in_flight"] == "gauge"
+    assert types["http_requests_in_flight"] == "gauge"
+
+
+def test_cache_lookups_are_rendered_by_result():
+    lines = render_metrics().splitlines()
+
+    assert any(line.startswith('cache_lookups_total{result="hit"}') for line in lines)
+    assert any(line.startswith('cache_lookups_total{result="miss"}') for line in lines)
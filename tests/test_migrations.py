@@ -0,0 +1,290 @@
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+
+from aerich.utils import import_py_file
+from tortoise import Tortoise, connections
+from tortoise.transactions import in_transaction
+
+from management_server.db import PRIMARY_CONNECTION
+from management_server.models import DepartmentModel, StaffModel, UserModel
+
+from tests.conftest import user_data
+
+MIGRATIONS = Path(__file__).parent.parent / "migrations" / "models"
+
+# the SQLite schema the models generated before this series of migrations
+PRE_SERIES_SCHEMA = """
+CREATE TABLE "user" (
+    "created_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "modified_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "user_id" CHAR(36) NOT NULL  PRIMARY KEY,
+    "first_name" VARCHAR(20) NOT NULL,
+    "last_name" VARCHAR(20) NOT NULL,
+    "email" VARCHAR(100) NOT NULL UNIQUE,
+    "phone_number" VARCHAR(11) NOT NULL UNIQUE,
+    "mobile_network" VARCHAR(15) NOT NULL,
+    "state" VARCHAR(20) NOT NULL,
+    "lga" VARCHAR(20) NOT NULL,
+    "ward" VARCHAR(20) NOT NULL,
+    "password_hash" VARCHAR(500) NOT NULL
+);
+CREATE TABLE "admin" (
+    "created_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "modified_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "id" CHAR(36) NOT NULL  PRIMARY KEY,
+    "staff_id" VARCHAR(13) NOT NULL,
+    "user_id" CHAR(36) NOT NULL UNIQUE REFERENCES "user" ("user_id") ON DELETE CASCADE
+);
+CREATE TABLE "department" (
+    "created_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "modified_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "department_id" CHAR(36) NOT NULL  PRIMARY KEY,
+    "name" VARCHAR(50) NOT NULL UNIQUE,
+    "short_name" VARCHAR(3) NOT NULL UNIQUE,
+    "description" TEXT NOT NULL,
+    "department_head_id" CHAR(36)  UNIQUE REFERENCES "admin" ("id") ON DELETE SET NULL
+);
+CREATE TABLE "staff" (
+    "created_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "modified_at" TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+    "id" CHAR(36) NOT NULL  PRIMARY KEY,
+    "staff_id" VARCHAR(13) NOT NULL,
+    "department_id" CHAR(36) REFERENCES "department" ("department_id") ON DELETE SET NULL,
+    "user_id" CHAR(36) NOT NULL UNIQUE REFERENCES "user" ("user_id") ON DELETE CASCADE
+);
+"""
+
+
+def migration_files():
+    return sorted(
+        (name for name in os.listdir(MIGRATIONS) if name.endswith(".py")),
+        key=lambda name: int(name.split("_")[0]),
+    )
+
+
+async def run_migration(version_file: str) -> None:
+    module = import_py_file(MIGRATIONS / version_file)
+    async with in_transaction(PRIMARY_CONNECTION) as connection:
+        await connection.execute_script(await module.upgrade(connection))
+
+
+@pytest.fixture
+async def pre_series_db(tortoise_config):
+    await Tortoise.init(config=tortoise_config)
+    await connections.get(PRIMARY_CONNECTION).execute_script(PRE_SERIES_SCHEMA)
+    yield connections.get(PRIMARY_CONNECTION)
+    await Tortoise.close_connections()
+
+
+async def insert_legacy_staff(connection, department_id, staff_id, created_at) -> str:
+    user_id, staff_pk = str(uuid.uuid4()), str(uuid.uuid4())
+    number = int(user_id[:7], 16)
+    await connection.execute_query(
+        'INSERT INTO "user" (user_id, first_name, last_name, email, phone_number, '
+        "mobile_network, state, lga, ward, password_hash) "
+        "VALUES (?, 'Ada', 'Lovelace', ?, ?, 'MTN Nigeria', 'Kaduna', 'Igabi', "
+        "'Rigachikun', 'hash')",
+        [user_id, f"staff{number}@example.com", f"0803{number % 10**7:07d}"],
+    )
+    await connection.execute_query(
+        'INSERT INTO "staff" (id, staff_id, department_id, user_id, created_at) '
+        "VALUES (?, ?, ?, ?, ?)",
+        [staff_pk, staff_id, department_id, user_id, created_at],
+    )
+    return staff_pk
+
+
+async def test_duplicate_staff_ids_are_renumbered_before_the_unique_index(
+    pre_series_db,
+):
+    department_id = str(uuid.uuid4())
+    await pre_series_db.execute_query(
+        "INSERT INTO department (department_id, name, short_name, description) "
+        "VALUES (?, 'Computer Science', 'CSC', 'Computing')",
+        [department_id],
+    )
+    first = await insert_legacy_staff(
+        pre_series_db, department_id, "AFIT/CSC/0001", "2024-01-01 00:00:00"
+    )
+    oldest = await insert_legacy_staff(
+        pre_series_db, department_id, "AFIT/CSC/0002", "2024-01-02 00:00:00"
+    )
+    racer = await insert_legacy_staff(
+        pre_series_db, department_id, "AFIT/CSC/0002", "2024-01-03 00:00:00"
+    )
+
+    for version_file in migration_files()[:2]:
+        await run_migration(version_file)
+
+    _, rows = await pre_series_db.execute_query("SELECT id, staff_id FROM staff")
+    assert {row["id"]: row["staff_id"] for row in rows} == {
+        first: "AFIT/CSC/0001",
+        oldest: "AFIT/CSC/0002",
+        racer: "AFIT/CSC/0003",
+    }
+    _, rows = await pre_series_db.execute_query(
+        "SELECT staff_sequence FROM department"
+    )
+    assert rows[0]["staff_sequence"] == 3
+
+
+async def test_duplicates_that_can_not_be_renumbered_fail_clearly(pre_series_db):
+    department_id = str(uuid.uuid4())
+    await pre_series_db.execute_query(
+        "INSERT INTO department (department_id, name, short_name, description) "
+        "VALUES (?, 'Computer Science', 'CSC', 'Computing')",
+        [department_id],
+    )
+    for created_at in ["2024-01-01 00:00:00", "2024-01-02 00:00:00"]:
+        await insert_legacy_staff(pre_series_db, department_id, "LEGACY", created_at)
+    module = import_py_file(MIGRATIONS / migration_files()[1])
+
+    with pytest.raises(ValueError, match="LEGACY"):
+        await module.upgrade(pre_series_db)
+
+
+async def test_migrations_create_a_new_database(tortoise_config):
+    await Tortoise.init(config=tortoise_config)
+    try:
+        for version_file in migration_files():
+            await run_migration(version_file)
+        department = await DepartmentModel.create(
+            name="Computer Science", short_name="CSC", description="Computing"
+        )
+        assert department.staff_sequence == 0
+    finally:
+        await Tortoise.close_connections()
+
+
+async def test_staff_sequence_continues_after_existing_staff_ids(department):
+    for number in [1, 2, 7]:
+        user = await UserModel.create(**user_data(), invite=True)
+        await StaffModel(
+            user_id=user.user_id,
+            department_id=department.department_id,
+            staff_id=f"AFIT/CSC/{number:04d}",
+        ).save()
+    # a database from before the counter existed
+    await connections.get(PRIMARY_CONNECTION).execute_script(
+        'ALTER TABLE "department" DROP COLUMN "staff_sequence"'
+    )
+
+    await run_migration(migration_files()[1])
+
+    await department.refresh_from_db()
+    assert department.staff_sequence == 7
+    user = await UserModel.create(**user_data(), invite=True)
+    staff = await StaffModel.create(
+        user_id=user.user_id, department_id=department.department_id
+    )
+    assert staff.staff_id == "AFIT/CSC/0008"
+
+
+async def test_pg_trgm_migration_only_changes_postgres(db):
+    module = import_py_file(MIGRATIONS / migration_files()[2])
+
+    assert await module.upgrade(connections.get(PRIMARY_CONNECTION)) == ""
+
+
+async def test_outbox_claim_column_is_added_to_an_existing_outbox(db):
+    connection = connections.get(PRIMARY_CONNECTION)
+    await connection.execute_script('ALTER TABLE "outbox" DROP COLUMN "claimed_until"')
+
+    await run_migration(migration_files()[3])
+
+    _, rows = await connection.execute_query(
+        "SELECT name FROM pragma_table_info('outbox') WHERE name = 'claimed_until'"
+    )
+    assert rows
+
+
+async def test_listing_indexes_replace_the_user_index_of_the_init_migration(db):
+    connection = connections.get(PRIMARY_CONNECTION)
+    module = import_py_file(MIGRATIONS / migration_files()[4])
+    # a database whose init migration ran before the listing indexes existed
+    await connection.execute_script(await module.downgrade(connection))
+    await connection.execute_script('DROP INDEX "idx_staff_departm_68a7a8"')
+
+    await run_migration(migration_files()[4])
+
+    names = await module.index_names(connection)
+    assert set(module.INDEXES) <= set(names)
+    assert "idx_user_state_02801e" not in names
+    # nothing left to do on a second run
+    assert await module.upgrade(connection) == ""
+
+
+async def user_columns(connection) -> dict:
+    _, rows = await connection.execute_query(
+        "SELECT name, \"notnull\" FROM pragma_table_info('user')"
+    )
+    return {row["name"]: row["notnull"] for row in rows}
+
+
+async def test_invite_columns_are_added_to_a_pre_series_user_table(pre_series_db):
+    department_id = str(uuid.uuid4())
+    await pre_series_db.execute_query(
+        "INSERT INTO department (department_id, name, short_name, description) "
+        "VALUES (?, 'Computer Science', 'CSC', 'Computing')",
+        [department_id],
+    )
+    staff_pk = await insert_legacy_staff(
+        pre_series_db, department_id, "AFIT/CSC/0001", "2024-01-01 00:00:00"
+    )
+    module = import_py_file(MIGRATIONS / migration_files()[5])
+
+    for version_file in migration_files():
+        await run_migration(version_file)
+
+    columns = await user_columns(pre_series_db)
+    assert columns["password_hash"] == 0
+    assert {"activation_token_hash", "activation_expires_at"} <= set(columns)
+    # the rebuilt table kept its rows, and the staff pointing at them
+    staff = await StaffModel.get(id=staff_pk).prefetch_related("user")
+    assert staff.user.password_hash == "hash"
+    listing_indexes = import_py_file(MIGRATIONS / migration_files()[4])
+    assert set(listing_indexes.INDEXES) <= set(
+        await listing_indexes.index_names(pre_series_db)
+    )
+    invited = await UserModel.create(**user_data(), invite=True)
+    assert invited.password_hash is None
+    with pytest.raises(ValueError, match="1 invited staff"):
+        await module.downgrade(pre_series_db)
+    # nothing left to do on a second run
+    assert await module.upgrade(pre_series_db) == ""
+
+
+async def test_invite_columns_downgrade_to_the_pre_series_user_table(pre_series_db):
+    for version_file in migration_files():
+        await run_migration(version_file)
+    department_id = str(uuid.uuid4())
+    await pre_series_db.execute_query(
+        "INSERT INTO department (department_id, name, short_name, description) "
+        "VALUES (?, 'Computer Science', 'CSC', 'Computing')",
+        [department_id],
+    )
+    staff_pk = await insert_legacy_staff(
+        pre_series_db, department_id, "AFIT/CSC/0001", "2024-01-01 00:00:00"
+    )
+    module = import_py_file(MIGRATIONS / migration_files()[5])
+
+    async with in_transaction(PRIMARY_CONNECTION) as connection:
+        await connection.execute_script(await module.downgrade(connection))
+
+    columns = await user_columns(pre_series_db)
+    assert columns["password_hash"] == 1
+    assert not {"activation_token_hash", "activation_expires_at"} & set(columns)
+    _, rows = await pre_series_db.execute_query(
+        'SELECT password_hash FROM "user" JOIN staff USING (user_id) WHERE id = ?',
+        [staff_pk],
+    )
+    assert rows[0]["password_hash"] == "hash"
+
+
+async def test_invite_columns_migration_leaves_a_new_database_alone(db):
+    module = import_py_file(MIGRATIONS / migration_files()[5])
+
+    assert await module.upgrade(connections.get(PRIMARY_CONNECTION)) == ""
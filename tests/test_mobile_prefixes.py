@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from management_server.utils.model_helpers import MobilePrefixRegistry
+from management_server.utils.validators import phone_number_vaidator
+
+
+def write_prefixes(path, networks) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "mobile": [
+                    {"network": network, "prefixes": prefixes}
+                    for network, prefixes in networks.items()
+                ]
+            }
+        )
+    )
+
+
+def test_five_digit_prefix_wins_over_four_digit(tmp_path):
+    path = tmp_path / "prefixes.json"
+    write_prefixes(path, {"Four": ["0702"], "Five": ["07025"]})
+    registry = MobilePrefixRegistry(str(path))
+
+    assert registry.lookup("07025000000") == "Five"
+    assert registry.lookup("07021000000") == "Four"
+    assert registry.lookup("09999999999") is None
+
+
+def test_prefixes_are_read_once_until_reloaded(tmp_path):
+    path = tmp_path / "prefixes.json"
+    write_prefixes(path, {"Old": ["0803"]})
+    registry = MobilePrefixRegistry(str(path))
+    assert registry.lookup("08030000000") == "Old"
+
+    write_prefixes(path, {"New": ["0803"]})
+
+    assert registry.lookup("08030000000") == "Old"
+    registry.reload()
+    assert registry.lookup("08030000000") == "New"
+
+
+def test_registry_loads_lazily(tmp_path):
+    path = tmp_path / "prefixes.json"
+    write_prefixes(path, {"MTN Nigeria": ["0803"]})
+    registry = MobilePrefixRegistry(str(path))
+
+    assert not registry.loaded
+    registry.lookup("08030000000")
+    assert registry.loaded
+
+
+def test_missing_prefixes_file_is_reported(tmp_path):
+    registry = MobilePrefixRegistry(str(tmp_path / "missing.json"))
+
+    with pytest.raises(FileNotFoundError):
+        registry.load()
+
+
+def test_validator_uses_the_shipped_prefixes():
+    assert phone_number_vaidator("08030000001") == "MTN Nigeria"
+    assert phone_number_vaidator("00000000000") is None
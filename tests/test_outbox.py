@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from tortoise.transactions import in_transaction
+
+from management_server.db import PRIMARY_CONNECTION
+from management_server.models import DepartmentModel, OutboxModel
+from management_server.outbox import OutboxRelay, outbox_cache_delete
+from management_server.redis_cache import Redis
+from management_server.settings import OutboxSettings
+
+
+class StalledPipeline:
+    """
+    A pipeline whose round trip never completes, like a Redis that stopped
+    answering.
+    """
+
+    async def __aenter__(self) -> "StalledPipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def delete(self, keys) -> None:
+        pass
+
+    async def execute(self) -> None:
+        await asyncio.Event().wait()
+
+
+async def stalled_pipeline(transaction: bool = False) -> StalledPipeline:
+    return StalledPipeline()
+
+
+async def queue_cache_delete(*keys: str) -> None:
+    async with in_transaction(PRIMARY_CONNECTION) as connection:
+        await outbox_cache_delete(list(keys), using_db=connection)
+
+
+async def create_department() -> None:
+    async with in_transaction(PRIMARY_CONNECTION) as connection:
+        await DepartmentModel.create(
+            name="Mathematics", short_name="MTH", description="Numbers", using_db=connection
+        )
+
+
+def make_relay() -> OutboxRelay:
+    return OutboxRelay(OutboxSettings(outbox_apply_timeout=0.3))
+
+
+async def test_drain_applies_and_removes_the_batch(db, redis):
+    await redis.set("staff:1", "cached")
+    await queue_cache_delete("staff:1")
+
+    applied = await make_relay().drain_once()
+
+    assert applied == 1
+    assert await redis.get("staff:1") is None
+    assert await OutboxModel.all().count() == 0
+
+
+async def test_stalled_redis_does_not_block_writes(db, monkeypatch):
+    await queue_cache_delete("staff:1")
+    monkeypatch.setattr(Redis, "pipeline", stalled_pipeline)
+    drain = asyncio.create_task(make_relay().drain_once())
+    await asyncio.sleep(0.05)
+    assert not drain.done()
+
+    # a write while the relay waits on Redis
+    await asyncio.wait_for(create_department(), timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await drain
+    assert await DepartmentModel.filter(short_name="MTH").exists()
+
+
+async def test_batch_is_retried_after_a_stalled_redis(db, redis, monkeypatch):
+    await redis.set("staff:1", "cached")
+    await queue_cache_delete("staff:1")
+    relay = make_relay()
+    with monkeypatch.context() as patch:
+        patch.setattr(Redis, "pipeline", stalled_pipeline)
+        with pytest.raises(asyncio.TimeoutError):
+            await relay.drain_once()
+    event = await OutboxModel.get()
+    assert event.claimed_until is None
+
+    assert await relay.drain_once() == 1
+    assert await redis.get("staff:1") is None
+    assert await OutboxModel.all().count() == 0
+
+
+async def test_claimed_rows_are_left_to_their_relay(db):
+    await queue_cache_delete("staff:1")
+    relay = make_relay()
+    claimed = await relay._claim()
+
+    assert [event.topic for event in claimed] == ["cache.delete"]
+    assert await relay._claim() == []
@@ -0,0 +1,118 @@
+import pytest
+
+from management_server import rate_limit
+from management_server.controllers.UserControllers import AuthController
+from management_server.exceptions import InvalidCredentialsError, InvalidRequestError
+from management_server.rate_limit import RateLimiter
+from management_server.routers import auth_routers
+from management_server.settings import RateLimitSettings
+from management_server.utils import password_hasher
+
+from tests.test_sessions import PASSWORD, create_user
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "time", clock.time)
+    return clock
+
+
+def make_limiter(limit: str = "3/second") -> RateLimiter:
+    return RateLimiter(
+        RateLimitSettings(rate_limit_enabled=True, rate_limits={"login": limit})
+    )
+
+
+async def test_a_full_bucket_allows_a_burst_of_its_capacity(clock):
+    limiter = make_limiter()
+
+    for _ in range(3):
+        await limiter.hit("login", "ip:1")
+    with pytest.raises(InvalidRequestError) as error:
+        await limiter.hit("login", "ip:1")
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "1"}
+
+
+async def test_tokens_refill_over_the_period(clock):
+    limiter = make_limiter("60/minute")
+    for _ in range(60):
+        await limiter.hit("login", "ip:1")
+
+    # one token per second
+    clock.now += 1
+    await limiter.hit("login", "ip:1")
+    with pytest.raises(InvalidRequestError):
+        await limiter.hit("login", "ip:1")
+    clock.now += 5
+    for _ in range(5):
+        await limiter.hit("login", "ip:1")
+
+
+async def test_every_identity_has_its_own_bucket(clock):
+    limiter = make_limiter("1/minute")
+    await limiter.hit("login", "ip:1", "email:a@example.com")
+
+    await limiter.hit("login", "ip:2", "email:b@example.com")
+    # a new IP does not get around the account's bucket
+    with pytest.raises(InvalidRequestError):
+        await limiter.hit("login", "ip:3", "email:a@example.com")
+
+
+async def test_a_redis_outage_lets_requests_through(monkeypatch):
+    limiter = make_limiter("1/minute")
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(limiter, "_take", unavailable)
+
+    for _ in range(3):
+        await limiter.hit("login", "ip:1")
+
+
+async def test_login_returns_429_once_the_bucket_is_empty(client, clock, monkeypatch):
+    monkeypatch.setattr(auth_routers, "rate_limiter", make_limiter("2/minute"))
+    form = {"email": "nobody@example.com", "password": "wrong password"}
+
+    statuses = [
+        (await client.post("/auth/login", data=form)).status_code for _ in range(2)
+    ]
+    limited = await client.post("/auth/login", data=form)
+
+    assert statuses == [401, 401]
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == 30
+
+
+async def test_unknown_accounts_are_verified_against_a_current_hash(db, monkeypatch):
+    user = await create_user()
+    verified = []
+    verify = password_hasher.verify
+
+    async def recorded_verify(password_hash: str, password: str) -> bool:
+        verified.append(password_hash)
+        return await verify(password_hash, password)
+
+    monkeypatch.setattr(password_hasher, "verify", recorded_verify)
+
+    for email in ["nobody@example.com", user.email]:
+        with pytest.raises(InvalidCredentialsError):
+            await AuthController(email=email, password="wrong password").login()
+
+    # the unknown account paid for a verify with the current scheme too
+    dummy_hash, user_hash = verified
+    assert dummy_hash == await password_hasher.dummy_hash()
+    assert dummy_hash.split("$")[:3] == user_hash.split("$")[:3]
+    assert not password_hasher.needs_update(dummy_hash)
+    assert await AuthController(email=user.email, password=PASSWORD).login()
@@ -0,0 +1,72 @@
+import pytest
+
+from management_server import redis_cache
+from management_server.redis_cache import (
+    Redis,
+    close_redis_client,
+    create_redis_client,
+    get_redis_client,
+)
+from management_server.settings import RedisSettings
+
+
+@pytest.fixture
+def no_client(monkeypatch):
+    monkeypatch.setattr(redis_cache, "_redis_client", None)
+
+
+def test_client_pool_is_built_from_the_settings():
+    client = create_redis_client(
+        RedisSettings(
+            redis_host="cache",
+            redis_port=6380,
+            redis_db=2,
+            redis_max_connections=7,
+            redis_connect_timeout=0.5,
+            redis_stream_timeout=1.5,
+        )
+    )
+
+    pool = client.connection_pool
+    assert pool.max_connections == 7
+    assert pool.connection_kwargs == {
+        "host": "cache",
+        "port": 6380,
+        "db": 2,
+        "password": None,
+        "connect_timeout": 0.5,
+        "stream_timeout": 1.5,
+    }
+    client.connection_pool.disconnect()
+
+
+def test_client_is_created_once_and_on_first_use(no_client):
+    assert redis_cache._redis_client is None
+
+    client = get_redis_client()
+
+    assert get_redis_client() is client
+    close_redis_client()
+    assert redis_cache._redis_client is None
+
+
+async def test_mset_with_a_ttl_expires_the_keys(redis):
+    await Redis.mset({"a": "1", "b": "2"}, ex=30)
+
+    assert await Redis.mget(["a", "missing", "b"]) == [b"1", None, b"2"]
+    assert 0 < await redis.ttl("a") <= 30
+
+
+async def test_mset_without_a_ttl_keeps_the_keys(redis):
+    await Redis.mset({"a": "1"})
+
+    assert await redis.ttl("a") == -1
+
+
+async def test_pipeline_sends_the_queued_commands(redis):
+    async with await Redis.pipeline() as pipe:
+        await pipe.set("a", "1")
+        await pipe.incr("counter")
+        await pipe.execute()
+
+    assert await Redis.mget(["a", "counter"]) == [b"1", b"1"]
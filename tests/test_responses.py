@@ -0,0 +1,41 @@
+import json
+
+from management_server import responses
+from management_server.responses import SchemaResponse, schema_response
+from management_server.schemas import StaffPage
+
+from tests.test_staff_cache import create_staff
+
+
+def test_schemas_are_returned_as_they_are_when_fast_responses_are_off(monkeypatch):
+    monkeypatch.setattr(responses, "fast_responses", False)
+    page = StaffPage(items=[])
+
+    assert schema_response(page) is page
+
+
+def test_schemas_are_serialized_by_alias_when_fast_responses_are_on(monkeypatch):
+    monkeypatch.setattr(responses, "fast_responses", True)
+
+    response = schema_response(StaffPage(items=[], next_cursor="abc"))
+
+    assert isinstance(response, SchemaResponse)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"items": [], "next-cursor": "abc"}
+    assert schema_response(None) is None
+
+
+async def test_fast_responses_match_the_default_responses(
+    client, auth_headers, department, monkeypatch
+):
+    staff = await create_staff(department)
+    bodies = []
+    for enabled in [False, True]:
+        monkeypatch.setattr(responses, "fast_responses", enabled)
+        for path in [f"/users/staff/{staff.id}", "/users/staff"]:
+            response = await client.get(path, headers=auth_headers)
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            bodies.append(response.json())
+
+    assert bodies[:2] == bodies[2:]
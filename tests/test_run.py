@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+from management_server.server import run
+from management_server.settings import AppConfig
+
+
+@pytest.fixture
+def launches(monkeypatch) -> list:
+    calls = []
+    monkeypatch.setattr(
+        run.uvicorn, "run", lambda app, **options: calls.append((app, options))
+    )
+    return calls
+
+
+def start(monkeypatch, config: AppConfig, *argv: str) -> None:
+    monkeypatch.setattr(run, "get_settings", lambda settings_class: config)
+    monkeypatch.setattr(sys, "argv", ["run", *argv])
+    run.main()
+
+
+def test_production_runs_the_configured_workers(monkeypatch, launches):
+    monkeypatch.setattr(run.importlib.util, "find_spec", lambda name: object())
+
+    start(monkeypatch, AppConfig(workers=3, port=9000, backlog=512))
+
+    ((app, options),) = launches
+    assert app == run.APP
+    assert options["workers"] == 3
+    assert options["port"] == 9000
+    assert options["backlog"] == 512
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert "reload" not in options
+
+
+def test_workers_default_to_the_cpu_count(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 6)
+
+    assert AppConfig().worker_count == 6
+    assert AppConfig(workers=2).worker_count == 2
+
+
+def test_missing_uvloop_and_httptools_fall_back_to_auto(monkeypatch, launches):
+    monkeypatch.setattr(run.importlib.util, "find_spec", lambda name: None)
+
+    start(monkeypatch, AppConfig())
+
+    ((_, options),) = launches
+    assert options["loop"] == "auto"
+    assert options["http"] == "auto"
+
+
+@pytest.mark.parametrize(
+    "config,argv", [(AppConfig(), ["--reload"]), (AppConfig(reload=True), [])]
+)
+def test_reload_runs_the_single_worker_development_server(
+    monkeypatch, launches, config, argv
+):
+    start(monkeypatch, config, *argv)
+
+    ((_, options),) = launches
+    assert options["reload"] is True
+    assert "workers" not in options
+
+
+def test_gunicorn_without_the_package_fails_clearly(monkeypatch, launches):
+    monkeypatch.setitem(sys.modules, "gunicorn.app.base", None)
+
+    with pytest.raises(RuntimeError, match="gunicorn is not installed"):
+        start(monkeypatch, AppConfig(use_gunicorn=True))
+    assert launches == []
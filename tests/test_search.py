@@ -0,0 +1,25 @@
+from management_server.models import StaffModel
+from management_server.controllers import StaffController
+
+from tests.test_staff_cache import create_staff
+
+
+async def test_search_finds_staff_by_partial_email(department):
+    staff = await create_staff(department)
+
+    page = await StaffController.search(staff.user.email.split("@")[0])
+
+    assert [item.staff_id for item in page.items] == [staff.staff_id]
+
+
+async def test_staff_without_a_department_are_left_out(client, auth_headers, department):
+    kept = await create_staff(department)
+    orphaned = await create_staff(department)
+    await StaffModel.filter(id=orphaned.id).update(department_id=None)
+
+    response = await client.get(
+        "/users/search", params={"q": "example.com"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert [item["staff-id"] for item in response.json()["items"]] == [kept.staff_id]
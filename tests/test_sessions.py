@@ -0,0 +1,49 @@
+import asyncio
+
+from management_server.models import UserModel
+from management_server.utils.tokens import settings as token_settings
+from management_server.controllers.UserControllers import AuthController
+from management_server.exceptions import InvalidCredentialsError
+from tests.conftest import user_data
+
+PASSWORD = "correct horse battery staple"
+
+
+async def create_user() -> UserModel:
+    # create hashes the password it is given
+    return await UserModel.create(**user_data(), password_hash=PASSWORD)
+
+
+async def is_active(refresh_token: str) -> bool:
+    try:
+        await AuthController.refresh(refresh_token)
+    except InvalidCredentialsError:
+        return False
+    return True
+
+
+async def test_concurrent_logins_keep_every_session(db):
+    user = await create_user()
+    auth = AuthController(email=user.email, password=PASSWORD)
+
+    tokens = await asyncio.gather(*(auth.login() for _ in range(5)))
+
+    assert [await is_active(token.refresh_token) for token in tokens] == [True] * 5
+
+
+async def test_oldest_sessions_are_ended_past_the_cap(db, redis, monkeypatch):
+    monkeypatch.setattr(token_settings, "max_sessions", 3)
+    user = await create_user()
+    auth = AuthController(email=user.email, password=PASSWORD)
+
+    tokens = [await auth.login() for _ in range(5)]
+
+    assert [await is_active(token.refresh_token) for token in tokens] == [
+        False,
+        False,
+        True,
+        True,
+        True,
+    ]
+    assert await redis.zcard(AuthController.session_key(user.user_id)) == 3
+    assert await redis.ttl(AuthController.session_key(user.user_id)) > 0
@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+from benchmarks import import_time
+from management_server.settings import AppConfig, AuthSettings, get_settings
+
+ROOT = Path(__file__).parent.parent
+
+# what importing the app leaves behind, then what the first hash loads
+IMPORT_CHECK = """
+import sys, json
+import management_server.server.main
+import scripts.orm_config
+from management_server import redis_cache
+from management_server.utils.utils import hash_password
+
+loaded = lambda: sorted(m for m in ("passlib", "yaml") if m in sys.modules)
+at_import = loaded()
+hash_password("password")
+print(json.dumps({
+    "at_import": at_import,
+    "after_hash": loaded(),
+    "redis_client": redis_cache._redis_client is not None,
+}))
+"""
+
+
+def run_fresh(code: str) -> dict:
+    env = {
+        key: value for key, value in os.environ.items() if key != "DATABASE_NAME"
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_settings_are_read_once_and_shared(monkeypatch):
+    get_settings.cache_clear()
+    try:
+        settings = get_settings(AppConfig)
+        monkeypatch.setenv("PORT", "9123")
+
+        assert get_settings(AppConfig) is settings
+        assert get_settings(AuthSettings) is not settings
+        get_settings.cache_clear()
+        assert get_settings(AppConfig).port == 9123
+    finally:
+        get_settings.cache_clear()
+
+
+def test_importing_the_app_needs_no_database_and_loads_heavy_modules_lazily():
+    report = run_fresh(IMPORT_CHECK)
+
+    assert report == {
+        "at_import": [],
+        "after_hash": ["passlib"],
+        "redis_client": False,
+    }
+
+
+def test_import_time_benchmark_passes_within_its_budget(capsys):
+    args = import_time.argparse.Namespace(
+        module=import_time.APP_MODULE, budget_ms=60000.0, runs=1, top=3
+    )
+
+    assert import_time.main(args) == 0
+    assert "FAIL" not in capsys.readouterr().out
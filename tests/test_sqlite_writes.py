@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from tortoise import connections
+from tortoise.exceptions import OperationalError
+
+from management_server.db import PRIMARY_CONNECTION, WriteQueue
+from management_server.models import DepartmentModel
+from management_server.settings import DBSettings
+
+
+async def pragma(connection_name: str, name: str):
+    _, rows = await connections.get(connection_name).execute_query(f"PRAGMA {name}")
+    return rows[0][0]
+
+
+def department_write(number: int, fail: bool = False):
+    async def write(connection):
+        department = await DepartmentModel.create(
+            name=f"Department {number}",
+            short_name=f"D{number:02d}",
+            description="Queued",
+            using_db=connection,
+        )
+        if fail:
+            raise ValueError(f"write {number} failed")
+        return connection, department.department_id
+
+    return write
+
+
+@pytest.fixture
+async def queue(db):
+    queue = WriteQueue(
+        DBSettings(
+            database_name="test",
+            sqlite_group_commit_max_batch=4,
+            sqlite_group_commit_window=0.01,
+        )
+    )
+    await queue.start()
+    yield queue
+    await queue.stop()
+
+
+async def test_sqlite_connections_open_with_the_wal_profile(db):
+    for name in [PRIMARY_CONNECTION, "reader"]:
+        assert await pragma(name, "journal_mode") == "wal"
+        # NORMAL
+        assert await pragma(name, "synchronous") == 1
+        assert await pragma(name, "busy_timeout") == 5000
+        assert await pragma(name, "cache_size") == -64000
+        # MEMORY
+        assert await pragma(name, "temp_store") == 2
+    assert await pragma(PRIMARY_CONNECTION, "query_only") == 0
+    assert await pragma("reader", "query_only") == 1
+
+
+async def test_the_reader_can_not_write(db):
+    with pytest.raises(OperationalError):
+        await DepartmentModel.create(
+            name="Read Only",
+            short_name="RDO",
+            description="Refused",
+            using_db=connections.get("reader"),
+        )
+
+
+async def test_queued_writes_share_a_commit_up_to_the_batch_size(queue):
+    results = await asyncio.gather(
+        *(queue.submit(department_write(n)) for n in range(10))
+    )
+
+    groups = {}
+    for connection, _ in results:
+        groups[id(connection)] = groups.get(id(connection), 0) + 1
+    assert sorted(groups.values()) == [2, 4, 4]
+    # committed once submit returns, the reader sees every write
+    reader = connections.get("reader")
+    assert await DepartmentModel.all().using_db(reader).count() == 10
+
+
+async def test_a_failed_write_is_rolled_back_alone(queue):
+    results = await asyncio.gather(
+        *(queue.submit(department_write(n, fail=n == 1)) for n in range(3)),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert results[0][0] is results[2][0]
+    assert sorted(
+        await DepartmentModel.all().values_list("short_name", flat=True)
+    ) == ["D00", "D02"]
+
+
+async def test_without_group_commit_each_write_has_its_own_transaction(db):
+    queue = WriteQueue(DBSettings(database_name="test", sqlite_group_commit=False))
+    await queue.start()
+
+    assert not queue.running
+    first, _ = await queue.submit(department_write(1))
+    second, _ = await queue.submit(department_write(2))
+    assert first is not second
+    assert await DepartmentModel.all().count() == 2
@@ -0,0 +1,137 @@
+import uuid
+
+from management_server.models import UserModel
+from management_server.controllers import (
+    AdminController,
+    StaffController,
+    UserController,
+)
+from management_server.outbox import outbox_relay
+from management_server.redis_cache import Redis
+
+from tests.conftest import staff_form
+
+
+async def create_staff(department):
+    created = await UserController.create(form_data=staff_form(department.department_id))
+    return await StaffController(staff_id=created.staff_id).get(return_model=True)
+
+
+async def test_cache_miss_reads_the_database_and_fills_the_cache(department, redis):
+    staff = await create_staff(department)
+    cache_key = StaffController.cache_key(staff.id)
+    assert await redis.get(cache_key) is None
+
+    found = await StaffController(id=staff.id).get()
+
+    assert found.staff_id == staff.staff_id
+    assert await redis.get(cache_key) is not None
+
+
+async def test_cache_hit_does_not_read_the_database(department):
+    staff = await create_staff(department)
+    await StaffController(id=staff.id).get()
+    # changed behind the controller's back, only a database read would see it
+    await UserModel.filter(user_id=staff.user_id).update(first_name="Grace")
+
+    cached = await StaffController(id=staff.id).get()
+
+    assert cached.user.first_name == "Ada"
+
+
+async def test_update_invalidates_the_cache(department, redis):
+    staff = await create_staff(department)
+    await StaffController(id=staff.id).get()
+
+    await StaffController(id=staff.id, fields={"first_name": "Grace"}).update()
+
+    assert await redis.get(StaffController.cache_key(staff.id)) is None
+    updated = await StaffController(id=staff.id).get()
+    assert updated.user.first_name == "Grace"
+
+
+async def test_delete_invalidates_the_cache(department, redis):
+    staff = await create_staff(department)
+    await StaffController(id=staff.id).get()
+
+    await StaffController(id=staff.id).delete()
+
+    assert await redis.get(StaffController.cache_key(staff.id)) is None
+    assert await StaffController(id=staff.id).get() is None
+
+
+async def test_get_unknown_staff_returns_404(client, auth_headers):
+    response = await client.get(f"/users/staff/{uuid.uuid4()}", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+async def test_get_deleted_staff_returns_404(client, auth_headers, department):
+    staff = await create_staff(department)
+    response = await client.get(f"/users/staff/{staff.id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    await StaffController(id=staff.id).delete()
+
+    # the second read is answered by the negative cache
+    for _ in range(2):
+        response = await client.get(f"/users/staff/{staff.id}", headers=auth_headers)
+        assert response.status_code == 404
+
+
+async def test_create_caches_the_staff_under_the_id_the_api_reads(
+    client, auth_headers, department, redis, monkeypatch
+):
+    created = await UserController.create(form_data=staff_form(department.department_id))
+    await outbox_relay.drain_once()
+    staff = await StaffController(staff_id=created.staff_id).get(return_model=True)
+    assert await redis.get(StaffController.cache_key(staff.id)) is not None
+
+    async def no_database(*args, **kwargs):
+        raise AssertionError("read the database")
+
+    monkeypatch.setattr(StaffController, "_load", no_database)
+    response = await client.get(f"/users/staff/{staff.id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["staff-id"] == created.staff_id
+
+
+async def test_redis_outage_falls_back_to_the_database(department, monkeypatch):
+    staff = await create_staff(department)
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(Redis, "get_key", unavailable)
+    monkeypatch.setattr(Redis, "create_key", unavailable)
+
+    found = await StaffController(id=staff.id).get()
+
+    assert found.staff_id == staff.staff_id
+
+
+async def test_update_invalidates_the_admin_entry_of_the_user(department, redis):
+    staff = await create_staff(department)
+    admin = await AdminController.create(form_data={"user_id": staff.user_id})
+    await AdminController(staff_id=admin.staff_id).get()
+    assert await redis.get(AdminController.cache_key(admin.staff_id)) is not None
+
+    await StaffController(id=staff.id, fields={"first_name": "Grace"}).update()
+
+    assert await redis.get(AdminController.cache_key(admin.staff_id)) is None
+    updated = await AdminController(staff_id=admin.staff_id).get()
+    assert updated.user.first_name == "Grace"
+
+
+async def test_only_admins_can_change_staff(client, auth_headers, department):
+    staff = await create_staff(department)
+
+    updated = await client.put(
+        f"/users/staff/{staff.id}", json={"first-name": "Grace"}, headers=auth_headers
+    )
+    deleted = await client.delete(f"/users/staff/{staff.id}", headers=auth_headers)
+
+    assert updated.status_code == 403
+    assert deleted.status_code == 403
+    assert await StaffController(id=staff.id).get(return_model=True) is not None
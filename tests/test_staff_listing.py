@@ -0,0 +1,139 @@
+import time
+import uuid
+from statistics import median
+from typing import List
+
+from tortoise import Tortoise, timezone
+from tortoise.expressions import Q
+
+from management_server.models import StaffModel, UserModel
+from management_server.controllers import StaffController
+
+from tests.conftest import user_data
+
+WARDS = 10
+LISTED_STAFF = 100_000
+PAGE_SIZE = 10
+
+
+async def seed_staff(department, count: int) -> List[UserModel]:
+    """
+    Bulk creates staff spread evenly over WARDS wards of one lga, most of
+    them share a created_at so the pages have ties to break.
+    """
+    users = [
+        UserModel(
+            **{**user_data(number), "ward": f"Ward {number % WARDS}"},
+            password_hash="unused",
+        )
+        for number in range(count)
+    ]
+    await UserModel.bulk_create(users, batch_size=5000)
+    await StaffModel.bulk_create(
+        [
+            StaffModel(
+                user_id=user.user_id,
+                department_id=department.department_id,
+                staff_id=f"AFIT/C{number:06d}",
+            )
+            for number, user in enumerate(users)
+        ],
+        batch_size=5000,
+    )
+    return users
+
+
+async def walk(**filters) -> List[str]:
+    staff_ids, cursor = [], None
+    while True:
+        page = await StaffController.get_page(
+            limit=PAGE_SIZE, cursor=cursor, **filters
+        )
+        staff_ids.extend(item.staff_id for item in page.items)
+        if page.next_cursor is None:
+            return staff_ids
+        cursor = page.next_cursor
+
+
+async def test_location_pages_list_every_staff_once(department):
+    users = await seed_staff(department, 95)
+    expected = sorted(
+        (user for user in users if user.ward == "Ward 3"),
+        key=lambda user: (user.created_at, str(user.user_id)),
+    )
+
+    staff_ids = await walk(state="Kaduna", lga="Igabi", ward="Ward 3")
+
+    assert len(staff_ids) == len(set(staff_ids)) == len(expected)
+    assert staff_ids == [f"AFIT/C{users.index(user):06d}" for user in expected]
+
+
+async def test_partial_locations_and_departments_filter_the_pages(department):
+    await seed_staff(department, 25)
+
+    assert len(await walk(state="Kaduna")) == 25
+    assert len(await walk(state="Kaduna", lga="Igabi")) == 25
+    assert await walk(state="Lagos") == []
+    assert len(await walk(department_id=department.department_id, lga="Igabi")) == 25
+
+
+async def test_location_pages_are_index_range_scans(db):
+    connection = Tortoise.get_connection("master")
+    for location in [
+        {"state": "Kaduna"},
+        {"state": "Kaduna", "lga": "Igabi"},
+        {"state": "Kaduna", "lga": "Igabi", "ward": "Ward 3"},
+    ]:
+        created_at = timezone.now()
+        sql = (
+            UserModel.filter(staffs__department_id__isnull=False, **location)
+            .filter(created_at__gte=created_at)
+            .filter(Q(created_at__gt=created_at) | Q(user_id__gt=uuid.uuid4()))
+            .order_by("created_at", "user_id")
+            .limit(PAGE_SIZE + 1)
+            .values("staffs__staff_id")
+            .sql()
+        )
+        plan = " ".join(
+            row["detail"]
+            for row in await connection.execute_query_dict(
+                f"EXPLAIN QUERY PLAN {sql}"
+            )
+        )
+
+        # the cursor seeks into the index instead of skipping the pages before it
+        assert "INDEX idx_user_state" in plan
+        assert "created_at>?" in plan
+        # the index already returns the rows in page order
+        assert "TEMP B-TREE" not in plan
+
+
+async def page_time(cursor: str | None, location: dict) -> float:
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        await StaffController.get_page(limit=PAGE_SIZE, cursor=cursor, **location)
+        timings.append(time.perf_counter() - start)
+    return median(timings)
+
+
+async def test_page_1000_is_as_fast_as_page_1(department):
+    await seed_staff(department, LISTED_STAFF)
+    location = {"state": "Kaduna", "lga": "Igabi", "ward": "Ward 3"}
+    # the cursor of page 1000 is the last staff of page 999
+    last = (
+        await UserModel.filter(**location)
+        .order_by("created_at", "user_id")
+        .offset(999 * PAGE_SIZE - 1)
+        .first()
+    )
+    cursor = StaffController.encode_cursor(
+        f"{last.created_at.isoformat()} {last.user_id}"
+    )
+
+    first_page = await page_time(None, location)
+    deep_page = await page_time(cursor, location)
+
+    page = await StaffController.get_page(limit=PAGE_SIZE, cursor=cursor, **location)
+    assert len(page.items) == PAGE_SIZE
+    assert deep_page < first_page * 3 + 0.005
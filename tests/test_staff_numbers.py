@@ -0,0 +1,65 @@
+import asyncio
+
+from management_server.db import write_queue
+from management_server.models import DepartmentModel, StaffModel, UserModel
+from management_server.controllers import UserController
+
+from tests.conftest import staff_form, user_data
+
+CONCURRENT_CREATES = 300
+GROUP_COMMITTED_CREATES = 200
+
+
+def staff_number(staff_id: str) -> int:
+    return int(staff_id.rsplit("/", 1)[1])
+
+
+async def test_concurrent_creates_get_consecutive_staff_ids(department):
+    users = [UserModel(**user_data()) for _ in range(CONCURRENT_CREATES)]
+    await UserModel.bulk_create(users)
+
+    staff = await asyncio.gather(
+        *(
+            StaffModel.create(
+                user_id=user.user_id, department_id=department.department_id
+            )
+            for user in users
+        )
+    )
+
+    assert sorted(staff_number(member.staff_id) for member in staff) == list(
+        range(1, CONCURRENT_CREATES + 1)
+    )
+    await department.refresh_from_db()
+    assert department.staff_sequence == CONCURRENT_CREATES
+
+
+async def test_group_committed_creates_get_distinct_staff_ids(department):
+    await write_queue.start()
+    try:
+        created = await asyncio.gather(
+            *(
+                UserController.create(form_data=staff_form(department.department_id))
+                for _ in range(GROUP_COMMITTED_CREATES)
+            )
+        )
+    finally:
+        await write_queue.stop()
+
+    staff_ids = [member.staff_id for member in created]
+    assert len(set(staff_ids)) == GROUP_COMMITTED_CREATES
+    assert (
+        await StaffModel.filter(department_id=department.department_id).count()
+        == GROUP_COMMITTED_CREATES
+    )
+    await department.refresh_from_db()
+    assert department.staff_sequence == GROUP_COMMITTED_CREATES
+
+
+async def test_unknown_department_is_not_allocated(db):
+    assert (
+        await DepartmentModel.allocate_staff_numbers(
+            department_id="00000000-0000-0000-0000-000000000000", count=3
+        )
+        is None
+    )
@@ -0,0 +1,82 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+import pytest
+
+from management_server.controllers import StaffController, UserController
+from management_server.controllers import UserControllers
+
+from tests.conftest import staff_form
+
+
+class QueryLog:
+    """
+    The SQL run by the controllers, and where their transactions started and
+    ended as positions in it.
+    """
+
+    def __init__(self, caplog) -> None:
+        self.caplog = caplog
+        self.transactions: List[Tuple[int, int]] = []
+
+    @property
+    def statements(self) -> List[str]:
+        return [record.getMessage() for record in self.caplog.records]
+
+    def reset(self) -> None:
+        self.caplog.clear()
+        self.transactions.clear()
+
+
+@pytest.fixture
+def queries(caplog, monkeypatch) -> QueryLog:
+    query_log = QueryLog(caplog)
+    in_transaction = UserControllers.in_transaction
+
+    @asynccontextmanager
+    async def recorded_transaction(*args, **kwargs):
+        async with in_transaction(*args, **kwargs) as connection:
+            started_at = len(caplog.records)
+            yield connection
+            query_log.transactions.append((started_at, len(caplog.records)))
+
+    monkeypatch.setattr(UserControllers, "in_transaction", recorded_transaction)
+    caplog.set_level(logging.DEBUG, logger="tortoise.db_client")
+    return query_log
+
+
+async def test_update_runs_one_joined_lookup_and_the_writes_in_one_transaction(
+    department, queries
+):
+    created = await UserController.create(form_data=staff_form(department.department_id))
+    queries.reset()
+
+    await StaffController(
+        staff_id=created.staff_id, fields={"first_name": "Grace"}
+    ).update()
+
+    statements = queries.statements
+    # every statement of the update ran inside its one transaction
+    assert queries.transactions == [(0, len(statements))]
+    selects = [sql for sql in statements if sql.startswith("SELECT")]
+    assert len(selects) == 2
+    assert 'LEFT OUTER JOIN "user"' in selects[0]
+    # the admin rows of the user, whose cache entries embed the same fields
+    assert 'FROM "admin"' in selects[1]
+    assert [sql.split(" ", 2)[:2] for sql in statements[1:-1]] == [
+        ["UPDATE", '"user"'],
+        ["DELETE", "FROM"],
+        ["INSERT", "INTO"],
+        ["INSERT", "INTO"],
+    ]
+
+
+async def test_update_without_changes_only_reads(department, queries):
+    created = await UserController.create(form_data=staff_form(department.department_id))
+    queries.reset()
+
+    await StaffController(staff_id=created.staff_id, fields={"first_name": "Ada"}).update()
+
+    assert queries.transactions == [(0, 1)]
+    assert queries.statements[0].startswith("SELECT")